@@ -0,0 +1,995 @@
+import argparse
+import asyncio
+import datetime
+import heapq
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from array import array
+from random import Random, randint, random
+
+import sorting
+from concurrentqueues import AsyncPriorityQueue, ThreadSafePriorityQueue
+from graph import DisjointSet, Graph, NegativeCycleError
+from heap import MaxHeap, MinHeap, PriorityQueue
+from sortedlist import SortedList
+
+class Counted:
+	"""Wraps a value and counts every comparison made against it"""
+	comparisons = 0
+
+	def __init__(self, value):
+		self.value = value
+
+	def __lt__(self, other):
+		Counted.comparisons += 1
+		return self.value < other.value
+
+	def __gt__(self, other):
+		Counted.comparisons += 1
+		return self.value > other.value
+
+	def __le__(self, other):
+		Counted.comparisons += 1
+		return self.value <= other.value
+
+	def __ge__(self, other):
+		Counted.comparisons += 1
+		return self.value >= other.value
+
+	def __eq__(self, other):
+		Counted.comparisons += 1
+		return self.value == other.value
+
+	__hash__ = None
+
+def adversarial_inputs(n):
+	"""Inputs that are known to hurt naive quick sorts"""
+	return {
+		'random': sorting.unsort(range(n)),
+		'sorted': list(range(n)),
+		'reversed': list(range(n, 0, -1)),
+		'organ pipe': list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+		'sawtooth': [i % 64 for i in range(n)],
+		'all equal': [0] * n,
+		'few unique': sorting.unsort([i % 5 for i in range(n)]),
+		'sorted + noise': [i if random() > 0.02 else randint(0, n) for i in range(n)],
+	}
+
+def measure(fn, arr):
+	"""Run fn on a counted copy of arr and return (seconds, comparisons)"""
+	data = [Counted(value) for value in arr]
+	Counted.comparisons = 0
+	start = time.perf_counter()
+	fn(data)
+	elapsed = time.perf_counter() - start
+	return elapsed, Counted.comparisons
+
+def bench_sort(sizes=(1000, 4000, 16000), algorithms=None):
+	"""
+	Compare sort against quicksort on adversarial inputs. We report the number
+	of comparisons divided by n log2 n; for an O(n log n) sort this ratio stays
+	flat as n grows, for a quadratic one it grows with n.
+	"""
+	if algorithms is None:
+		algorithms = {'sort': sorting.sort, 'quicksort': sorting.quicksort}
+	print(f'{"input":<16}{"n":>8}  ' + ''.join(f'{name:>28}' for name in algorithms))
+	for n in sizes:
+		for name, arr in adversarial_inputs(n).items():
+			row = f'{name:<16}{n:>8}  '
+			for fn in algorithms.values():
+				try:
+					elapsed, comparisons = measure(fn, arr)
+					ratio = comparisons / (n * math.log2(n))
+					row += f'{elapsed*1000:>12.1f} ms {ratio:>8.2f} cmp'
+				except RecursionError:
+					row += f'{"recursion limit":>28}'
+			print(row)
+
+def bench_few_unique(n=20000, uniques=(2, 4, 16, 256, 4096)):
+	"""
+	Compare the basic and three-way quick sorts on inputs with few distinct
+	values, such as status codes or small enums.
+	"""
+	algorithms = {
+		'quicksort': sorting.quicksort,
+		'quicksort(threeway)': partial(sorting.quicksort, threeway=True),
+	}
+	print(f'{"unique":<16}{"n":>8}  ' + ''.join(f'{name:>28}' for name in algorithms))
+	for unique in uniques:
+		arr = [randint(0, unique - 1) for _ in range(n)]
+		row = f'{unique:<16}{n:>8}  '
+		for fn in algorithms.values():
+			try:
+				elapsed, comparisons = measure(fn, arr)
+				row += f'{elapsed*1000:>10.1f} ms {comparisons:>10} cmp'
+			except RecursionError:
+				row += f'{"recursion limit":>28}'
+		print(row)
+
+def bench_mergesort(sizes=(10000, 100000)):
+	"""
+	Compare the recursive and natural merge sorts. Besides time and
+	comparisons we report the peak memory traced while sorting, which shows the
+	cost of slicing and building a new list at every level of the recursion.
+	"""
+	algorithms = {
+		'mergesort': sorting.mergesort,
+		'mergesort(natural)': partial(sorting.mergesort, natural=True),
+	}
+	print(f'{"input":<16}{"n":>8}  ' + ''.join(f'{name:>40}' for name in algorithms))
+	for n in sizes:
+		for name, arr in adversarial_inputs(n).items():
+			row = f'{name:<16}{n:>8}  '
+			for fn in algorithms.values():
+				elapsed, comparisons = measure(fn, arr)
+				peak = peak_memory(fn, arr)
+				row += f'{elapsed*1000:>10.1f} ms {comparisons:>10} cmp {peak/1024:>8.0f} KiB'
+			print(row)
+
+def peak_memory(fn, arr):
+	"""Run fn on a copy of arr and return the peak traced allocation in bytes"""
+	data = list(arr)
+	tracemalloc.start()
+	fn(data)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return peak
+
+def bench_externalsort(megabytes=32, memory_limits=(1, 4, 16), fan_ins=(8, 64)):
+	"""
+	Sort a file of random text records with externalsort and report the
+	throughput in MB/s of input for several memory budgets (in MB) and fan-ins.
+	"""
+	descriptor, path = tempfile.mkstemp(suffix='.txt')
+	with os.fdopen(descriptor, 'w') as records:
+		written = 0
+		while written < megabytes * 1024 * 1024:
+			line = f'{randint(0, 10**12):012d},{random():.12f}\n'
+			records.write(line)
+			written += len(line)
+	size = os.path.getsize(path) / (1024 * 1024)
+	print(f'{"memory":>8}{"fan in":>8}{"time":>12}{"throughput":>14}')
+	try:
+		for memory_limit in memory_limits:
+			for fan_in in fan_ins:
+				with open(path) as records:
+					start = time.perf_counter()
+					for _ in sorting.externalsort(records, memory_limit=memory_limit * 1024 * 1024, fan_in=fan_in):
+						pass
+					elapsed = time.perf_counter() - start
+				print(f'{memory_limit:>6}MB{fan_in:>8}{elapsed:>10.2f} s{size/elapsed:>9.2f} MB/s')
+	finally:
+		os.remove(path)
+
+def bench_parallel_sort(n=2000000, workers=None):
+	"""
+	Report how parallel_sort scales from one worker up to one per core on
+	random 64 bit integers (shared memory) and on strings (pickled).
+	"""
+	if workers is None:
+		workers = [1]
+		while workers[-1] * 2 <= (os.cpu_count() or 1):
+			workers.append(workers[-1] * 2)
+	inputs = {
+		'ints': [randint(-2**63, 2**63 - 1) for _ in range(n)],
+		'strings': [f'{randint(0, 10**12):012d}' for _ in range(n // 4)],
+	}
+	print(f'{"input":<10}{"n":>10}{"workers":>9}{"time":>12}{"speedup":>10}')
+	for name, arr in inputs.items():
+		baseline = None
+		for count in workers:
+			data = list(arr)
+			start = time.perf_counter()
+			sorting.parallel_sort(data, workers=count)
+			elapsed = time.perf_counter() - start
+			baseline = baseline or elapsed
+			print(f'{name:<10}{len(arr):>10}{count:>9}{elapsed:>10.2f} s{baseline/elapsed:>9.2f}x')
+
+def bench_radixsort(sizes=(100000, 1000000), digit_bits=(8, 11, 16)):
+	"""
+	Compare radixsort at several digit widths with the hybrid comparison sort
+	on random 64 bit integers and floats, as lists, array.array and (if it is
+	installed) NumPy arrays.
+	"""
+	print(f'{"input":<22}{"n":>9}{"sort":>12}' + ''.join(f'{f"radix({bits})":>12}' for bits in digit_bits))
+	for n in sizes:
+		ints = [randint(-2**63, 2**63 - 1) for _ in range(n)]
+		floats = [random() * 2e9 - 1e9 for _ in range(n)]
+		inputs = {
+			'list[int]': (lambda: list(ints), sorting.sort),
+			'array(q)': (lambda: array('q', ints), None),
+			'array(d)': (lambda: array('d', floats), None),
+		}
+		if sorting.numpy is not None:
+			inputs['numpy int64'] = (lambda: sorting.numpy.array(ints, dtype='i8'), lambda arr: arr.sort())
+			inputs['numpy float64'] = (lambda: sorting.numpy.array(floats), lambda arr: arr.sort())
+		for name, (make, baseline) in inputs.items():
+			row = f'{name:<22}{n:>9}'
+			if baseline is None:
+				row += f'{"-":>12}'
+			else:
+				row += f'{timed(baseline, make())*1000:>9.1f} ms'
+			for bits in digit_bits:
+				row += f'{timed(partial(sorting.radixsort, bits=bits), make())*1000:>9.1f} ms'
+			print(row)
+
+def bench_binarysearch(n=1000000, queries=100000):
+	"""
+	Compare answering a batch of queries against one sorted array with the
+	recursive binarysearch, the iterative lower_bound, search_many, and an
+	EytzingerLayout, plus the vectorized versions if NumPy is installed.
+	"""
+	arr = sorted(randint(0, 4 * n) for _ in range(n))
+	batch = [arr[randint(0, n - 1)] for _ in range(queries)]
+	methods = {
+		'binarysearch': lambda: [sorting.binarysearch(arr, query) for query in batch],
+		'lower_bound': lambda: [sorting.lower_bound(arr, query) for query in batch],
+		'search_many': lambda: sorting.search_many(arr, batch),
+	}
+	layout = sorting.EytzingerLayout(arr)
+	methods['eytzinger'] = lambda: [layout.lower_bound(query) for query in batch]
+	if sorting.numpy is not None:
+		numpy_arr = sorting.numpy.array(arr)
+		numpy_batch = sorting.numpy.array(batch)
+		numpy_layout = sorting.EytzingerLayout(numpy_arr)
+		methods['search_many(numpy)'] = lambda: sorting.search_many(numpy_arr, numpy_batch)
+		methods['eytzinger(numpy)'] = lambda: numpy_layout.search_many(numpy_batch)
+	print(f'{"method":<22}{"n":>9}{"queries":>9}{"time":>12}{"queries/s":>14}')
+	for name, method in methods.items():
+		start = time.perf_counter()
+		method()
+		elapsed = time.perf_counter() - start
+		print(f'{name:<22}{n:>9}{queries:>9}{elapsed*1000:>9.1f} ms{queries/elapsed:>14.0f}')
+
+def bench_selection(n=1000000, k=100):
+	"""
+	Compare getting the top k values or the median out of n with a full sort
+	against select, partial_sort and the streaming nlargest, reporting time and
+	peak traced memory.
+	"""
+	arr = sorting.unsort(range(n), seed=0)
+	methods = {
+		'sort, top k': lambda data: sorting.sort(data, reverse=True),
+		'partial_sort, bottom k': lambda data: sorting.partial_sort(data, k),
+		'nlargest': lambda data: sorting.nlargest(iter(data), k),
+		'nsmallest': lambda data: sorting.nsmallest(iter(data), k),
+		'sort, median': sorting.sort,
+		'select, median': lambda data: sorting.select(data, n // 2),
+	}
+	print(f'{"method":<24}{"n":>9}{"k":>6}{"time":>12}{"peak":>12}')
+	for name, method in methods.items():
+		elapsed = timed(method, list(arr))
+		peak = peak_memory(method, arr)
+		print(f'{name:<24}{n:>9}{k:>6}{elapsed*1000:>9.1f} ms{peak/1024:>8.0f} KiB')
+
+class ComparedByKey:
+	"""Wraps a value and calls key on both sides of every comparison"""
+	def __init__(self, value, key):
+		self.value = value
+		self.key = key
+
+	def __lt__(self, other):
+		return self.key(self.value) < other.key(other.value)
+
+	def __gt__(self, other):
+		return self.key(self.value) > other.key(other.value)
+
+def bench_key_caching(sizes=(500, 5000), sorts=('insertionsort', 'mergesort', 'quicksort', 'sort')):
+	"""
+	Sort timestamp strings by their parsed datetime, an expensive key. We
+	compare computing the key inside every comparison against passing key=,
+	which computes it once per element, and report key calls and time.
+	"""
+	calls = [0]
+	def parse(timestamp):
+		calls[0] += 1
+		return datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+	print(f'{"algorithm":<16}{"n":>7}{"per comparison":>30}{"key=":>30}')
+	for n in sizes:
+		rng = Random(n)
+		stamps = [f'{rng.randint(2000, 2030)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}' for _ in range(n)]
+		for name in sorts:
+			fn = SORTS[name][0]
+			if SORTS[name][1] is not None and n > SORTS[name][1]:
+				continue
+			row = f'{name:<16}{n:>7}'
+			calls[0] = 0
+			elapsed = timed(fn, [ComparedByKey(stamp, parse) for stamp in stamps])
+			row += f'{calls[0]:>12} calls{elapsed*1000:>10.1f} ms'
+			calls[0] = 0
+			elapsed = timed(partial(fn, key=parse), list(stamps))
+			row += f'{calls[0]:>12} calls{elapsed*1000:>10.1f} ms'
+			print(row)
+
+def bench_heapsort(sizes=(10000, 100000), arities=(2, 3, 4, 8)):
+	"""
+	Compare heapsort at several arities with the merge sorts on random input,
+	reporting time, comparisons and peak traced memory.
+	"""
+	algorithms = {f'heapsort({arity})': partial(sorting.heapsort, arity=arity) for arity in arities}
+	algorithms['mergesort'] = sorting.mergesort
+	algorithms['mergesort(natural)'] = partial(sorting.mergesort, natural=True)
+	print(f'{"algorithm":<20}{"n":>9}{"time":>12}{"comparisons":>13}{"peak":>12}')
+	for n in sizes:
+		arr = sorting.unsort(range(n), seed=n)
+		for name, fn in algorithms.items():
+			elapsed = timed(fn, list(arr))
+			_, comparisons = measure(fn, arr)
+			peak = peak_memory(fn, arr)
+			print(f'{name:<20}{n:>9}{elapsed*1000:>9.1f} ms{comparisons:>13}{peak/1024:>8.0f} KiB')
+
+def bench_sortedlist(n=200000, queries=20000):
+	"""
+	Compare a SortedList with a plain list kept sorted by lower_bound and
+	list.insert, for adding values one at a time, a bulk update, positional
+	lookups and removals.
+	"""
+	values = [randint(0, 4 * n) for _ in range(n)]
+	probes = [randint(0, n - 1) for _ in range(queries)]
+
+	def add_sortedlist():
+		container = SortedList()
+		for value in values:
+			container.add(value)
+		return container
+
+	def add_list():
+		container = []
+		for value in values:
+			container.insert(sorting.lower_bound(container, value), value)
+		return container
+
+	print(f'{"operation":<24}{"n":>9}{"SortedList":>14}{"list":>14}')
+	rows = [('add', add_sortedlist, add_list)]
+	rows.append(('update', lambda: SortedList(values), lambda: sorted(values)))
+	sortedlist, plain = add_sortedlist(), add_list()
+	rows.append(('index', lambda: [sortedlist[probe] for probe in probes], lambda: [plain[probe] for probe in probes]))
+	rows.append(('bisect', lambda: [sortedlist.bisect_left(values[probe]) for probe in probes], lambda: [sorting.lower_bound(plain, values[probe]) for probe in probes]))
+	rows.append(('remove', lambda: [sortedlist.remove(values[probe]) for probe in set(probes)], lambda: [plain.remove(values[probe]) for probe in set(probes)]))
+	for name, first, second in rows:
+		elapsed = []
+		for fn in (first, second):
+			start = time.perf_counter()
+			fn()
+			elapsed.append(time.perf_counter() - start)
+		print(f'{name:<24}{n:>9}{elapsed[0]*1000:>11.1f} ms{elapsed[1]*1000:>11.1f} ms')
+
+def bench_heaps(sizes=(1000000, 10000000), operations=200000):
+	"""
+	Measure heapify, push and pop throughput for MinHeap, MaxHeap and a keyed
+	MinHeap, with the standard library's C heapq as a reference. Heapify
+	builds the whole heap; push and pop then run operations times against it.
+	"""
+	heaps = {
+		'MinHeap': MinHeap,
+		'MaxHeap': MaxHeap,
+		'MinHeap(key)': partial(MinHeap, key=abs),
+	}
+	print(f'{"heap":<16}{"n":>10}{"heapify/s":>14}{"push/s":>14}{"pop/s":>14}{"pushpop/s":>14}')
+	for n in sizes:
+		values = [randint(0, 4 * n) for _ in range(n)]
+		extra = [randint(0, 4 * n) for _ in range(operations)]
+		for name, heap_class in heaps.items():
+			start = time.perf_counter()
+			heap = heap_class(values)
+			heapify = time.perf_counter() - start
+			start = time.perf_counter()
+			for value in extra:
+				heap.push(value)
+			push = time.perf_counter() - start
+			start = time.perf_counter()
+			for _ in range(operations):
+				heap.pop()
+			pop = time.perf_counter() - start
+			start = time.perf_counter()
+			for value in extra:
+				heap.pushpop(value)
+			pushpop = time.perf_counter() - start
+			print(f'{name:<16}{n:>10}{n/heapify:>14.0f}{operations/push:>14.0f}{operations/pop:>14.0f}{operations/pushpop:>14.0f}')
+		heap = list(values)
+		start = time.perf_counter()
+		heapq.heapify(heap)
+		heapify = time.perf_counter() - start
+		start = time.perf_counter()
+		for value in extra:
+			heapq.heappush(heap, value)
+		push = time.perf_counter() - start
+		start = time.perf_counter()
+		for _ in range(operations):
+			heapq.heappop(heap)
+		pop = time.perf_counter() - start
+		start = time.perf_counter()
+		for value in extra:
+			heapq.heappushpop(heap, value)
+		pushpop = time.perf_counter() - start
+		print(f'{"heapq":<16}{n:>10}{n/heapify:>14.0f}{operations/push:>14.0f}{operations/pop:>14.0f}{operations/pushpop:>14.0f}')
+
+def bench_priority_queue(n=100000, updates=300000):
+	"""
+	Reprioritize random entries of a queue of n tasks, then drain it, with the
+	indexed PriorityQueue and with heapq plus lazy deletion, where every update
+	pushes a new entry and leaves a tombstone behind. Reports the time and the
+	largest size the underlying heap reached.
+	"""
+	priorities = [randint(0, n) for _ in range(n)]
+	changes = [(randint(0, n - 1), randint(0, n)) for _ in range(updates)]
+	print(f'{"queue":<22}{"n":>9}{"updates":>9}{"time":>12}{"peak size":>12}')
+
+	start = time.perf_counter()
+	queue = PriorityQueue()
+	handles = queue.push_many(enumerate(priorities))
+	for task, priority in changes:
+		queue.update_priority(handles[task], priority)
+	peak = len(queue)
+	while queue:
+		queue.pop()
+	elapsed = time.perf_counter() - start
+	print(f'{"PriorityQueue":<22}{n:>9}{updates:>9}{elapsed*1000:>9.1f} ms{peak:>12}')
+
+	start = time.perf_counter()
+	heap = [[priority, task, False] for task, priority in enumerate(priorities)]
+	entries = list(heap)
+	heapq.heapify(heap)
+	for task, priority in changes:
+		entries[task][2] = True
+		entries[task] = [priority, task, False]
+		heapq.heappush(heap, entries[task])
+	peak = len(heap)
+	while heap:
+		heapq.heappop(heap)
+	elapsed = time.perf_counter() - start
+	print(f'{"heapq(tombstones)":<22}{n:>9}{updates:>9}{elapsed*1000:>9.1f} ms{peak:>12}')
+
+def bench_heap_engines(n=100000, engines=(('binary', 2), ('dary', 4), ('dary', 8), ('pairing', 2))):
+	"""
+	Time every heap engine on a few operation mixes, so we know which one to
+	pick: timers that mostly push and pop, building a heap in one go and
+	draining it, graph searches that lower priorities much more often than
+	they pop, and melding many small heaps into one.
+	"""
+	values = [randint(0, 4 * n) for _ in range(n)]
+	drops = [(randint(0, n - 1), randint(1, 8)) for _ in range(4 * n)]
+
+	def timers(engine, arity):
+		heap = MinHeap(engine=engine, arity=arity)
+		for value in values:
+			heap.push(value)
+			if value % 3 == 0:
+				heap.pop()
+		while heap:
+			heap.pop()
+
+	def heapify_drain(engine, arity):
+		heap = MinHeap(values, engine=engine, arity=arity)
+		while heap:
+			heap.pop()
+
+	def decrease_key(engine, arity):
+		queue = PriorityQueue(engine=engine, arity=arity)
+		handles = queue.push_many((index, value) for index, value in enumerate(values))
+		for index, drop in drops:
+			handle = handles[index]
+			queue.decrease_key(handle, handle.priority - drop)
+		while queue:
+			queue.pop()
+
+	def meld(engine, arity):
+		heaps = [MinHeap(values[start:start+100], engine=engine, arity=arity) for start in range(0, n, 100)]
+		start = time.perf_counter()
+		while len(heaps) > 1:
+			merged = []
+			for index in range(0, len(heaps) - 1, 2):
+				heaps[index].meld(heaps[index+1])
+				merged.append(heaps[index])
+			if len(heaps) % 2:
+				merged.append(heaps[-1])
+			heaps = merged
+		return time.perf_counter() - start
+
+	workloads = {'push/pop': timers, 'heapify+drain': heapify_drain, 'decrease_key': decrease_key, 'meld': meld}
+	names = [f'{engine}({arity})' if engine == 'dary' else engine for engine, arity in engines]
+	print(f'{"workload":<16}' + ''.join(f'{name:>14}' for name in names))
+	for workload, fn in workloads.items():
+		row = f'{workload:<16}'
+		for engine, arity in engines:
+			start = time.perf_counter()
+			elapsed = fn(engine, arity)
+			if elapsed is None:
+				elapsed = time.perf_counter() - start
+			row += f'{elapsed*1000:>11.1f} ms'
+		print(row)
+
+def bench_concurrent_queues(n=100000, producers=4, maxsize=1000, batches=(1, 64)):
+	"""
+	Push n values through the async and thread-safe priority queues from
+	several producers to one consumer, taking one value or a batch at a
+	time, and report the throughput and how often producers hit backpressure.
+	"""
+	per_producer = n // producers
+	print(f'{"queue":<14}{"batch":>7}{"values/s":>12}{"max depth":>11}{"blocked puts":>14}{"mean put wait":>15}')
+
+	async def run_async(batch):
+		queue = AsyncPriorityQueue(maxsize)
+
+		async def produce():
+			for _ in range(per_producer):
+				await queue.put(None, random())
+
+		async def consume():
+			received = 0
+			while received < per_producer * producers:
+				if batch == 1:
+					await queue.get()
+					received += 1
+				else:
+					received += len(await queue.get_many(batch, timeout=0.01))
+
+		await asyncio.gather(consume(), *(produce() for _ in range(producers)))
+		return queue.metrics
+
+	def run_threads(batch):
+		queue = ThreadSafePriorityQueue(maxsize)
+
+		def produce():
+			for _ in range(per_producer):
+				queue.put(None, random())
+
+		threads = [threading.Thread(target=produce) for _ in range(producers)]
+		for thread in threads:
+			thread.start()
+		received = 0
+		while received < per_producer * producers:
+			if batch == 1:
+				queue.get()
+				received += 1
+			else:
+				received += len(queue.get_many(batch, timeout=0.01))
+		for thread in threads:
+			thread.join()
+		return queue.metrics
+
+	for name, run in (('async', lambda batch: asyncio.run(run_async(batch))), ('threads', run_threads)):
+		for batch in batches:
+			start = time.perf_counter()
+			metrics = run(batch)
+			elapsed = time.perf_counter() - start
+			wait = metrics.mean_put_wait or 0.0
+			print(f'{name:<14}{batch:>7}{per_producer*producers/elapsed:>12.0f}{metrics.max_depth:>11}{metrics.blocked_puts:>14}{wait*1e6:>12.0f} us')
+
+def bench_kway_merge(n=200000, fan_ins=(2, 10, 100, 1000)):
+	"""
+	Merge n values spread over fan_in sorted streams with the heap and loser
+	tree versions of kway_merge, and heapq.merge as a reference, reporting
+	time, comparisons, and the peak memory of merging lazily generated
+	streams, which should only grow with the fan-in.
+	"""
+	methods = {
+		'kway_merge': sorting.kway_merge,
+		'kway_merge(loser)': partial(sorting.kway_merge, loser_tree=True),
+		'heapq.merge': heapq.merge,
+	}
+	print(f'{"method":<20}{"fan-in":>8}{"time":>12}{"comparisons":>13}{"peak":>12}')
+	for fan_in in fan_ins:
+		length = n // fan_in
+		streams = [sorted(randint(0, n) for _ in range(length)) for _ in range(fan_in)]
+		counted = [[Counted(value) for value in stream] for stream in streams]
+		for name, merge in methods.items():
+			start = time.perf_counter()
+			for _ in merge(*streams):
+				pass
+			elapsed = time.perf_counter() - start
+			Counted.comparisons = 0
+			for _ in merge(*counted):
+				pass
+			comparisons = Counted.comparisons
+			tracemalloc.start()
+			for _ in merge(*(range(index, length * fan_in, fan_in) for index in range(fan_in))):
+				pass
+			_, peak = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			print(f'{name:<20}{fan_in:>8}{elapsed*1000:>9.1f} ms{comparisons:>13}{peak/1024:>8.0f} KiB')
+
+def bench_graph(num_vertices=100000, num_edges=1000000):
+	"""
+	Build a random directed graph as CSR arrays, from Python tuples and from
+	a NumPy array, and as a dict of lists for comparison, reporting build time,
+	bytes per edge, and the time of a full depth and breadth first search. The
+	dict of lists is charged only for its lists, not for the int objects the
+	edge list already holds, so its real cost is higher still.
+	"""
+	edges = [(randint(0, num_vertices - 1), randint(0, num_vertices - 1)) for _ in range(num_edges)]
+
+	def dict_of_lists():
+		adjacency = {vertex: [] for vertex in range(num_vertices)}
+		for source, target in edges:
+			adjacency[source].append(target)
+		return adjacency
+
+	builds = {'csr(array)': lambda: Graph.from_edges(edges, num_vertices, directed=True)}
+	if sorting.numpy is not None:
+		numpy_edges = sorting.numpy.array(edges)
+		builds['csr(numpy)'] = lambda: Graph.from_edges(numpy_edges, num_vertices, directed=True)
+	builds['dict of lists'] = dict_of_lists
+	print(f'{"graph":<16}{"edges":>10}{"build":>12}{"bytes/edge":>12}{"dfs":>12}{"bfs":>12}')
+	for name, build in builds.items():
+		start = time.perf_counter()
+		graph = build()
+		elapsed = time.perf_counter() - start
+		if isinstance(graph, Graph):
+			per_edge = graph.bytes_per_edge
+			dfs = timed(lambda graph: sum(1 for _ in graph.dfs()), graph)
+			bfs = timed(lambda graph: sum(1 for _ in graph.bfs()), graph)
+			print(f'{name:<16}{num_edges:>10}{elapsed*1000:>9.1f} ms{per_edge:>12.1f}{dfs*1000:>9.1f} ms{bfs*1000:>9.1f} ms')
+		else:
+			del graph
+			tracemalloc.start()
+			graph = build()
+			size, _ = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			per_edge = size / num_edges
+			print(f'{name:<16}{num_edges:>10}{elapsed*1000:>9.1f} ms{per_edge:>12.1f}{"":>12}{"":>12}')
+
+def bench_dijkstra(side=200, queries=20):
+	"""
+	Answer random point to point queries on a side by side grid with random
+	road-like weights, with a full Dijkstra, one that stops at the target,
+	bidirectional Dijkstra, and A* guided by the Manhattan distance times the
+	smallest weight, reporting the vertices settled and the time per query.
+	"""
+	rng = Random(0)
+	edges = []
+	for row in range(side):
+		for column in range(side):
+			vertex = row * side + column
+			if column + 1 < side:
+				edges.append((vertex, vertex + 1, rng.randint(10, 30)))
+			if row + 1 < side:
+				edges.append((vertex, vertex + side, rng.randint(10, 30)))
+	graph = Graph.from_edges(edges, side * side)
+	pairs = [(rng.randrange(side * side), rng.randrange(side * side)) for _ in range(queries)]
+
+	def run(name, search):
+		settled = 0
+		start = time.perf_counter()
+		for source, target in pairs:
+			settled += search(source, target).num_settled
+		elapsed = (time.perf_counter() - start) / queries
+		print(f'{name:<16}{settled/queries:>16.0f}{elapsed*1000:>13.2f} ms')
+
+	def manhattan(target):
+		row, column = divmod(target, side)
+		return lambda vertex: 10 * (abs(vertex // side - row) + abs(vertex % side - column))
+
+	print(f'{"dijkstra":<16}{"settled/query":>16}{"time/query":>16}')
+	run('full', lambda source, target: graph.dijkstra(source))
+	run('early exit', lambda source, target: graph.dijkstra(source, target))
+	run('bidirectional', lambda source, target: graph.dijkstra(source, target, bidirectional=True))
+	run('a*', lambda source, target: graph.dijkstra(source, target, heuristic=manhattan(target)))
+
+def bench_bellmanford(num_vertices=20000, num_edges=100000):
+	"""
+	Run Bellman-Ford on a random directed graph with negative weights but no
+	negative cycles, made by shifting non-negative weights by random vertex
+	potentials, and again after closing a negative cycle, with the queue-based
+	search and with NumPy relaxing every edge per pass, reporting the time and
+	the vertex scans each needed.
+	"""
+	rng = Random(0)
+	potentials = [rng.randint(0, 100) for _ in range(num_vertices)]
+	edges = []
+	for _ in range(num_edges):
+		source, target = rng.randrange(num_vertices), rng.randrange(num_vertices)
+		edges.append((source, target, rng.randint(1, 100) + potentials[source] - potentials[target]))
+	graphs = {'no cycle': Graph.from_edges(edges, num_vertices, directed=True)}
+	cycle = rng.sample(range(num_vertices), 10)
+	edges += [(source, target, -1000) for source, target in zip(cycle, cycle[1:] + cycle[:1])]
+	graphs['negative cycle'] = Graph.from_edges(edges, num_vertices, directed=True)
+	modes = {'spfa': False}
+	if sorting.numpy is not None:
+		modes['numpy'] = True
+	print(f'{"bellmanford":<16}{"graph":<16}{"scans":>12}{"time":>12}')
+	for name, vectorized in modes.items():
+		for label, graph in graphs.items():
+			start = time.perf_counter()
+			try:
+				scans = graph.bellmanford(0, vectorized=vectorized).num_settled
+			except NegativeCycleError as error:
+				scans = f'cycle of {len(error.cycle)}'
+			elapsed = time.perf_counter() - start
+			print(f'{name:<16}{label:<16}{scans:>12}{elapsed*1000:>9.1f} ms')
+
+def bench_bfs(num_vertices=200000, num_edges=2000000):
+	"""
+	Compute hop distances on a random undirected graph with the vertex by
+	vertex bfs generator, with bfs_tree held top-down, and with bfs_tree
+	switching between top-down and bottom-up steps, from one source and from
+	ten, reporting the time of each and the direction of every step taken,
+	T for top-down and B for bottom-up.
+	"""
+	rng = Random(0)
+	edges = [(rng.randrange(num_vertices), rng.randrange(num_vertices)) for _ in range(num_edges)]
+	if sorting.numpy is not None:
+		edges = sorting.numpy.array(edges)
+	graph = Graph.from_edges(edges, num_vertices)
+	searches = {
+		'bfs generator': None,
+		'top-down': 'top-down',
+		'direction opt': 'optimizing',
+	}
+	print(f'{"bfs":<16}{"sources":>10}{"levels":>10}{"time":>12}  steps')
+	for num_sources in (1, 10):
+		sources = rng.sample(range(num_vertices), num_sources)
+		levels = sum(1 for _ in graph.bfs_levels(sources))
+		for name, direction in searches.items():
+			steps = []
+			if direction is None:
+				if num_sources > 1:
+					continue
+				elapsed = timed(lambda source: sum(1 for _ in graph.bfs(source)), sources[0])
+			else:
+				elapsed = timed(lambda sources: graph.bfs_tree(sources, direction=direction, steps=steps), sources)
+			trace = ''.join(step[0].upper() for step in steps)
+			print(f'{name:<16}{num_sources:>10}{levels:>10}{elapsed*1000:>9.1f} ms  {trace}')
+
+def bench_components(num_vertices=100000, num_edges=200000, batch=20000):
+	"""
+	Stream random edges into a graph with add_edge in batches, counting the
+	connected components after every batch, once with the components kept
+	current by add_edge and once by joining every edge so far in a fresh
+	DisjointSet, which is the full pass a query would otherwise cost.
+	"""
+	rng = Random(0)
+	edges = [(rng.randrange(num_vertices), rng.randrange(num_vertices)) for _ in range(num_edges)]
+
+	def incremental():
+		graph = Graph(num_vertices)
+		graph.count_connected_components()
+		for start in range(0, num_edges, batch):
+			for source, target in edges[start:start+batch]:
+				graph.add_edge(source, target)
+			graph.count_connected_components()
+		return graph.count_connected_components()
+
+	def rebuilt():
+		for start in range(0, num_edges, batch):
+			components = DisjointSet(num_vertices)
+			for source, target in edges[:start+batch]:
+				components.union(source, target)
+		return components.count
+
+	print(f'{"components":<16}{"edges":>10}{"queries":>10}{"count":>10}{"time":>12}')
+	for name, run in (('incremental', incremental), ('rebuilt', rebuilt)):
+		start = time.perf_counter()
+		count = run()
+		elapsed = time.perf_counter() - start
+		print(f'{name:<16}{num_edges:>10}{num_edges//batch:>10}{count:>10}{elapsed*1000:>9.1f} ms')
+
+def bench_scc(num_vertices=1000000, num_edges=2000000):
+	"""
+	Find the strongly connected components of synthetic directed graphs with
+	num_vertices vertices: one long cycle, which is a single component a
+	recursive search would need num_vertices frames deep to walk, and a
+	random graph with num_edges edges. We report the time to yield every
+	component, to number them, and to also build the condensation.
+	"""
+	rng = Random(0)
+	graphs = {
+		'cycle': [(vertex, (vertex + 1) % num_vertices) for vertex in range(num_vertices)],
+		'random': [(rng.randrange(num_vertices), rng.randrange(num_vertices)) for _ in range(num_edges)],
+	}
+	print(f'{"scc":<16}{"vertices":>10}{"edges":>10}{"components":>12}{"largest":>10}{"iterate":>12}{"ids":>12}{"condense":>12}')
+	for name, edges in graphs.items():
+		if sorting.numpy is not None:
+			edges = sorting.numpy.array(edges)
+		graph = Graph.from_edges(edges, num_vertices, directed=True)
+		start = time.perf_counter()
+		components = 0
+		largest = 0
+		for component in graph.iter_strongly_connected_components():
+			components += 1
+			largest = max(largest, len(component))
+		iterate = time.perf_counter() - start
+		ids = timed(lambda graph: graph.strongly_connected_components(), graph)
+		condense = timed(lambda graph: graph.strongly_connected_components(condensation=True), graph)
+		print(f'{name:<16}{num_vertices:>10}{len(edges):>10}{components:>12}{largest:>10}{iterate*1000:>9.0f} ms{ids*1000:>9.0f} ms{condense*1000:>9.0f} ms')
+
+def timed(fn, arr):
+	start = time.perf_counter()
+	fn(arr)
+	return time.perf_counter() - start
+
+class CountingList(list):
+	"""List that counts every element written into it"""
+	writes = 0
+
+	def __setitem__(self, index, value):
+		if isinstance(index, slice):
+			CountingList.writes += len(range(*index.indices(len(self))))
+		else:
+			CountingList.writes += 1
+		super().__setitem__(index, value)
+
+# name: (function, largest size to run it on, whether it compares elements)
+SORTS = {
+	'bubblesort': (sorting.bubblesort, 2000, True),
+	'bubblesort_improved': (sorting.bubblesort_improved, 2000, True),
+	'cocktailshakersort': (sorting.cocktailshakersort, 2000, True),
+	'insertionsort': (sorting.insertionsort, 2000, True),
+	'mergesort': (sorting.mergesort, None, True),
+	'mergesort(natural)': (partial(sorting.mergesort, natural=True), None, True),
+	'quicksort': (sorting.quicksort, None, True),
+	'quicksort(threeway)': (partial(sorting.quicksort, threeway=True), None, True),
+	'heapsort': (sorting.heapsort, None, True),
+	'heapsort(4-ary)': (partial(sorting.heapsort, arity=4), None, True),
+	'sort': (sorting.sort, None, True),
+	'radixsort': (sorting.radixsort, None, False),
+}
+
+def distributions(n, seed=0):
+	"""The standard input distributions for the suite, reproducible by seed"""
+	rng = Random(seed)
+	return {
+		'random': sorting.unsort(range(n), seed=rng),
+		'sorted': list(range(n)),
+		'reversed': list(range(n, 0, -1)),
+		'organ pipe': list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+		'few unique': sorting.unsort([i % 8 for i in range(n)], seed=rng),
+		'sorted + noise': [i if rng.random() > 0.02 else rng.randint(0, n) for i in range(n)],
+	}
+
+def run_suite(sizes=(100, 1000, 10000), sorts=None, repeat=3, seed=0):
+	"""
+	Run every sort in SORTS over every distribution at every size. For each
+	run we record the best wall time out of repeat runs on plain lists, and
+	from separate runs the comparisons, element writes into the array (a swap
+	is two writes) and peak traced memory. Sorts are skipped at sizes above
+	their limit, and a sort that fails records the error instead.
+	"""
+	sorts = SORTS if sorts is None else {name: SORTS[name] for name in sorts}
+	results = []
+	for n in sizes:
+		for distribution, arr in distributions(n, seed).items():
+			for name, (fn, limit, compares) in sorts.items():
+				if limit is not None and n > limit:
+					continue
+				result = {'algorithm': name, 'distribution': distribution, 'size': n}
+				try:
+					result['seconds'] = min(timed(fn, list(arr)) for _ in range(repeat))
+					data = CountingList(Counted(value) for value in arr) if compares else CountingList(arr)
+					Counted.comparisons = CountingList.writes = 0
+					fn(data)
+					result['comparisons'] = Counted.comparisons
+					result['writes'] = CountingList.writes
+					result['peak_bytes'] = peak_memory(fn, arr)
+				except Exception as error:
+					result = {'algorithm': name, 'distribution': distribution, 'size': n, 'error': type(error).__name__}
+				results.append(result)
+	return results
+
+def write_results(results, path):
+	"""Write suite results and a description of the machine to a JSON file"""
+	with open(path, 'w') as output:
+		json.dump({
+			'python': platform.python_version(),
+			'machine': platform.machine(),
+			'cpus': os.cpu_count(),
+			'results': results,
+		}, output, indent=2)
+
+def compare_results(baseline_path, current_path, threshold=0.1):
+	"""
+	Compare two result files and print every run whose time, comparisons or
+	writes grew by more than threshold (0.1 is 10%), or that started failing.
+	Returns the list of regressions.
+	"""
+	with open(baseline_path) as baseline_file, open(current_path) as current_file:
+		baseline = json.load(baseline_file)['results']
+		current = json.load(current_file)['results']
+	previous = {(result['algorithm'], result['distribution'], result['size']): result for result in baseline}
+	regressions = []
+	for result in current:
+		old = previous.get((result['algorithm'], result['distribution'], result['size']))
+		if old is None:
+			continue
+		label = f"{result['algorithm']} on {result['distribution']} ({result['size']})"
+		if 'error' in result:
+			if 'error' not in old:
+				regressions.append(f"{label}: now fails with {result['error']}")
+			continue
+		if 'error' in old:
+			continue
+		for metric in ('seconds', 'comparisons', 'writes'):
+			if old[metric] and result[metric] > old[metric] * (1 + threshold):
+				regressions.append(f'{label}: {metric} {old[metric]:.6g} -> {result[metric]:.6g} (+{(result[metric] / old[metric] - 1) * 100:.0f}%)')
+	for regression in regressions:
+		print(regression)
+	print(f'{len(regressions)} regression(s)')
+	return regressions
+
+def print_results(results):
+	print(f'{"algorithm":<22}{"distribution":<16}{"n":>8}{"time":>12}{"comparisons":>13}{"writes":>11}{"peak":>11}')
+	for result in results:
+		row = f"{result['algorithm']:<22}{result['distribution']:<16}{result['size']:>8}"
+		if 'error' in result:
+			row += f"{result['error']:>12}"
+		else:
+			row += f"{result['seconds']*1000:>9.2f} ms{result['comparisons']:>13}{result['writes']:>11}{result['peak_bytes']/1024:>7.0f} KiB"
+		print(row)
+
+def run_benchmarks():
+	bench_sort()
+	print()
+	bench_few_unique()
+	print()
+	bench_mergesort()
+	print()
+	bench_externalsort()
+	print()
+	bench_parallel_sort()
+	print()
+	bench_radixsort()
+	print()
+	bench_binarysearch()
+	print()
+	bench_selection()
+	print()
+	bench_key_caching()
+	print()
+	bench_heapsort()
+	print()
+	bench_sortedlist()
+	print()
+	bench_heaps()
+	print()
+	bench_priority_queue()
+	print()
+	bench_heap_engines()
+	print()
+	bench_concurrent_queues()
+	print()
+	bench_kway_merge()
+	print()
+	bench_graph()
+	print()
+	bench_dijkstra()
+	print()
+	bench_bellmanford()
+	print()
+	bench_bfs()
+	print()
+	bench_components()
+	print()
+	bench_scc()
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmark the algorithms in this repo')
+	commands = parser.add_subparsers(dest='command')
+	suite = commands.add_parser('suite', help='run every sort over the standard distributions')
+	suite.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+	suite.add_argument('--sorts', nargs='+', choices=list(SORTS))
+	suite.add_argument('--repeat', type=int, default=3)
+	suite.add_argument('--seed', type=int, default=0)
+	suite.add_argument('--output', help='write the results to this JSON file')
+	compare = commands.add_parser('compare', help='compare two suite result files')
+	compare.add_argument('baseline')
+	compare.add_argument('current')
+	compare.add_argument('--threshold', type=float, default=0.1)
+	args = parser.parse_args()
+
+	if args.command == 'suite':
+		results = run_suite(args.sizes, args.sorts, args.repeat, args.seed)
+		print_results(results)
+		if args.output:
+			write_results(results, args.output)
+	elif args.command == 'compare':
+		sys.exit(1 if compare_results(args.baseline, args.current, args.threshold) else 0)
+	else:
+		run_benchmarks()
@@ -0,0 +1,273 @@
+import asyncio
+import threading
+import time
+
+from heap import PriorityQueue
+
+class QueueMetrics:
+	"""Depth and wait time counters for a concurrent priority queue"""
+	def __init__(self):
+		self.depth = 0
+		self.max_depth = 0
+		self.puts = 0
+		self.gets = 0
+		# how many calls had to block, and for how long in total and at worst
+		self.blocked_puts = 0
+		self.put_wait_seconds = 0.0
+		self.max_put_wait = 0.0
+		self.blocked_gets = 0
+		self.get_wait_seconds = 0.0
+		self.max_get_wait = 0.0
+
+	def __repr__(self):
+		return f'QueueMetrics({self.as_dict()})'
+
+	@property
+	def mean_put_wait(self):
+		"""Average time a blocked put waited for space, or None if none blocked"""
+		if self.blocked_puts == 0:
+			return None
+		return self.put_wait_seconds / self.blocked_puts
+
+	@property
+	def mean_get_wait(self):
+		"""Average time a blocked get waited for values, or None if none blocked"""
+		if self.blocked_gets == 0:
+			return None
+		return self.get_wait_seconds / self.blocked_gets
+
+	def put(self, waited, blocked, depth):
+		"""Record a put that waited for waited seconds and left depth values queued"""
+		self.puts += 1
+		self.depth = depth
+		self.max_depth = max(self.max_depth, depth)
+		if blocked:
+			self.blocked_puts += 1
+			self.put_wait_seconds += waited
+			self.max_put_wait = max(self.max_put_wait, waited)
+
+	def get(self, waited, blocked, depth, count=1):
+		"""Record a get of count values that waited for waited seconds"""
+		self.gets += count
+		self.depth = depth
+		if blocked:
+			self.blocked_gets += 1
+			self.get_wait_seconds += waited
+			self.max_get_wait = max(self.max_get_wait, waited)
+
+	def as_dict(self):
+		"""Counters as a JSON serializable dictionary"""
+		return {
+			'depth': self.depth,
+			'max_depth': self.max_depth,
+			'puts': self.puts,
+			'gets': self.gets,
+			'blocked_puts': self.blocked_puts,
+			'put_wait_seconds': self.put_wait_seconds,
+			'max_put_wait': self.max_put_wait,
+			'mean_put_wait': self.mean_put_wait,
+			'blocked_gets': self.blocked_gets,
+			'get_wait_seconds': self.get_wait_seconds,
+			'max_get_wait': self.max_get_wait,
+			'mean_get_wait': self.mean_get_wait,
+		}
+
+class AsyncPriorityQueue:
+	"""
+	PriorityQueue shared by coroutines. With a maxsize, put waits for space
+	when the queue is full, so producers slow down to the pace of the
+	consumers instead of queueing without bound. get waits for a value when
+	the queue is empty, and get_many drains values in batches.
+	"""
+	def __init__(self, maxsize=0, engine='binary'):
+		self.maxsize = maxsize
+		self.queue = PriorityQueue(engine=engine)
+		self.metrics = QueueMetrics()
+		# both conditions share one lock, so a waiter woken by either one
+		# sees the queue as the notifier left it
+		lock = asyncio.Lock()
+		self.__not_empty = asyncio.Condition(lock)
+		self.__not_full = asyncio.Condition(lock)
+
+	def __len__(self):
+		return len(self.queue)
+
+	def full(self):
+		"""Whether put would have to wait for space"""
+		return 0 < self.maxsize <= len(self.queue)
+
+	def empty(self):
+		"""Whether get would have to wait for a value"""
+		return len(self.queue) == 0
+
+	async def __wait(self, condition, ready, deadline):
+		# wait on condition until ready() or the deadline, returning ready()
+		loop = asyncio.get_running_loop()
+		while not ready():
+			remaining = None if deadline is None else deadline - loop.time()
+			if remaining is not None and remaining <= 0:
+				return False
+			try:
+				await asyncio.wait_for(condition.wait(), remaining)
+			except asyncio.TimeoutError:
+				# if we were notified just before timing out, we go on and use
+				# the value or space ourselves, so the notification isn't lost
+				return ready()
+			except asyncio.CancelledError:
+				# a cancelled waiter won't use what it was woken for, so pass
+				# the notification on rather than leave another waiter asleep
+				if ready():
+					condition.notify()
+				raise
+		return True
+
+	def __deadline(self, timeout):
+		if timeout is None:
+			return None
+		return asyncio.get_running_loop().time() + timeout
+
+	async def put(self, value, priority, timeout=None):
+		"""Insert value with priority, waiting for space if the queue is full, and return its handle"""
+		deadline = self.__deadline(timeout)
+		async with self.__not_full:
+			start = time.perf_counter()
+			blocked = self.full()
+			if not await self.__wait(self.__not_full, lambda: not self.full(), deadline):
+				raise TimeoutError('put timed out waiting for space')
+			handle = self.queue.push(value, priority)
+			self.metrics.put(time.perf_counter() - start, blocked, len(self.queue))
+			self.__not_empty.notify()
+			return handle
+
+	async def get(self, timeout=None):
+		"""Remove and return the value with the smallest priority, waiting for one if the queue is empty"""
+		deadline = self.__deadline(timeout)
+		async with self.__not_empty:
+			start = time.perf_counter()
+			blocked = self.empty()
+			if not await self.__wait(self.__not_empty, lambda: not self.empty(), deadline):
+				raise TimeoutError('get timed out waiting for a value')
+			value = self.queue.pop()
+			self.metrics.get(time.perf_counter() - start, blocked, len(self.queue))
+			self.__not_full.notify()
+			return value
+
+	async def get_many(self, n, timeout=None):
+		"""
+		Remove and return up to n values, smallest priority first. We take
+		values as they arrive until we have n of them or the timeout runs
+		out, so a batch can come back short, or empty, after a timeout.
+		"""
+		deadline = self.__deadline(timeout)
+		batch = []
+		async with self.__not_empty:
+			start = time.perf_counter()
+			blocked = False
+			while len(batch) < n:
+				if self.empty():
+					blocked = True
+					if not await self.__wait(self.__not_empty, lambda: not self.empty(), deadline):
+						break
+				while self.queue and len(batch) < n:
+					batch.append(self.queue.pop())
+					self.__not_full.notify()
+			self.metrics.get(time.perf_counter() - start, blocked, len(self.queue), len(batch))
+		return batch
+
+	async def update_priority(self, handle, priority):
+		"""Change the priority of a value that is still queued"""
+		async with self.__not_full:
+			self.queue.update_priority(handle, priority)
+
+	async def remove(self, handle):
+		"""Remove a value that is still queued and return it"""
+		async with self.__not_full:
+			value = self.queue.remove(handle)
+			self.metrics.depth = len(self.queue)
+			self.__not_full.notify()
+			return value
+
+class ThreadSafePriorityQueue:
+	"""
+	PriorityQueue shared by threads, with the same bounded put, get and
+	get_many as AsyncPriorityQueue but blocking the calling thread instead
+	of suspending a coroutine.
+	"""
+	def __init__(self, maxsize=0, engine='binary'):
+		self.maxsize = maxsize
+		self.queue = PriorityQueue(engine=engine)
+		self.metrics = QueueMetrics()
+		lock = threading.Lock()
+		self.__not_empty = threading.Condition(lock)
+		self.__not_full = threading.Condition(lock)
+
+	def __len__(self):
+		return len(self.queue)
+
+	def full(self):
+		"""Whether put would have to wait for space"""
+		return 0 < self.maxsize <= len(self.queue)
+
+	def empty(self):
+		"""Whether get would have to wait for a value"""
+		return len(self.queue) == 0
+
+	def put(self, value, priority, timeout=None):
+		"""Insert value with priority, waiting for space if the queue is full, and return its handle"""
+		with self.__not_full:
+			start = time.perf_counter()
+			blocked = self.full()
+			if not self.__not_full.wait_for(lambda: not self.full(), timeout):
+				raise TimeoutError('put timed out waiting for space')
+			handle = self.queue.push(value, priority)
+			self.metrics.put(time.perf_counter() - start, blocked, len(self.queue))
+			self.__not_empty.notify()
+			return handle
+
+	def get(self, timeout=None):
+		"""Remove and return the value with the smallest priority, waiting for one if the queue is empty"""
+		with self.__not_empty:
+			start = time.perf_counter()
+			blocked = self.empty()
+			if not self.__not_empty.wait_for(lambda: not self.empty(), timeout):
+				raise TimeoutError('get timed out waiting for a value')
+			value = self.queue.pop()
+			self.metrics.get(time.perf_counter() - start, blocked, len(self.queue))
+			self.__not_full.notify()
+			return value
+
+	def get_many(self, n, timeout=None):
+		"""
+		Remove and return up to n values, smallest priority first. We take
+		values as they arrive until we have n of them or the timeout runs
+		out, so a batch can come back short, or empty, after a timeout.
+		"""
+		deadline = None if timeout is None else time.monotonic() + timeout
+		batch = []
+		with self.__not_empty:
+			start = time.perf_counter()
+			blocked = False
+			while len(batch) < n:
+				if self.empty():
+					blocked = True
+					remaining = None if deadline is None else deadline - time.monotonic()
+					if not self.__not_empty.wait_for(lambda: not self.empty(), remaining):
+						break
+				while self.queue and len(batch) < n:
+					batch.append(self.queue.pop())
+					self.__not_full.notify()
+			self.metrics.get(time.perf_counter() - start, blocked, len(self.queue), len(batch))
+		return batch
+
+	def update_priority(self, handle, priority):
+		"""Change the priority of a value that is still queued"""
+		with self.__not_full:
+			self.queue.update_priority(handle, priority)
+
+	def remove(self, handle):
+		"""Remove a value that is still queued and return it"""
+		with self.__not_full:
+			value = self.queue.remove(handle)
+			self.metrics.depth = len(self.queue)
+			self.__not_full.notify()
+			return value
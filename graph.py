@@ -1,49 +1,1108 @@
+from array import array
+from collections import deque
+from itertools import repeat
+import operator
+
+from heap import MinHeap, PriorityQueue
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+INFINITY = float('inf')
+
+class NegativeCycleError(ValueError):
+	"""Raised by a shortest path search that reaches a negative cycle, which it carries as cycle"""
+	def __init__(self, cycle):
+		super().__init__(f'graph contains a negative cycle: {cycle}')
+		# vertices of the cycle in edge order, closing from the last to the first
+		self.cycle = cycle
+
+class ShortestPaths:
+	"""Distances and predecessors found by a shortest path search"""
+	def __init__(self, num_vertices):
+		self.distances = array('d', [INFINITY]) * num_vertices
+		# predecessor of every vertex on its shortest path, -1 for the sources
+		# and for unreached vertices
+		self.predecessors = array('q', [-1]) * num_vertices
+		self.settled = bytearray(num_vertices)
+		self.num_settled = 0
+
+	def __getitem__(self, vertex):
+		return self.distances[vertex]
+
+	def __repr__(self):
+		return f'ShortestPaths({list(self.distances)})'
+
+	def path(self, target):
+		"""Vertices on the shortest path to target, or None if it wasn't reached"""
+		if self.distances[target] == INFINITY:
+			return None
+		path = [target]
+		while self.predecessors[path[-1]] != -1:
+			path.append(self.predecessors[path[-1]])
+		path.reverse()
+		return path
+
+class DisjointSet:
+	"""
+	Disjoint sets of the integers 0 to size - 1, kept in flat arrays of
+	parents and set sizes. We join sets by size, hanging the smaller tree
+	under the larger, and halve paths as we find roots, so any sequence of
+	operations takes nearly constant time each.
+	"""
+	def __init__(self, size=0):
+		self.parents = array('q', range(size))
+		self.sizes = array('q', [1]) * size
+		self.count = size
+
+	def __len__(self):
+		return len(self.parents)
+
+	def __repr__(self):
+		return f'DisjointSet({len(self)} elements, {self.count} sets)'
+
+	def add(self):
+		"""Add a new element in a set of its own and return it"""
+		self.grow(len(self) + 1)
+		return len(self) - 1
+
+	def grow(self, size):
+		"""Add new elements, each in a set of its own, until there are size of them"""
+		if size > len(self):
+			self.count += size - len(self)
+			self.sizes.extend(array('q', [1]) * (size - len(self)))
+			self.parents.extend(range(len(self), size))
+
+	def find(self, element):
+		"""Representative element of the set holding element"""
+		parents = self.parents
+		while parents[element] != element:
+			# point every other element on the path at its grandparent
+			parents[element] = parents[parents[element]]
+			element = parents[element]
+		return element
+
+	def union(self, first, second):
+		"""Join the sets holding first and second, returning whether they were apart"""
+		first = self.find(first)
+		second = self.find(second)
+		if first == second:
+			return False
+		if self.sizes[first] < self.sizes[second]:
+			first, second = second, first
+		self.parents[second] = first
+		self.sizes[first] += self.sizes[second]
+		self.count -= 1
+		return True
+
+	def same(self, first, second):
+		"""Whether first and second are in the same set"""
+		return self.find(first) == self.find(second)
+
+	def size(self, element):
+		"""Number of elements in the set holding element"""
+		return self.sizes[self.find(element)]
+
 class Graph:
-	# TODO
-	def __init__(self):
-		return
-
-	# TODO
-	def dfs(self):
-		# implement with adjacency list
-		# implement with adjacency matrix
-		return
-
-	# TODO
-	def bfs(self):
-		# implement with adjacency list
-		# implement with adjacency matrix
-		return
-
-	# TODO
-	def dijkstra(self):
-		return
-
-	# TODO
-	def bellmanford(self):
-		return
-
-	# TODO
+	"""
+	Graph stored in compressed sparse row (CSR) arrays. Vertices are the
+	integers 0 to num_vertices - 1, and the edges leaving vertex v are
+	targets[offsets[v]:offsets[v+1]], with their weights at the same positions
+	of weights (None for an unweighted graph). An undirected edge is stored in
+	both directions. The arrays are array.array, or NumPy arrays if the graph
+	was built from NumPy input, so an edge costs a few bytes instead of the
+	hundreds a dict of lists of Python ints would.
+	"""
+	# edges added since the CSR arrays were built, and the components once
+	# something has asked for them
+	__pending = None
+	__components = None
+
+	def __init__(self, num_vertices=0, directed=False):
+		self.directed = directed
+		self.num_vertices = num_vertices
+		self.num_edges = 0
+		self.__offsets = array('q', [0]) * (num_vertices + 1)
+		self.__target_array = array(self.__typecode(num_vertices))
+		self.__weight_array = None
+		self.__views()
+
+	def __len__(self):
+		return self.num_vertices
+
+	def __repr__(self):
+		kind = 'directed' if self.directed else 'undirected'
+		return f'Graph({self.num_vertices} vertices, {self.num_edges} {kind} edges)'
+
+	def __views(self):
+		# memoryviews slice without copying; NumPy arrays already do
+		self.__transpose = None
+		if isinstance(self.__target_array, array):
+			self.__targets = memoryview(self.__target_array)
+			self.__weights = None if self.__weight_array is None else memoryview(self.__weight_array)
+		else:
+			self.__targets = self.__target_array
+			self.__weights = self.__weight_array
+
+	@property
+	def offsets(self):
+		"""Where the edges of every vertex start in targets, plus the total"""
+		self.__flush()
+		return self.__offsets
+
+	@property
+	def targets(self):
+		"""Targets of the edges, grouped by source vertex"""
+		self.__flush()
+		return self.__target_array
+
+	@property
+	def weights(self):
+		"""Weights of the edges in the same order as targets, or None if unweighted"""
+		self.__flush()
+		return self.__weight_array
+
+	def add_edge(self, source, target, weight=None):
+		"""
+		Add an edge, and any vertices up to its endpoints. The CSR arrays can't
+		grow in place, so we buffer new edges and merge them all in with one
+		O(V + E) pass the next time the arrays are read; adding edges in
+		batches between reads keeps that cheap. Once the connected components
+		have been asked for, we also join the endpoints' components straight
+		away, so they stay current without ever reading the arrays.
+		"""
+		if self.__pending is None:
+			self.__pending = (array('q'), array('q'), array('d'))
+			self.__pending_weighted = False
+		sources, targets, weights = self.__pending
+		sources.append(source)
+		targets.append(target)
+		weights.append(1.0 if weight is None else weight)
+		if weight is not None:
+			self.__pending_weighted = True
+		self.num_vertices = max(self.num_vertices, source + 1, target + 1)
+		self.num_edges += 1
+		if self.__components is not None:
+			self.__components.grow(self.num_vertices)
+			self.__components.union(source, target)
+
+	def __flush(self):
+		# merge the buffered edges into the CSR arrays, each after the edges
+		# its source already had
+		if self.__pending is None:
+			return
+		sources, targets, weights = self.__pending
+		self.__pending = None
+		if not self.directed:
+			others = [index for index in range(len(sources)) if sources[index] != targets[index]]
+			reverse_sources = array('q', (targets[index] for index in others))
+			targets.extend(sources[index] for index in others)
+			sources.extend(reverse_sources)
+			weights.extend(weights[index] for index in others)
+		weighted = self.__weight_array is not None or self.__pending_weighted
+		old_offsets = self.__offsets
+		old_vertices = len(old_offsets) - 1
+		if numpy is not None and isinstance(self.__target_array, numpy.ndarray):
+			degrees = numpy.diff(old_offsets)
+			all_sources = numpy.concatenate((numpy.repeat(numpy.arange(old_vertices), degrees), numpy.asarray(sources)))
+			all_targets = numpy.concatenate((self.__target_array.astype(numpy.int64), numpy.asarray(targets)))
+			order = numpy.argsort(all_sources, kind='stable')
+			if weighted:
+				old_weights = self.__weight_array
+				if old_weights is None:
+					old_weights = numpy.ones(len(self.__target_array))
+				self.__weight_array = numpy.concatenate((old_weights, numpy.asarray(weights)))[order]
+			self.__offsets = numpy.zeros(self.num_vertices + 1, dtype=numpy.int64)
+			numpy.cumsum(numpy.bincount(all_sources, minlength=self.num_vertices), out=self.__offsets[1:])
+			self.__target_array = all_targets[order].astype(numpy.int32 if self.num_vertices < 2**31 else numpy.int64)
+			self.__views()
+			return
+		offsets = array('q', [0]) * (self.num_vertices + 1)
+		for source in sources:
+			offsets[source+1] += 1
+		for vertex in range(self.num_vertices):
+			old_degree = old_offsets[vertex+1] - old_offsets[vertex] if vertex < old_vertices else 0
+			offsets[vertex+1] += offsets[vertex] + old_degree
+		typecode = self.__typecode(self.num_vertices)
+		old_targets = self.__target_array
+		if old_targets.typecode != typecode:
+			old_targets = array(typecode, old_targets)
+		old_weights = self.__weight_array
+		if weighted and old_weights is None:
+			old_weights = array('d', [1.0]) * len(old_targets)
+		csr_targets = array(typecode, [0]) * (len(old_targets) + len(targets))
+		csr_weights = array('d', [0.0]) * len(csr_targets) if weighted else None
+		slots = array('q', offsets)
+		for vertex in range(old_vertices):
+			start, end = old_offsets[vertex], old_offsets[vertex+1]
+			slot = slots[vertex]
+			csr_targets[slot:slot+end-start] = old_targets[start:end]
+			if weighted:
+				csr_weights[slot:slot+end-start] = old_weights[start:end]
+			slots[vertex] = slot + end - start
+		for index, source in enumerate(sources):
+			slot = slots[source]
+			slots[source] = slot + 1
+			csr_targets[slot] = targets[index]
+			if weighted:
+				csr_weights[slot] = weights[index]
+		self.__offsets = offsets
+		self.__target_array = csr_targets
+		self.__weight_array = csr_weights
+		self.__views()
+
+	@classmethod
+	def from_edges(cls, edges, num_vertices=None, directed=False, weights=None):
+		"""
+		Build a graph from edges in one pass. edges is an iterable of (u, v) or
+		(u, v, weight) tuples, or a NumPy array of shape (m, 2) with the weights,
+		if any, in a separate array. We count the edges leaving every vertex,
+		turn the counts into offsets with a prefix sum, and then drop every
+		edge into its slot, which is a counting sort by source vertex that keeps
+		the edges of each vertex in input order.
+		"""
+		if numpy is not None and isinstance(edges, numpy.ndarray):
+			return cls.__from_numpy(edges, num_vertices, directed, weights)
+		sources = array('q')
+		targets = array('q')
+		edge_weights = None
+		for edge in edges:
+			sources.append(edge[0])
+			targets.append(edge[1])
+			if len(edge) > 2:
+				if edge_weights is None:
+					edge_weights = array('d', [1.0]) * (len(sources) - 1)
+				edge_weights.append(edge[2])
+			elif edge_weights is not None:
+				edge_weights.append(1.0)
+		if weights is not None:
+			edge_weights = array('d', weights)
+		num_edges = len(sources)
+		if num_vertices is None:
+			num_vertices = max(max(sources, default=-1), max(targets, default=-1)) + 1
+		if not directed:
+			# store the reverse of every edge that isn't a self loop
+			others = [index for index in range(num_edges) if sources[index] != targets[index]]
+			reverse_sources = array('q', (targets[index] for index in others))
+			targets.extend(sources[index] for index in others)
+			sources.extend(reverse_sources)
+			if edge_weights is not None:
+				edge_weights.extend(edge_weights[index] for index in others)
+
+		counts = array('q', [0]) * (num_vertices + 1)
+		for source in sources:
+			counts[source+1] += 1
+		for vertex in range(num_vertices):
+			counts[vertex+1] += counts[vertex]
+		offsets = counts
+		slots = array('q', offsets)
+		csr_targets = array(cls.__typecode(num_vertices), [0]) * len(targets)
+		csr_weights = None if edge_weights is None else array('d', [0.0]) * len(targets)
+		for index, source in enumerate(sources):
+			slot = slots[source]
+			slots[source] = slot + 1
+			csr_targets[slot] = targets[index]
+			if csr_weights is not None:
+				csr_weights[slot] = edge_weights[index]
+		return cls.__from_csr(offsets, csr_targets, csr_weights, directed, num_edges)
+
+	@classmethod
+	def __from_numpy(cls, edges, num_vertices, directed, weights):
+		sources = edges[:, 0].astype(numpy.int64)
+		targets = edges[:, 1].astype(numpy.int64)
+		weights = None if weights is None else numpy.asarray(weights, dtype=numpy.float64)
+		num_edges = len(sources)
+		if num_vertices is None:
+			num_vertices = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+		if not directed:
+			others = sources != targets
+			sources, targets = numpy.concatenate((sources, targets[others])), numpy.concatenate((targets, sources[others]))
+			if weights is not None:
+				weights = numpy.concatenate((weights, weights[others]))
+		# a stable sort by source is the same counting sort as the pure Python
+		# build, done in C
+		order = numpy.argsort(sources, kind='stable')
+		offsets = numpy.zeros(num_vertices + 1, dtype=numpy.int64)
+		numpy.cumsum(numpy.bincount(sources, minlength=num_vertices), out=offsets[1:])
+		csr_targets = targets[order].astype(numpy.int32 if num_vertices < 2**31 else numpy.int64)
+		csr_weights = None if weights is None else weights[order]
+		return cls.__from_csr(offsets, csr_targets, csr_weights, directed, num_edges)
+
+	@staticmethod
+	def __typecode(num_vertices):
+		# the smallest array typecode that can hold every vertex
+		return 'i' if num_vertices < 2**31 else 'q'
+
+	@classmethod
+	def __from_csr(cls, offsets, targets, weights, directed, num_edges):
+		graph = cls.__new__(cls)
+		graph.directed = directed
+		graph.num_vertices = len(offsets) - 1
+		graph.num_edges = num_edges
+		graph.__offsets = offsets
+		graph.__target_array = targets
+		graph.__weight_array = weights
+		graph.__views()
+		return graph
+
+	@property
+	def nbytes(self):
+		"""Bytes used by the CSR arrays"""
+		arrays = [self.offsets, self.targets]
+		if self.weights is not None:
+			arrays.append(self.weights)
+		if numpy is not None and isinstance(self.targets, numpy.ndarray):
+			return sum(arr.nbytes for arr in arrays)
+		return sum(len(arr) * arr.itemsize for arr in arrays)
+
+	@property
+	def bytes_per_edge(self):
+		"""Bytes used by the CSR arrays per edge, or None for a graph without edges"""
+		if self.num_edges == 0:
+			return None
+		return self.nbytes / self.num_edges
+
+	def degree(self, vertex):
+		"""Number of edges leaving vertex"""
+		return self.offsets[vertex+1] - self.offsets[vertex]
+
+	def neighbors(self, vertex):
+		"""Targets of the edges leaving vertex, as a view into the CSR arrays"""
+		if self.__pending is not None:
+			self.__flush()
+		offsets = self.__offsets
+		return self.__targets[offsets[vertex]:offsets[vertex+1]]
+
+	def edge_weights(self, vertex):
+		"""Weights of the edges leaving vertex, in the same order as neighbors(vertex)"""
+		if self.__pending is not None:
+			self.__flush()
+		offsets = self.__offsets
+		if self.__weights is None:
+			return repeat(1, offsets[vertex+1] - offsets[vertex])
+		return self.__weights[offsets[vertex]:offsets[vertex+1]]
+
+	def edges(self):
+		"""Every edge as a (u, v, weight) tuple, undirected edges once"""
+		for vertex in range(self.num_vertices):
+			for target, weight in zip(self.neighbors(vertex), self.edge_weights(vertex)):
+				if self.directed or vertex <= target:
+					yield vertex, int(target), weight
+
+	def transpose(self):
+		"""Graph with every edge reversed, built once and then cached"""
+		if not self.directed:
+			return self
+		self.__flush()
+		if self.__transpose is None:
+			if numpy is not None and isinstance(self.targets, numpy.ndarray):
+				sources = numpy.repeat(numpy.arange(self.num_vertices), numpy.diff(self.offsets))
+				edges = numpy.column_stack((self.targets, sources))
+				self.__transpose = Graph.from_edges(edges, self.num_vertices, True, self.weights)
+			elif self.weights is None:
+				edges = ((target, vertex) for vertex, target, _ in self.edges())
+				self.__transpose = Graph.from_edges(edges, self.num_vertices, directed=True)
+			else:
+				edges = ((target, vertex, weight) for vertex, target, weight in self.edges())
+				self.__transpose = Graph.from_edges(edges, self.num_vertices, directed=True)
+		return self.__transpose
+
+	def __undirected_neighbors(self, reverse):
+		# neighbors ignoring direction, for the algorithms on undirected graphs
+		if reverse is None:
+			return self.neighbors
+		return lambda vertex: list(self.neighbors(vertex)) + list(reverse.neighbors(vertex))
+
+	def dfs(self, source=None):
+		"""
+		Yield the vertices in depth first order from source, or from every
+		unvisited vertex in turn if source is None. We keep an explicit stack of
+		(vertex, next edge) pairs instead of recursing, so deep graphs can't
+		overflow the call stack.
+		"""
+		offsets = self.offsets
+		targets = self.__targets
+		visited = bytearray(self.num_vertices)
+		starts = range(self.num_vertices) if source is None else (source,)
+		for start in starts:
+			if visited[start]:
+				continue
+			visited[start] = 1
+			yield start
+			stack = [[start, offsets[start]]]
+			while stack:
+				frame = stack[-1]
+				vertex, edge = frame
+				if edge == offsets[vertex+1]:
+					stack.pop()
+					continue
+				frame[1] = edge + 1
+				target = int(targets[edge])
+				if not visited[target]:
+					visited[target] = 1
+					yield target
+					stack.append([target, offsets[target]])
+
+	def bfs(self, source=None):
+		"""
+		Yield the vertices in breadth first order from source, or from every
+		unvisited vertex in turn if source is None. We run the same search over
+		frontier arrays as bfs_levels and yield every frontier in turn. Without
+		a source the searches stay top-down, since a bottom-up step scans every
+		vertex and a graph of many small components would pay for that once
+		per component.
+		"""
+		distances, parents = self.__bfs_arrays()
+		if source is not None:
+			for frontier in self.__bfs(source, 14, 24, 'optimizing', None, distances, parents):
+				yield from frontier.tolist()
+			return
+		offsets = self.offsets
+		for start in range(self.num_vertices):
+			if distances[start] >= 0:
+				continue
+			if offsets[start] == offsets[start+1]:
+				# nothing to search from a vertex without edges out
+				distances[start] = 0
+				yield start
+				continue
+			for frontier in self.__bfs(start, 14, 24, 'top-down', None, distances, parents):
+				yield from frontier.tolist()
+
+	def bfs_levels(self, sources, alpha=14, beta=24, direction='optimizing', steps=None):
+		"""
+		Yield the frontier of every level of a breadth first search from
+		sources, starting with the sources themselves, as an array of vertices.
+		Each level is one step, either top-down, where the frontier claims its
+		unvisited neighbors, or bottom-up, where every unvisited vertex looks
+		for a parent among its in-neighbors and stops at the first one found
+		in the frontier. Following Beamer, we go bottom-up once the edges
+		leaving the frontier outnumber 1/alpha of the edges still unexplored,
+		since most of them would lead to visited vertices, and back top-down
+		once the frontier shrinks below 1/beta of the vertices. With NumPy
+		installed every step runs as a handful of array operations.
+
+		direction='top-down' or 'bottom-up' takes every step that way instead.
+		If steps is a list, we append the direction of every step taken to it.
+		"""
+		distances, parents = self.__bfs_arrays()
+		for frontier in self.__bfs(sources, alpha, beta, direction, steps, distances, parents):
+			yield self.__backend(frontier)
+
+	def bfs_tree(self, sources, alpha=14, beta=24, direction='optimizing', steps=None):
+		"""
+		Hop distances from the closest of sources and the parent of every
+		vertex in a breadth first search tree, as two arrays with -1 for
+		unreached vertices and, in parents, for the sources. The other
+		arguments are as for bfs_levels.
+		"""
+		distances, parents = self.__bfs_arrays()
+		for _ in self.__bfs(sources, alpha, beta, direction, steps, distances, parents):
+			pass
+		return self.__backend(distances), self.__backend(parents)
+
+	def __bfs_arrays(self):
+		if numpy is not None:
+			return numpy.full(self.num_vertices, -1), numpy.full(self.num_vertices, -1)
+		return array('q', [-1]) * self.num_vertices, array('q', [-1]) * self.num_vertices
+
+	def __backend(self, arr):
+		# hand NumPy arrays back only to callers whose graph is built on them
+		if isinstance(arr, array) or isinstance(self.targets, numpy.ndarray):
+			return arr
+		return array('q', arr.astype(numpy.int64).tobytes())
+
+	def __bfs(self, sources, alpha, beta, direction, steps, distances, parents):
+		if direction not in ('optimizing', 'top-down', 'bottom-up'):
+			raise ValueError("direction must be 'optimizing', 'top-down' or 'bottom-up'")
+		sources = self.__vertices(sources)
+		if numpy is not None:
+			offsets = numpy.asarray(self.offsets)
+			step_functions = (self.__top_down_numpy, self.__bottom_up_numpy)
+			frontier = numpy.array(sources, dtype=numpy.int64)
+		else:
+			offsets = self.offsets
+			step_functions = (self.__top_down, self.__bottom_up)
+			frontier = array('q', sources)
+		for source in sources:
+			distances[source] = 0
+		unexplored = len(self.targets)
+		bottom_up = direction == 'bottom-up'
+		level = 0
+		while len(frontier):
+			yield frontier
+			if direction == 'optimizing':
+				frontier_edges = self.__edges_leaving(offsets, frontier)
+				unexplored -= frontier_edges
+				if not bottom_up and frontier_edges > unexplored / alpha:
+					bottom_up = True
+				elif bottom_up and len(frontier) < self.num_vertices / beta:
+					bottom_up = False
+			level += 1
+			frontier = step_functions[bottom_up](frontier, level, distances, parents)
+			if steps is not None:
+				steps.append('bottom-up' if bottom_up else 'top-down')
+
+	@staticmethod
+	def __edges_leaving(offsets, frontier):
+		if numpy is not None:
+			return int((offsets[frontier+1] - offsets[frontier]).sum())
+		return sum(offsets[vertex+1] - offsets[vertex] for vertex in frontier)
+
+	def __top_down(self, frontier, level, distances, parents):
+		following = array('q')
+		for vertex in frontier:
+			for target in self.neighbors(vertex):
+				if distances[target] < 0:
+					distances[target] = level
+					parents[target] = vertex
+					following.append(target)
+		return following
+
+	def __bottom_up(self, frontier, level, distances, parents):
+		reverse = self.transpose()
+		in_frontier = bytearray(self.num_vertices)
+		for vertex in frontier:
+			in_frontier[vertex] = 1
+		following = array('q')
+		for vertex in range(self.num_vertices):
+			if distances[vertex] >= 0:
+				continue
+			for source in reverse.neighbors(vertex):
+				if in_frontier[source]:
+					distances[vertex] = level
+					parents[vertex] = source
+					following.append(vertex)
+					break
+		return following
+
+	@staticmethod
+	def __gather(offsets, targets, vertices):
+		# the edges leaving vertices, as arrays of their tails and heads
+		starts = offsets[vertices]
+		counts = offsets[vertices+1] - starts
+		ends = numpy.cumsum(counts)
+		positions = numpy.arange(ends[-1] if len(ends) else 0) + numpy.repeat(starts - ends + counts, counts)
+		return numpy.repeat(vertices, counts), numpy.asarray(targets)[positions]
+
+	def __top_down_numpy(self, frontier, level, distances, parents):
+		tails, heads = self.__gather(numpy.asarray(self.offsets), self.targets, frontier)
+		unvisited = distances[heads] < 0
+		following, first = numpy.unique(heads[unvisited], return_index=True)
+		distances[following] = level
+		parents[following] = tails[unvisited][first]
+		return following
+
+	def __bottom_up_numpy(self, frontier, level, distances, parents):
+		reverse = self.transpose()
+		in_frontier = numpy.zeros(self.num_vertices, dtype=bool)
+		in_frontier[frontier] = True
+		unvisited = numpy.flatnonzero(distances < 0)
+		heads, tails = self.__gather(numpy.asarray(reverse.offsets), reverse.targets, unvisited)
+		found = in_frontier[tails]
+		following, first = numpy.unique(heads[found], return_index=True)
+		distances[following] = level
+		parents[following] = tails[found][first]
+		return following
+
+	def __vertices(self, vertices):
+		# one vertex, which may be a NumPy integer, or an iterable of them
+		try:
+			return [operator.index(vertices)]
+		except TypeError:
+			return list(dict.fromkeys(operator.index(vertex) for vertex in vertices))
+
+	def dijkstra(self, sources, targets=None, heuristic=None, bidirectional=False, engine='binary'):
+		"""
+		Shortest paths from the closest of sources, for non-negative weights.
+		We repeatedly settle the closest unsettled vertex and relax its edges,
+		keeping one handle per vertex in an indexed PriorityQueue so a shorter
+		path lowers the vertex's priority in place instead of pushing a
+		duplicate. With targets, we stop as soon as every target is settled.
+
+		heuristic(vertex) turns the search into A*: vertices are settled in
+		order of distance plus the heuristic's estimate of the distance left,
+		which steers the search towards the targets. The estimate must never
+		be more than the weight of an edge plus the estimate at its far end,
+		or the distances can come out too long.
+
+		With bidirectional=True we search forwards from the sources and
+		backwards from the targets at the same time, always growing the smaller
+		frontier, and stop once the two closest frontier vertices are together
+		no closer than the best path found where the searches meet. Only the
+		distances and predecessors along that path are exact.
+
+		Returns ShortestPaths, with the distance and predecessor of every
+		vertex. Vertices left unsettled by an early exit keep the length of the
+		best path seen to them, which is only an upper bound.
+		"""
+		sources = self.__vertices(sources)
+		targets = None if targets is None else self.__vertices(targets)
+		if bidirectional:
+			if targets is None:
+				raise ValueError('bidirectional search needs targets')
+			if heuristic is not None:
+				raise ValueError('bidirectional search does not take a heuristic')
+			return self.__bidirectional_dijkstra(sources, targets, engine)
+		paths = ShortestPaths(self.num_vertices)
+		distances = paths.distances
+		predecessors = paths.predecessors
+		settled = paths.settled
+		remaining = 0
+		is_target = bytearray(self.num_vertices)
+		for target in targets or ():
+			is_target[target] = 1
+			remaining += 1
+		queue = PriorityQueue(engine=engine)
+		handles = [None] * self.num_vertices
+		for source in sources:
+			distances[source] = 0
+			handles[source] = queue.push(source, 0 if heuristic is None else heuristic(source))
+		while queue:
+			vertex = queue.pop()
+			handles[vertex] = None
+			settled[vertex] = 1
+			paths.num_settled += 1
+			if is_target[vertex]:
+				remaining -= 1
+				if remaining == 0:
+					break
+			distance = distances[vertex]
+			for neighbor, weight in zip(self.neighbors(vertex), self.edge_weights(vertex)):
+				if settled[neighbor]:
+					continue
+				candidate = distance + weight
+				if candidate < distances[neighbor]:
+					distances[neighbor] = candidate
+					predecessors[neighbor] = vertex
+					priority = candidate if heuristic is None else candidate + heuristic(neighbor)
+					handle = handles[neighbor]
+					if handle is None:
+						handles[neighbor] = queue.push(int(neighbor), priority)
+					else:
+						queue.decrease_key(handle, priority)
+		return paths
+
+	def __bidirectional_dijkstra(self, sources, targets, engine):
+		paths = ShortestPaths(self.num_vertices)
+		# index 0 is the forward search over this graph from the sources, index
+		# 1 the backward search over the transpose from the targets, where the
+		# predecessors point towards the targets
+		graphs = (self, self.transpose())
+		distances = (paths.distances, array('d', [INFINITY]) * self.num_vertices)
+		predecessors = (paths.predecessors, array('q', [-1]) * self.num_vertices)
+		settled = (paths.settled, bytearray(self.num_vertices))
+		queues = (PriorityQueue(engine=engine), PriorityQueue(engine=engine))
+		handles = ([None] * self.num_vertices, [None] * self.num_vertices)
+		for side, starts in enumerate((sources, targets)):
+			for start in starts:
+				distances[side][start] = 0
+				handles[side][start] = queues[side].push(start, 0)
+		best = INFINITY
+		meeting = None
+		for source in sources:
+			if distances[1][source] == 0:
+				best = 0
+				meeting = (source, source, 0)
+		while queues[0] and queues[1]:
+			if queues[0].peek_priority() + queues[1].peek_priority() >= best:
+				break
+			side = 0 if len(queues[0]) <= len(queues[1]) else 1
+			other = 1 - side
+			vertex = queues[side].pop()
+			handles[side][vertex] = None
+			settled[side][vertex] = 1
+			paths.num_settled += 1
+			distance = distances[side][vertex]
+			graph = graphs[side]
+			for neighbor, weight in zip(graph.neighbors(vertex), graph.edge_weights(vertex)):
+				candidate = distance + weight
+				if candidate + distances[other][neighbor] < best:
+					best = candidate + distances[other][neighbor]
+					meeting = (vertex, int(neighbor), side)
+				if settled[side][neighbor] or candidate >= distances[side][neighbor]:
+					continue
+				distances[side][neighbor] = candidate
+				predecessors[side][neighbor] = vertex
+				handle = handles[side][neighbor]
+				if handle is None:
+					handles[side][neighbor] = queues[side].push(int(neighbor), candidate)
+				else:
+					queues[side].decrease_key(handle, candidate)
+		if meeting is not None:
+			# join the two halves into one forward path: the meeting edge, then
+			# the backward search's path to its target
+			vertex, neighbor, side = meeting
+			if side == 1:
+				vertex, neighbor = neighbor, vertex
+			if vertex != neighbor:
+				predecessors[0][neighbor] = vertex
+			paths.distances[neighbor] = best - distances[1][neighbor]
+			while predecessors[1][neighbor] != -1:
+				following = predecessors[1][neighbor]
+				predecessors[0][following] = neighbor
+				paths.distances[following] = best - distances[1][following]
+				neighbor = following
+		return paths
+
+	def bellmanford(self, sources, vectorized=False):
+		"""
+		Shortest paths from the closest of sources, allowing negative weights.
+		We keep a FIFO queue of the vertices whose distance changed and relax
+		only their edges, so a vertex is rescanned only when it has something
+		new to pass on (the Shortest Path Faster Algorithm). Every num_vertices
+		relaxations we look for a cycle among the predecessor links: one
+		appears as soon as a negative cycle has been walked round, usually long
+		before the num_vertices passes plain Bellman-Ford would need, and we
+		raise a NegativeCycleError holding it.
+
+		With vectorized=True we instead relax every edge at once with NumPy,
+		pass after pass, checking the predecessor links for a cycle with
+		pointer jumping whenever the number of passes reaches a power of two.
+
+		Returns ShortestPaths, where num_settled counts the vertex scans.
+		"""
+		sources = self.__vertices(sources)
+		if vectorized:
+			if numpy is None:
+				raise ImportError('vectorized bellmanford needs NumPy')
+			return self.__bellmanford_numpy(sources)
+		paths = ShortestPaths(self.num_vertices)
+		distances = paths.distances
+		predecessors = paths.predecessors
+		queue = deque(sources)
+		queued = bytearray(self.num_vertices)
+		for source in sources:
+			distances[source] = 0
+			queued[source] = 1
+		relaxations = 0
+		while queue:
+			vertex = queue.popleft()
+			queued[vertex] = 0
+			paths.num_settled += 1
+			distance = distances[vertex]
+			for neighbor, weight in zip(self.neighbors(vertex), self.edge_weights(vertex)):
+				candidate = distance + weight
+				if candidate < distances[neighbor]:
+					distances[neighbor] = candidate
+					predecessors[neighbor] = vertex
+					relaxations += 1
+					if relaxations % self.num_vertices == 0:
+						cycle = self.__predecessor_cycle(predecessors)
+						if cycle is not None:
+							raise NegativeCycleError(cycle)
+					if not queued[neighbor]:
+						queued[neighbor] = 1
+						queue.append(int(neighbor))
+		for vertex in range(self.num_vertices):
+			if distances[vertex] < INFINITY:
+				paths.settled[vertex] = 1
+		return paths
+
+	def __bellmanford_numpy(self, sources):
+		num_vertices = self.num_vertices
+		offsets = numpy.asarray(self.offsets)
+		tails = numpy.repeat(numpy.arange(num_vertices), numpy.diff(offsets))
+		heads = numpy.asarray(self.targets, dtype=numpy.int64)
+		if self.weights is None:
+			weights = numpy.ones(len(heads))
+		else:
+			weights = numpy.asarray(self.weights, dtype=numpy.float64)
+		distances = numpy.full(num_vertices, INFINITY)
+		distances[sources] = 0
+		predecessors = numpy.full(num_vertices, -1, dtype=numpy.int64)
+		passes = 0
+		while True:
+			candidates = distances[tails] + weights
+			relaxed = distances.copy()
+			numpy.minimum.at(relaxed, heads, candidates)
+			improved = relaxed < distances
+			if not improved.any():
+				break
+			# point every improved vertex at a tail that achieved its new distance
+			winners = improved[heads] & (candidates == relaxed[heads])
+			predecessors[heads[winners]] = tails[winners]
+			distances = relaxed
+			passes += 1
+			if passes & (passes - 1) == 0 or passes >= num_vertices:
+				vertex = self.__jump_to_cycle(predecessors)
+				if vertex is not None:
+					raise NegativeCycleError(self.__cycle_through(predecessors, vertex))
+		paths = ShortestPaths(num_vertices)
+		paths.distances = array('d', distances.tobytes())
+		paths.predecessors = array('q', predecessors.tobytes())
+		paths.settled = bytearray((distances < INFINITY).astype(numpy.uint8).tobytes())
+		paths.num_settled = (passes + 1) * num_vertices
+		return paths
+
+	@staticmethod
+	def __predecessor_cycle(predecessors):
+		# walk the predecessor links from every vertex, marking each walk with
+		# the vertex it started from, so meeting our own mark means a cycle
+		walks = array('q', [-1]) * len(predecessors)
+		for start in range(len(predecessors)):
+			vertex = start
+			while vertex != -1 and walks[vertex] == -1:
+				walks[vertex] = start
+				vertex = predecessors[vertex]
+			if vertex != -1 and walks[vertex] == start:
+				return Graph.__cycle_through(predecessors, vertex)
+		return None
+
+	@staticmethod
+	def __jump_to_cycle(predecessors):
+		# follow the predecessor links num_vertices times by repeated squaring;
+		# a walk that hasn't reached a vertex without a predecessor by then is
+		# going round a cycle, and ends on it
+		num_vertices = len(predecessors)
+		roots = predecessors < 0
+		jumps = numpy.where(roots, numpy.arange(num_vertices), predecessors)
+		for _ in range(max(num_vertices - 1, 1).bit_length()):
+			jumps = jumps[jumps]
+		cycling = numpy.flatnonzero(~roots[jumps])
+		if len(cycling) == 0:
+			return None
+		return int(jumps[cycling[0]])
+
+	@staticmethod
+	def __cycle_through(predecessors, vertex):
+		cycle = [vertex]
+		predecessor = int(predecessors[vertex])
+		while predecessor != vertex:
+			cycle.append(predecessor)
+			predecessor = int(predecessors[predecessor])
+		cycle.reverse()
+		return cycle
+
 	def minimum_spanning_tree(self):
-		return
+		"""
+		Edges of a minimum spanning forest of an undirected graph, as (u, v,
+		weight) tuples, grown with Prim's algorithm from every unvisited vertex.
+		"""
+		if self.directed:
+			raise ValueError('minimum spanning trees are only defined for undirected graphs')
+		visited = bytearray(self.num_vertices)
+		tree = []
+		for start in range(self.num_vertices):
+			if visited[start]:
+				continue
+			visited[start] = 1
+			heap = MinHeap(key=lambda edge: edge[0])
+			heap.push_many((weight, start, int(target)) for target, weight in zip(self.neighbors(start), self.edge_weights(start)))
+			while heap:
+				weight, vertex, target = heap.extract()
+				if visited[target]:
+					continue
+				visited[target] = 1
+				tree.append((vertex, target, weight))
+				heap.push_many((next_weight, target, int(next_target)) for next_target, next_weight in zip(self.neighbors(target), self.edge_weights(target)) if not visited[next_target])
+		return tree
 
-	# TODO
 	def check_for_cycle(self):
-		return
+		"""
+		Whether the graph has a cycle. An undirected graph has one exactly when
+		it has more edges than a spanning forest, num_vertices - components. For
+		a directed graph we look for an edge back to a vertex that is still on
+		the depth first search stack.
+		"""
+		if not self.directed:
+			return self.num_edges > self.num_vertices - self.count_connected_components()
+		offsets = self.offsets
+		targets = self.__targets
+		# 0 is unvisited, 1 is on the stack, 2 is finished
+		state = bytearray(self.num_vertices)
+		for start in range(self.num_vertices):
+			if state[start]:
+				continue
+			state[start] = 1
+			stack = [[start, offsets[start]]]
+			while stack:
+				frame = stack[-1]
+				vertex, edge = frame
+				if edge == offsets[vertex+1]:
+					state[vertex] = 2
+					stack.pop()
+					continue
+				frame[1] = edge + 1
+				target = int(targets[edge])
+				if state[target] == 1:
+					return True
+				if not state[target]:
+					state[target] = 1
+					stack.append([target, offsets[target]])
+		return False
 
-	# TODO
 	def topological_sort(self):
-		return
+		"""
+		Vertices of a directed acyclic graph ordered so every edge points
+		forward, with Kahn's algorithm: repeatedly take a vertex with no
+		remaining incoming edges. Raises a ValueError if there is a cycle.
+		"""
+		if not self.directed:
+			raise ValueError('topological sorts are only defined for directed graphs')
+		indegree = array('q', [0]) * self.num_vertices
+		for target in self.targets:
+			indegree[target] += 1
+		queue = deque(vertex for vertex in range(self.num_vertices) if indegree[vertex] == 0)
+		order = []
+		while queue:
+			vertex = queue.popleft()
+			order.append(vertex)
+			for target in self.neighbors(vertex):
+				indegree[target] -= 1
+				if indegree[target] == 0:
+					queue.append(int(target))
+		if len(order) < self.num_vertices:
+			raise ValueError('graph contains a cycle')
+		return order
 
-	# TODO
 	def count_connected_components(self):
-		return
+		"""
+		Number of connected components, ignoring edge direction. The first call
+		joins the endpoints of every edge in a DisjointSet, which add_edge then
+		keeps current, so later calls take O(1).
+		"""
+		return self.__component_sets().count
+
+	def same_component(self, first, second):
+		"""Whether first and second are connected, ignoring edge direction"""
+		return self.__component_sets().same(first, second)
+
+	def __component_sets(self):
+		if self.__components is None:
+			components = DisjointSet(self.num_vertices)
+			for source, target, _ in self.edges():
+				components.union(source, target)
+			self.__components = components
+		return self.__components
 
-	# TODO
 	def get_strongly_connected_components(self):
-		return
+		"""Strongly connected components of a directed graph, as lists of vertices, sinks first"""
+		return list(self.iter_strongly_connected_components())
+
+	def iter_strongly_connected_components(self):
+		"""
+		Yield the strongly connected components of a directed graph as lists
+		of vertices, each as soon as it is complete, with Tarjan's algorithm.
+		A depth first search numbers the vertices as it reaches them and tracks
+		the lowest number each one can get back to through its descendants and
+		the vertices still on the component stack; a vertex that can't get
+		back past itself is the root of a component, made of everything
+		pushed on the stack after it. The search keeps its own stack of
+		vertices and every vertex's next edge in arrays instead of recursing,
+		so long paths can't overflow the call stack. Components come out in
+		reverse topological order: no edge leaves a component for a later one.
+		"""
+		if not self.directed:
+			raise ValueError('strongly connected components are only defined for directed graphs')
+		# memoryviews index NumPy arrays as fast as array.arrays, yielding ints
+		offsets = memoryview(self.offsets)
+		targets = memoryview(self.targets)
+		numbers = array('q', [-1]) * self.num_vertices
+		lowlinks = array('q', [0]) * self.num_vertices
+		next_edges = array('q', offsets[:-1])
+		on_stack = bytearray(self.num_vertices)
+		stack = array('q')
+		calls = array('q')
+		counter = 0
+		for root in range(self.num_vertices):
+			if numbers[root] != -1:
+				continue
+			numbers[root] = lowlinks[root] = counter
+			counter += 1
+			stack.append(root)
+			on_stack[root] = 1
+			calls.append(root)
+			while calls:
+				vertex = calls[-1]
+				edge = next_edges[vertex]
+				end = offsets[vertex+1]
+				lowlink = lowlinks[vertex]
+				while edge < end:
+					target = targets[edge]
+					edge += 1
+					if numbers[target] == -1:
+						numbers[target] = lowlinks[target] = counter
+						counter += 1
+						stack.append(target)
+						on_stack[target] = 1
+						calls.append(target)
+						break
+					if on_stack[target] and numbers[target] < lowlink:
+						lowlink = numbers[target]
+				next_edges[vertex] = edge
+				lowlinks[vertex] = lowlink
+				if calls[-1] != vertex:
+					continue
+				calls.pop()
+				if calls and lowlink < lowlinks[calls[-1]]:
+					lowlinks[calls[-1]] = lowlink
+				if lowlink == numbers[vertex]:
+					component = []
+					while True:
+						member = stack.pop()
+						on_stack[member] = 0
+						component.append(member)
+						if member == vertex:
+							break
+					yield component
+
+	def strongly_connected_components(self, condensation=False):
+		"""
+		Component id of every vertex of a directed graph, numbered so that
+		every edge between components goes from a lower id to a higher one.
+		With condensation=True, also return the condensation: the directed
+		acyclic Graph with a vertex per component and an edge wherever the
+		graph has one between two components.
+		"""
+		ids = array('q', [0]) * self.num_vertices
+		num_components = 0
+		for component in self.iter_strongly_connected_components():
+			for vertex in component:
+				ids[vertex] = num_components
+			num_components += 1
+		# Tarjan finishes the sinks first, so count down to number in
+		# topological order
+		last = num_components - 1
+		for vertex in range(self.num_vertices):
+			ids[vertex] = last - ids[vertex]
+		numpy_backed = numpy is not None and isinstance(self.targets, numpy.ndarray)
+		if numpy_backed:
+			ids = numpy.frombuffer(ids, dtype=numpy.int64)
+		if not condensation:
+			return ids
+		if numpy_backed:
+			tails = ids[numpy.repeat(numpy.arange(self.num_vertices), numpy.diff(self.offsets))]
+			heads = ids[self.targets]
+			between = tails != heads
+			keys = numpy.unique(tails[between] * num_components + heads[between])
+			edges = numpy.column_stack((keys // num_components, keys % num_components))
+		else:
+			edges = sorted({(ids[source], ids[target]) for source, target, _ in self.edges() if ids[source] != ids[target]})
+		return ids, Graph.from_edges(edges, num_components, directed=True)
 
-	# TODO
 	def is_bipartite_graph(self):
-		return
-		
\ No newline at end of file
+		"""
+		Whether the vertices can be split into two sides with every edge
+		between the sides, ignoring edge direction. We two-color every
+		component breadth first and fail on an edge between equal colors.
+		"""
+		neighbors = self.__undirected_neighbors(self.transpose() if self.directed else None)
+		# 0 is uncolored, otherwise 1 or 2
+		color = bytearray(self.num_vertices)
+		for start in range(self.num_vertices):
+			if color[start]:
+				continue
+			color[start] = 1
+			queue = deque([start])
+			while queue:
+				vertex = queue.popleft()
+				for target in neighbors(vertex):
+					if not color[target]:
+						color[target] = 3 - color[vertex]
+						queue.append(int(target))
+					elif color[target] == color[vertex]:
+						return False
+		return True
@@ -1,75 +1,660 @@
+from copy import copy
+from itertools import count
+from operator import gt, lt
+
+ENGINES = ('binary', 'dary', 'pairing')
+
 class Heap:
-	# TODO
-	def __init__(self):
-		return
+	"""
+	Heap interface, implemented on an array. The engine is picked when the
+	heap is created: 'binary' and 'dary' store the heap in a flat list, where
+	the children of index i are at arity*i+1 to arity*i+arity, and 'pairing'
+	creates the matching PairingHeap subclass instead.
+	"""
+	__slots__ = ('heap', 'key', 'arity')
+
+	# sign of the insertion counter stored with keyed values, so values with
+	# equal keys come out in the order they were inserted; the counter is
+	# shared by every heap so entries stay unique when heaps are melded
+	_tiebreak = 1
+	_counter = count()
+
+	# the PairingHeap subclass to create for engine='pairing'
+	_pairing = None
+
+	def __new__(cls, *args, engine='binary', **kwargs):
+		if engine not in ENGINES:
+			raise ValueError(f'unknown heap engine {engine!r}, expected one of {ENGINES}')
+		if engine == 'pairing' and not issubclass(cls, PairingHeap):
+			cls = cls._pairing
+		return super().__new__(cls)
+
+	def __init__(self, arr=None, key=None, inplace=False, engine='binary', arity=4):
+		# with a key, the heap holds (key(value), tiebreak, value) entries
+		# instead of bare values, so we only call key once per value
+		if arity < 2:
+			raise ValueError('arity must be at least 2')
+		self.heap = []
+		self.key = key
+		self.arity = 2 if engine == 'binary' else arity
+		if arr is not None:
+			self.heapify(arr, inplace)
+
+	def __len__(self):
+		return len(self.heap)
+
+	def __iter__(self):
+		for _, entry in self._positions():
+			yield self._value(entry)
+
+	def __str__(self):
+		return str(list(self))
+
+	def __repr__(self):
+		return str(list(self))
+
+	def _above(self, a, b):
+		"""Whether a belongs above b in the heap"""
+		raise NotImplementedError
+
+	def _entry(self, value):
+		if self.key is None:
+			return value
+		return (self.key(value), self._tiebreak * next(self._counter), value)
+
+	def _value(self, entry):
+		if self.key is None:
+			return entry
+		return entry[2]
+
+	def _positions(self):
+		"""Every (position, entry) pair in the heap"""
+		return enumerate(self.heap)
+
+	def __sift_up(self, index, top=0):
+		heap = self.heap
+		above = self._above
+		arity = self.arity
+		value = heap[index]
+		while index > top:
+			parent = (index - 1) // arity
+			if not above(value, heap[parent]):
+				break
+			heap[index] = heap[parent]
+			index = parent
+		heap[index] = value
+
+	def __sift_down(self, index):
+		# Floyd's bottom-up sift: walk the hole down to a leaf, always promoting
+		# the child that belongs higher, then let the value climb back up. The
+		# value usually belongs near the bottom, so this saves about half the
+		# comparisons of checking it against every level on the way down
+		heap = self.heap
+		above = self._above
+		arity = self.arity
+		size = len(heap)
+		start = index
+		value = heap[index]
+		child = arity * index + 1
+		if arity == 2:
+			while child < size:
+				if child + 1 < size and above(heap[child+1], heap[child]):
+					child += 1
+				heap[index] = heap[child]
+				index = child
+				child = 2 * index + 1
+		else:
+			while child < size:
+				best = child
+				for other in range(child + 1, min(child + arity, size)):
+					if above(heap[other], heap[best]):
+						best = other
+				heap[index] = heap[best]
+				index = best
+				child = arity * index + 1
+		heap[index] = value
+		self.__sift_up(index, start)
+
+	def _fix(self, index, up=False):
+		"""
+		Restore the heap order after the entry at index changed. With up=True
+		the entry can only have moved towards the top.
+		"""
+		heap = self.heap
+		if up or (index > 0 and self._above(heap[index], heap[(index-1)//self.arity])):
+			self.__sift_up(index)
+		else:
+			self.__sift_down(index)
+
+	def _push_entries(self, entries):
+		if len(entries) < len(self.heap):
+			for entry in entries:
+				self.heap.append(entry)
+				self.__sift_up(len(self.heap) - 1)
+		else:
+			self.heap += entries
+			self.__build()
+
+	def _remove_at(self, index):
+		heap = self.heap
+		last = heap.pop()
+		if index == len(heap):
+			return self._value(last)
+		entry = heap[index]
+		heap[index] = last
+		self._fix(index)
+		return self._value(entry)
+
+	def insert(self, value):
+		"""Insert a value into the heap"""
+		self.heap.append(self._entry(value))
+		self.__sift_up(len(self.heap) - 1)
+
+	def push(self, value):
+		"""Insert a value into the heap"""
+		self.insert(value)
+
+	def push_many(self, values):
+		"""
+		Insert every value in values. If the batch is at least as big as the
+		heap, we append it and rebuild the whole heap in O(n), otherwise we sift
+		each value up on its own.
+		"""
+		self._push_entries([self._entry(value) for value in values])
 
-	# TODO
-	def __sift_up(self):
-		return
+	def meld(self, other):
+		"""
+		Move every value of other into this heap, leaving other empty. Heaps
+		with the same ordering and key hand over their entries as they are;
+		otherwise we push other's values. We only empty other once its values
+		are in this heap, so a failed meld doesn't lose them.
+		"""
+		self._check_meld(other)
+		if type(self)._above is type(other)._above and self.key is other.key:
+			entries = [entry for _, entry in other._positions()]
+		else:
+			entries = [self._entry(value) for value in other]
+		self._push_entries(entries)
+		other.clear()
 
-	# TODO
-	def insert(self):
-		return
+	def _check_meld(self, other):
+		if other is self:
+			raise ValueError("can't meld a heap with itself")
+		if isinstance(self, PriorityQueue) != isinstance(other, PriorityQueue):
+			raise TypeError("can't meld a PriorityQueue with a plain heap")
 
-	# TODO - could be class attribute
 	def get_size(self):
-		return
+		"""Number of values in the heap"""
+		return len(self)
 
-	# TODO - could be class attribute
 	def is_empty(self):
-		return
+		"""Whether the heap is empty"""
+		return len(self) == 0
+
+	def peek(self):
+		"""Value at the top of the heap"""
+		if not self.heap:
+			raise IndexError('peek from empty heap')
+		return self._value(self.heap[0])
+
+	def extract(self):
+		"""Remove and return the value at the top of the heap"""
+		if not self.heap:
+			raise IndexError('extract from empty heap')
+		last = self.heap.pop()
+		if not self.heap:
+			return self._value(last)
+		top = self.heap[0]
+		self.heap[0] = last
+		self.__sift_down(0)
+		return self._value(top)
+
+	def pop(self):
+		"""Remove and return the value at the top of the heap"""
+		return self.extract()
+
+	def pushpop(self, value):
+		"""Insert value and then remove and return the top, in one sift"""
+		entry = self._entry(value)
+		heap = self.heap
+		if heap and self._above(heap[0], entry):
+			entry, heap[0] = heap[0], entry
+			self.__sift_down(0)
+		return self._value(entry)
+
+	def replace(self, value):
+		"""Remove and return the top and then insert value, in one sift"""
+		if not self.heap:
+			raise IndexError('replace on empty heap')
+		top = self.heap[0]
+		self.heap[0] = self._entry(value)
+		self.__sift_down(0)
+		return self._value(top)
 
-	# TODO
 	def remove(self, value):
-		return
+		"""
+		Remove one occurrence of value. The heap isn't ordered by position, so
+		we have to scan for the value in O(n) before deleting it in O(log n);
+		use a PriorityQueue and its handles to remove in O(log n).
+		"""
+		for position, entry in self._positions():
+			if self._value(entry) == value:
+				self._remove_at(position)
+				return
+		raise ValueError(f'{value!r} not in heap')
 
-	# TODO
 	def delete(self, index):
-		return
+		"""Remove and return the value at position index of the heap in O(log n)"""
+		if index < 0:
+			index += len(self.heap)
+		if not 0 <= index < len(self.heap):
+			raise IndexError('heap index out of range')
+		return self._remove_at(index)
+
+	def clear(self):
+		"""Remove every value"""
+		self.heap = []
 
-	# TODO
-	def heapify(self, arr):
-		return
+	def heapify(self, arr, inplace=False):
+		"""
+		Replace the contents of the heap with arr in O(n). With inplace=True
+		and no key, a list is adopted as the heap's storage instead of copied.
+		"""
+		if self.key is not None:
+			self.heap = [self._entry(value) for value in arr]
+		elif inplace and isinstance(arr, list):
+			self.heap = arr
+		else:
+			self.heap = list(arr)
+		self.__build()
+
+	def __build(self):
+		for index in range((len(self.heap) - 2) // self.arity, -1, -1):
+			self.__sift_down(index)
 
-	# TODO
 	def heap_sort(self):
-		return
+		"""Values in the order they would be extracted, leaving the heap unchanged"""
+		clone = copy(self)
+		clone.clear()
+		clone._push_entries([entry for _, entry in self._positions()])
+		return [clone.extract() for _ in range(len(self))]
+
+class _PairingNode:
+	__slots__ = ('entry', 'child', 'sibling', 'prev')
+
+	def __init__(self, entry):
+		self.entry = entry
+		self.child = None
+		self.sibling = None
+		# parent if this is the leftmost child, otherwise the previous sibling
+		self.prev = None
+
+class PairingHeap(Heap):
+	"""
+	Pairing heap: a tree where every node belongs above its children, kept as
+	leftmost child and next sibling pointers. Inserting and melding link two
+	trees in O(1), moving an entry towards the top cuts its subtree and links
+	it back in O(1), and removing the top pairs up its children left to right
+	and then links the pairs right to left, in O(log n) amortized.
+	"""
+	__slots__ = ('root', 'size')
+
+	def __init__(self, arr=None, key=None, inplace=False, engine='pairing', arity=4):
+		self.root = None
+		self.size = 0
+		super().__init__(arr, key, inplace, engine, arity)
+
+	def __len__(self):
+		return self.size
+
+	def _positions(self):
+		if self.root is None:
+			return
+		stack = [self.root]
+		while stack:
+			node = stack.pop()
+			yield node, node.entry
+			if node.sibling is not None:
+				stack.append(node.sibling)
+			if node.child is not None:
+				stack.append(node.child)
+
+	def _track(self, node):
+		"""Called with every new node, so subclasses can remember where entries live"""
+		pass
+
+	def __link(self, a, b):
+		# make the root that belongs lower the leftmost child of the other
+		if self._above(b.entry, a.entry):
+			a, b = b, a
+		b.sibling = a.child
+		if a.child is not None:
+			a.child.prev = b
+		b.prev = a
+		a.child = b
+		return a
+
+	def __cut(self, node):
+		if node.prev.child is node:
+			node.prev.child = node.sibling
+		else:
+			node.prev.sibling = node.sibling
+		if node.sibling is not None:
+			node.sibling.prev = node.prev
+		node.prev = node.sibling = None
+
+	def __merge_pairs(self, first):
+		if first is None:
+			return None
+		pairs = []
+		while first is not None:
+			second = first.sibling
+			first.prev = first.sibling = None
+			if second is None:
+				pairs.append(first)
+				break
+			following = second.sibling
+			second.prev = second.sibling = None
+			pairs.append(self.__link(first, second))
+			first = following
+		root = pairs.pop()
+		while pairs:
+			root = self.__link(pairs.pop(), root)
+		return root
+
+	def __push_entry(self, entry):
+		node = _PairingNode(entry)
+		self._track(node)
+		self.root = node if self.root is None else self.__link(self.root, node)
+		self.size += 1
+
+	def __pop_entry(self):
+		root = self.root
+		self.root = self.__merge_pairs(root.child)
+		root.child = None
+		self.size -= 1
+		return root.entry
+
+	def _push_entries(self, entries):
+		for entry in entries:
+			self.__push_entry(entry)
+
+	def _fix(self, node, up=False):
+		if node is not self.root:
+			self.__cut(node)
+		elif up:
+			return
+		else:
+			self.root = None
+		if not up:
+			children = self.__merge_pairs(node.child)
+			node.child = None
+			if children is not None:
+				self.root = children if self.root is None else self.__link(self.root, children)
+		self.root = node if self.root is None else self.__link(self.root, node)
+
+	def _remove_at(self, node):
+		if node is self.root:
+			self.root = self.__merge_pairs(node.child)
+		else:
+			self.__cut(node)
+			children = self.__merge_pairs(node.child)
+			if children is not None:
+				self.root = self.__link(self.root, children)
+		node.child = None
+		self.size -= 1
+		return self._value(node.entry)
+
+	def insert(self, value):
+		"""Insert a value into the heap in O(1)"""
+		self.__push_entry(self._entry(value))
+
+	def meld(self, other):
+		"""Move every value of other into this heap in O(1), leaving other empty"""
+		self._check_meld(other)
+		if isinstance(other, PairingHeap) and type(self)._above is type(other)._above and self.key is other.key:
+			if other.root is not None:
+				self.root = other.root if self.root is None else self.__link(self.root, other.root)
+				self.size += other.size
+			other.clear()
+		else:
+			super().meld(other)
+
+	def peek(self):
+		"""Value at the top of the heap"""
+		if self.root is None:
+			raise IndexError('peek from empty heap')
+		return self._value(self.root.entry)
+
+	def extract(self):
+		"""Remove and return the value at the top of the heap"""
+		if self.root is None:
+			raise IndexError('extract from empty heap')
+		return self._value(self.__pop_entry())
+
+	def pushpop(self, value):
+		"""Insert value and then remove and return the top"""
+		entry = self._entry(value)
+		if self.root is not None and self._above(self.root.entry, entry):
+			top = self.__pop_entry()
+			self.__push_entry(entry)
+			return self._value(top)
+		return self._value(entry)
+
+	def replace(self, value):
+		"""Remove and return the top and then insert value"""
+		if self.root is None:
+			raise IndexError('replace on empty heap')
+		top = self.__pop_entry()
+		self.__push_entry(self._entry(value))
+		return self._value(top)
+
+	def delete(self, index):
+		"""Pairing heaps have no positions, so this always raises a TypeError"""
+		raise TypeError('pairing heaps have no positions, use remove() or a PriorityQueue handle')
+
+	def clear(self):
+		"""Remove every value"""
+		self.root = None
+		self.size = 0
+
+	def heapify(self, arr, inplace=False):
+		"""Replace the contents of the heap with arr in O(n)"""
+		self.clear()
+		self.push_many(arr)
+
+class Handle:
+	"""Entry in a PriorityQueue, returned by push"""
+	__slots__ = ('priority', 'value', 'index', 'order')
+
+	def __init__(self, priority, value, order):
+		self.priority = priority
+		self.value = value
+		self.order = order
+		# position in the heap (a node for the pairing engine), or None once
+		# the entry has left the queue
+		self.index = None
+
+	def __repr__(self):
+		return f'Handle({self.priority!r}, {self.value!r})'
+
+class _PositionList(list):
+	"""List of handles that keeps every handle's index up to date"""
+	def __init__(self, handles=()):
+		super().__init__(handles)
+		for index, handle in enumerate(self):
+			handle.index = index
+
+	def __setitem__(self, index, handle):
+		super().__setitem__(index, handle)
+		handle.index = index
+
+	def append(self, handle):
+		handle.index = len(self)
+		super().append(handle)
+
+	def __iadd__(self, handles):
+		for handle in handles:
+			self.append(handle)
+		return self
 
 class PriorityQueue(Heap):
-	# TODO
-	def __init__(self):
-		return
+	"""
+	Min heap of values ordered by priority, where push returns a handle to the
+	entry. Every handle knows its position in the heap, so we can change its
+	priority or remove it in O(log n) by sifting from that position instead of
+	searching for it or leaving a tombstone behind. Entries with equal
+	priorities come out in the order they were pushed.
+	"""
+	__slots__ = ()
+
+	def __init__(self, items=None, engine='binary', arity=4):
+		super().__init__(engine=engine, arity=arity)
+		self.heap = _PositionList()
+		if items is not None:
+			self.push_many(items)
+
+	def _above(self, a, b):
+		return (a.priority, a.order) < (b.priority, b.order)
+
+	def __handle(self, value, priority):
+		return Handle(priority, value, next(self._counter))
+
+	def __check(self, handle):
+		if handle not in self:
+			raise ValueError(f'{handle!r} is not in the queue')
+
+	def __contains__(self, handle):
+		index = handle.index
+		return isinstance(index, int) and index < len(self.heap) and self.heap[index] is handle
+
+	def push(self, value, priority):
+		"""Insert value with priority and return its handle"""
+		handle = self.__handle(value, priority)
+		super().insert(handle)
+		return handle
+
+	def insert(self, value, priority):
+		"""Insert value with priority and return its handle"""
+		return self.push(value, priority)
+
+	def push_many(self, items):
+		"""Insert every (value, priority) pair in items and return their handles"""
+		handles = [self.__handle(value, priority) for value, priority in items]
+		super().push_many(handles)
+		return handles
+
+	def clear(self):
+		"""Remove every entry"""
+		super().clear()
+		self.heap = _PositionList()
+
+	def heapify(self, items, inplace=False):
+		"""Replace the contents of the queue with the (value, priority) pairs in items"""
+		self.clear()
+		return self.push_many(items)
+
+	def peek(self):
+		"""Value with the smallest priority"""
+		return super().peek().value
+
+	def peek_priority(self):
+		"""Smallest priority in the queue"""
+		return super().peek().priority
+
+	def extract(self):
+		"""Remove and return the value with the smallest priority"""
+		handle = super().extract()
+		handle.index = None
+		return handle.value
+
+	def pushpop(self, value, priority):
+		"""Insert value and then remove and return the value with the smallest priority"""
+		handle = super().pushpop(self.__handle(value, priority))
+		handle.index = None
+		return handle.value
+
+	def replace(self, value, priority):
+		"""Remove and return the value with the smallest priority and then insert value"""
+		handle = super().replace(self.__handle(value, priority))
+		handle.index = None
+		return handle.value
+
+	def update_priority(self, handle, priority):
+		"""Change the priority of handle's entry in O(log n)"""
+		self.__check(handle)
+		up = priority < handle.priority
+		handle.priority = priority
+		self._fix(handle.index, up)
+
+	def decrease_key(self, handle, priority):
+		"""Lower the priority of handle's entry in O(log n)"""
+		self.__check(handle)
+		if handle.priority < priority:
+			raise ValueError(f'{priority!r} is greater than the current priority {handle.priority!r}')
+		self.update_priority(handle, priority)
+
+	def remove(self, handle):
+		"""Remove handle's entry from the queue in O(log n) and return its value"""
+		self.__check(handle)
+		self._remove_at(handle.index)
+		handle.index = None
+		return handle.value
+
+	def heap_sort(self):
+		"""Values in the order they would be extracted, leaving the queue unchanged"""
+		return [handle.value for handle in sorted(self, key=lambda handle: (handle.priority, handle.order))]
 
 class MinHeap(Heap):
-	# TODO
-	def __init__(self):
-		return
+	"""Heap with the smallest value on top"""
+	__slots__ = ()
 
-	# TODO
-	def __sift_down(self):
-		return
+	# a plain builtin, so the sifts compare without a Python-level call
+	_above = staticmethod(lt)
 
-	# TODO
 	def get_min(self):
-		return
+		"""Smallest value in the heap"""
+		return self.peek()
 
-	# TODO
-	def extract_max(self):
-		return
+	def extract_min(self):
+		"""Remove and return the smallest value in the heap"""
+		return self.extract()
 
 class MaxHeap(Heap):
-	# TODO
-	def __init__(self):
-		return
+	"""Heap with the largest value on top"""
+	__slots__ = ()
 
-	# TODO
-	def __sift_down(self):
-		return
+	_above = staticmethod(gt)
+	_tiebreak = -1
 
-	# TODO
 	def get_max(self):
-		return
+		"""Largest value in the heap"""
+		return self.peek()
 
-	# TODO
 	def extract_max(self):
-		return
\ No newline at end of file
+		"""Remove and return the largest value in the heap"""
+		return self.extract()
+
+class PairingPriorityQueue(PriorityQueue, PairingHeap):
+	"""PriorityQueue on a pairing heap, where every handle points at its node"""
+	__slots__ = ()
+
+	def __contains__(self, handle):
+		node = handle.index
+		return isinstance(node, _PairingNode) and node.entry is handle
+
+	def _track(self, node):
+		node.entry.index = node
+
+class MinPairingHeap(PairingHeap, MinHeap):
+	"""Pairing heap with the smallest value on top"""
+	__slots__ = ()
+
+class MaxPairingHeap(PairingHeap, MaxHeap):
+	"""Pairing heap with the largest value on top"""
+	__slots__ = ()
+
+Heap._pairing = PairingHeap
+PriorityQueue._pairing = PairingPriorityQueue
+MinHeap._pairing = MinPairingHeap
+MaxHeap._pairing = MaxPairingHeap
@@ -0,0 +1,263 @@
+from sorting import lower_bound, upper_bound, mergesort, merge
+
+class SortedList:
+	"""List that keeps its values sorted as they are added and removed"""
+	def __init__(self, values=None, load=1000):
+		# values live in a list of sorted sublists of between load/2 and
+		# 2*load values each, with the largest value of every sublist in
+		# self.__maxes so we can binary search for the right sublist, and a
+		# Fenwick tree over the sublist lengths to map positions to sublists
+		self.load = load
+		self.__lists = []
+		self.__maxes = []
+		self.__tree = [0]
+		self.__length = 0
+		if values is not None:
+			self.update(values)
+
+	def __len__(self):
+		return self.__length
+
+	def __iter__(self):
+		for sublist in self.__lists:
+			for value in sublist:
+				yield value
+
+	def __reversed__(self):
+		for sublist in reversed(self.__lists):
+			for value in reversed(sublist):
+				yield value
+
+	def __contains__(self, value):
+		pos = lower_bound(self.__maxes, value)
+		if pos == len(self.__maxes):
+			return False
+		sublist = self.__lists[pos]
+		index = lower_bound(sublist, value)
+		return sublist[index] == value
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			start, stop, step = index.indices(self.__length)
+			if step == 1:
+				return list(self.__iterate(start, stop))
+			return list(self)[index]
+		pos, offset = self.__locate(self.__normalize(index))
+		return self.__lists[pos][offset]
+
+	def __delitem__(self, index):
+		pos, offset = self.__locate(self.__normalize(index))
+		self.__delete(pos, offset)
+
+	def __str__(self):
+		return f'SortedList({list(self)})'
+
+	def __repr__(self):
+		return f'SortedList({list(self)})'
+
+	def __normalize(self, index):
+		if index < 0:
+			index += self.__length
+		if not 0 <= index < self.__length:
+			raise IndexError('SortedList index out of range')
+		return index
+
+	def __build_index(self):
+		# Fenwick tree: tree[i] holds the total length of the sublists in
+		# (i - lowbit(i), i], so prefix sums and updates take O(log m)
+		tree = [0] + [len(sublist) for sublist in self.__lists]
+		for i in range(1, len(tree)):
+			parent = i + (i & -i)
+			if parent < len(tree):
+				tree[parent] += tree[i]
+		self.__tree = tree
+
+	def __update_index(self, pos, delta):
+		tree = self.__tree
+		i = pos + 1
+		while i < len(tree):
+			tree[i] += delta
+			i += i & -i
+
+	def __prefix(self, pos):
+		# number of values in the sublists before sublist pos
+		tree = self.__tree
+		total = 0
+		while pos > 0:
+			total += tree[pos]
+			pos -= pos & -pos
+		return total
+
+	def __locate(self, index):
+		# sublist and offset of the value at position index
+		tree = self.__tree
+		pos = 0
+		step = 1 << (len(tree) - 1).bit_length()
+		while step:
+			if pos + step < len(tree) and tree[pos+step] <= index:
+				pos += step
+				index -= tree[pos]
+			step >>= 1
+		return pos, index
+
+	def __iterate(self, start, stop):
+		# values at positions start to stop
+		if start >= stop:
+			return
+		pos, offset = self.__locate(start)
+		remaining = stop - start
+		while remaining > 0:
+			sublist = self.__lists[pos]
+			for value in sublist[offset:offset+remaining]:
+				yield value
+			remaining -= len(sublist) - offset
+			pos += 1
+			offset = 0
+
+	def __delete(self, pos, offset):
+		sublist = self.__lists[pos]
+		del sublist[offset]
+		self.__length -= 1
+		if not sublist:
+			del self.__lists[pos]
+			del self.__maxes[pos]
+			self.__build_index()
+			return
+		self.__maxes[pos] = sublist[-1]
+		if len(sublist) < self.load // 2 and len(self.__lists) > 1:
+			# join the sublist with a neighbour, splitting again if too big
+			if pos == 0:
+				pos = 1
+			self.__lists[pos-1] += self.__lists[pos]
+			self.__maxes[pos-1] = self.__maxes[pos]
+			del self.__lists[pos]
+			del self.__maxes[pos]
+			self.__split(pos - 1)
+			self.__build_index()
+		else:
+			self.__update_index(pos, -1)
+
+	def __split(self, pos):
+		sublist = self.__lists[pos]
+		if len(sublist) <= 2 * self.load:
+			return False
+		half = len(sublist) // 2
+		self.__lists.insert(pos + 1, sublist[half:])
+		del sublist[half:]
+		self.__maxes.insert(pos, sublist[-1])
+		return True
+
+	def add(self, value):
+		"""Add value, after any values equal to it"""
+		self.__length += 1
+		if not self.__lists:
+			self.__lists.append([value])
+			self.__maxes.append(value)
+			self.__build_index()
+			return
+		pos = upper_bound(self.__maxes, value)
+		if pos == len(self.__maxes):
+			pos -= 1
+			self.__lists[pos].append(value)
+			self.__maxes[pos] = value
+		else:
+			sublist = self.__lists[pos]
+			sublist.insert(upper_bound(sublist, value), value)
+		if self.__split(pos):
+			self.__build_index()
+		else:
+			self.__update_index(pos, 1)
+
+	def update(self, values):
+		"""
+		Add every value in values, after any values equal to them, as add
+		would. We sort the batch once, stably; if it is large compared to the
+		list, we merge it with the current values and rebuild the sublists,
+		otherwise we add the values one at a time.
+		"""
+		values = list(values)
+		if len(values) * 4 < self.__length:
+			for value in values:
+				self.add(value)
+			return
+		mergesort(values, natural=True)
+		# merge takes from its right side on ties, so current values go there
+		values = merge(values, list(self))
+		load = self.load
+		self.__lists = [values[start:start+load] for start in range(0, len(values), load)]
+		self.__maxes = [sublist[-1] for sublist in self.__lists]
+		self.__length = len(values)
+		self.__build_index()
+
+	def remove(self, value):
+		"""Remove one occurrence of value, raising ValueError if it is missing"""
+		if not self.discard(value):
+			raise ValueError(f'{value!r} not in SortedList')
+
+	def discard(self, value):
+		"""Remove one occurrence of value if present, returning whether it was"""
+		pos = lower_bound(self.__maxes, value)
+		if pos == len(self.__maxes):
+			return False
+		offset = lower_bound(self.__lists[pos], value)
+		if self.__lists[pos][offset] != value:
+			return False
+		self.__delete(pos, offset)
+		return True
+
+	def pop(self, index=-1):
+		"""Remove and return the value at index"""
+		pos, offset = self.__locate(self.__normalize(index))
+		value = self.__lists[pos][offset]
+		self.__delete(pos, offset)
+		return value
+
+	def clear(self):
+		"""Remove every value"""
+		self.__lists = []
+		self.__maxes = []
+		self.__tree = [0]
+		self.__length = 0
+
+	def bisect_left(self, value):
+		"""Position of the first value not less than value"""
+		pos = lower_bound(self.__maxes, value)
+		if pos == len(self.__maxes):
+			return self.__length
+		return self.__prefix(pos) + lower_bound(self.__lists[pos], value)
+
+	def bisect_right(self, value):
+		"""Position just past the last value not greater than value"""
+		pos = upper_bound(self.__maxes, value)
+		if pos == len(self.__maxes):
+			return self.__length
+		return self.__prefix(pos) + upper_bound(self.__lists[pos], value)
+
+	def index(self, value):
+		"""Position of the first occurrence of value, raising ValueError if it is missing"""
+		position = self.bisect_left(value)
+		if position == self.__length or self[position] != value:
+			raise ValueError(f'{value!r} not in SortedList')
+		return position
+
+	def count(self, value):
+		"""Number of occurrences of value"""
+		return self.bisect_right(value) - self.bisect_left(value)
+
+	def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+		"""Iterate over the values between minimum and maximum, in order"""
+		if minimum is None:
+			start = 0
+		elif inclusive[0]:
+			start = self.bisect_left(minimum)
+		else:
+			start = self.bisect_right(minimum)
+		if maximum is None:
+			stop = self.__length
+		elif inclusive[1]:
+			stop = self.bisect_right(maximum)
+		else:
+			stop = self.bisect_left(maximum)
+		if reverse:
+			return reversed(list(self.__iterate(start, stop)))
+		return self.__iterate(start, stop)
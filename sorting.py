@@ -1,23 +1,154 @@
-from heap import MaxHeap
-from random import randint
-from copy import deepcopy
+from heap import MaxHeap, MinHeap
+from random import Random
+from itertools import chain, islice
+from array import array
+import json
+import logging
+import math
+import numbers
+import os
+import pickle
+import struct
 import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
 
-def unsort(arr):
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+INSERTION_SORT_THRESHOLD = 24
+NINTHER_THRESHOLD = 128
+PARTIAL_INSERTION_SORT_LIMIT = 8
+NEARLY_SORTED_RATIO = 16
+MIN_RUN = 32
+MIN_GALLOP = 7
+EXTERNAL_MEMORY_LIMIT = 64 * 1024 * 1024
+EXTERNAL_FAN_IN = 64
+EXTERNAL_BLOCK_SIZE = 1024
+PARALLEL_THRESHOLD = 100000
+SHUFFLE_FAN_OUT = 64
+SELECT_THRESHOLD = 16
+RADIX_THRESHOLD = 64
+
+# SortStats of the instrumented call in progress, if any
+__observer = None
+
+def unsort(arr, inplace=False, seed=None):
 	"""
-	We pick a random index in the array. Then, we pull out the value at that
-	index and save it in our result. Finally, we pop the last element in the 
-	array and move it into the random index. We repeat this until our original
-	array is empty and our result is full.
+	Fisher-Yates shuffle. We walk backwards through the array, and swap each
+	element with a randomly chosen element at or before it. Every permutation
+	is equally likely. By default we shuffle a shallow copy, so only the
+	references are copied, never the elements themselves; with inplace=True we
+	shuffle arr itself. seed may be a number or a random.Random instance, so
+	the same seed always produces the same shuffle.
 	"""
-	clone = deepcopy(arr)
-	to_return = []
-	for i in range(0, len(clone)):
-		index = randint(0, len(clone)-1)
-		to_return.append(clone[index])
-		clone[index] = clone[-1]
-		clone.pop()
-	return to_return
+	rng = __rng(seed)
+	if not inplace:
+		arr = list(arr)
+	for i in range(len(arr) - 1, 0, -1):
+		index = rng.randrange(i + 1)
+		arr[i], arr[index] = arr[index], arr[i]
+	return arr
+
+def reservoir_sample(iterable, k, seed=None):
+	"""
+	Pick k items uniformly at random from an iterable of unknown length,
+	holding only k items in memory. We fill a reservoir with the first k items.
+	Rather than rolling the dice for every item after that, we compute how many
+	items to skip before the next one that enters the reservoir (Li's
+	Algorithm L), so long streams are consumed in O(k(1 + log(n/k))) random
+	numbers. If there are fewer than k items, all of them are returned.
+	"""
+	rng = __rng(seed)
+	iterator = iter(iterable)
+	reservoir = list(islice(iterator, k))
+	if len(reservoir) < k or k == 0:
+		return unsort(reservoir, inplace=True, seed=rng)
+	weight = math.exp(math.log(__open_unit(rng)) / k)
+	while True:
+		skip = int(math.log(__open_unit(rng)) / math.log(1 - weight))
+		for item in islice(iterator, skip, skip + 1):
+			reservoir[rng.randrange(k)] = item
+			break
+		else:
+			return reservoir
+		weight *= math.exp(math.log(__open_unit(rng)) / k)
+
+def externalshuffle(iterable, memory_limit=EXTERNAL_MEMORY_LIMIT, fan_out=SHUFFLE_FAN_OUT, seed=None, tempdir=None):
+	"""
+	Shuffle a stream of records too big to fit in memory. We send every record
+	to one of fan_out temporary bucket files chosen at random, then load the
+	buckets one at a time, shuffle each in memory, and yield their records.
+	Since every record picks its bucket independently and every bucket is
+	shuffled uniformly, every permutation is equally likely. Buckets that are
+	still larger than memory_limit bytes are shuffled the same way again,
+	unless they hold a single record or no fewer records than the level
+	above, which can happen when records are as big as memory_limit; those
+	are shuffled in memory rather than split forever. If the whole input fits
+	in memory_limit, we just shuffle it in memory.
+	"""
+	if fan_out < 2:
+		raise ValueError('fan_out must be at least 2')
+	yield from __externalshuffle(iterable, memory_limit, fan_out, __rng(seed), tempdir)
+
+def __externalshuffle(iterable, memory_limit, fan_out, rng, tempdir):
+	iterator = iter(iterable)
+	chunk = []
+	used = 0
+	for value in iterator:
+		chunk.append(value)
+		used += sys.getsizeof(value) + 8
+		if used >= memory_limit:
+			break
+	else:
+		yield from unsort(chunk, inplace=True, seed=rng)
+		return
+	with tempfile.TemporaryDirectory(dir=tempdir) as directory:
+		buckets = []
+		blocks = [[] for _ in range(fan_out)]
+		counts = [0] * fan_out
+		for _ in range(fan_out):
+			descriptor, path = tempfile.mkstemp(dir=directory, suffix='.bucket')
+			buckets.append((path, os.fdopen(descriptor, 'wb')))
+		try:
+			for value in chain(chunk, iterator):
+				index = rng.randrange(fan_out)
+				counts[index] += 1
+				block = blocks[index]
+				block.append(value)
+				if len(block) == EXTERNAL_BLOCK_SIZE:
+					pickle.dump(block, buckets[index][1], pickle.HIGHEST_PROTOCOL)
+					block.clear()
+			for (path, bucket), block in zip(buckets, blocks):
+				if block:
+					pickle.dump(block, bucket, pickle.HIGHEST_PROTOCOL)
+		finally:
+			for path, bucket in buckets:
+				bucket.close()
+		del chunk, blocks
+		total = sum(counts)
+		for (path, _), count in zip(buckets, counts):
+			if count <= 1 or count == total:
+				# splitting again can't make this bucket any smaller
+				yield from unsort(list(__read_run(path)), inplace=True, seed=rng)
+			else:
+				yield from __externalshuffle(__read_run(path), memory_limit, fan_out, rng, directory)
+			os.remove(path)
+
+def __rng(seed):
+	return seed if isinstance(seed, Random) else Random(seed)
+
+def __open_unit(rng):
+	# uniform random number strictly between 0 and 1
+	value = rng.random()
+	while value == 0.0:
+		value = rng.random()
+	return value
 
 def binarysearch(arr, value):
 	"""
@@ -40,12 +171,167 @@ def __binarysearch(arr, value, lo, hi):
 		return __binarysearch(arr, value, lo, mid)
 	return __binarysearch(arr, value, mid+1, hi)
 
-def bubblesort(arr):
+def lower_bound(arr, value, lo=0, hi=None):
+	"""
+	Iterative binary search for the first index in arr[lo:hi] whose element is
+	not less than value, which is where value would be inserted to keep arr
+	sorted. If every element is less than value, we return hi.
+	"""
+	if hi is None:
+		hi = len(arr)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if arr[mid] < value:
+			lo = mid + 1
+		else:
+			hi = mid
+	return lo
+
+def upper_bound(arr, value, lo=0, hi=None):
+	"""
+	Iterative binary search for the first index in arr[lo:hi] whose element is
+	greater than value, which is just past the last element equal to value.
+	"""
+	if hi is None:
+		hi = len(arr)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if value < arr[mid]:
+			hi = mid
+		else:
+			lo = mid + 1
+	return lo
+
+def search_many(arr, queries, side='left'):
+	"""
+	Answer a batch of lower_bound (side='left') or upper_bound (side='right')
+	queries against the sorted arr in one pass. NumPy arrays are searched with
+	a single vectorized call. Otherwise we sort the queries and sweep through
+	arr once, galloping forward from the previous answer, so q queries cost
+	O(q log q + q log(n/q)) rather than O(q log n). The answers are returned in
+	the original order of the queries.
+	"""
+	if side not in ('left', 'right'):
+		raise ValueError("side must be 'left' or 'right'")
+	if numpy is not None and isinstance(arr, numpy.ndarray):
+		return numpy.searchsorted(arr, queries, side=side)
+	queries = list(queries)
+	order = sorted(range(len(queries)), key=queries.__getitem__)
+	gallop = __gallop_left if side == 'left' else __gallop_right
+	answers = [0] * len(queries)
+	position = 0
+	for index in order:
+		position = gallop(arr, queries[index], position, len(arr))
+		answers[index] = position
+	return answers
+
+class EytzingerLayout:
+	"""Sorted array stored in breadth-first order for cache friendly searches"""
+	def __init__(self, arr):
+		# slot k has children 2k and 2k+1, like a binary heap, so the first few
+		# levels that every search visits sit next to each other in memory
+		self.size = len(arr)
+		self.tree = [None] * (self.size + 1)
+		self.positions = [self.size] * (self.size + 1)
+		self.__build(arr)
+		self.__numpy_tree = None
+		if numpy is not None and isinstance(arr, numpy.ndarray) and arr.dtype.kind in 'iuf':
+			self.__build_numpy(arr)
+
+	def __len__(self):
+		return self.size
+
+	def __build(self, arr):
+		# an in-order walk of the implicit tree visits the slots in sorted order
+		stack = []
+		slot = 1
+		index = 0
+		while stack or slot <= self.size:
+			while slot <= self.size:
+				stack.append(slot)
+				slot *= 2
+			slot = stack.pop()
+			self.tree[slot] = arr[index]
+			self.positions[slot] = index
+			index += 1
+			slot = 2 * slot + 1
+
+	def __build_numpy(self, arr):
+		self.levels = self.size.bit_length()
+		tree = numpy.zeros(1 << self.levels, dtype=arr.dtype)
+		tree[1:self.size+1] = self.tree[1:]
+		positions = numpy.full(1 << (self.levels + 1), self.size, dtype=numpy.int64)
+		positions[1:self.size+1] = self.positions[1:]
+		self.__numpy_tree = tree
+		self.__numpy_positions = positions
+
+	def lower_bound(self, value):
+		"""Returns the index in the sorted array of the first element not less than value"""
+		tree = self.tree
+		size = self.size
+		slot = 1
+		while slot <= size:
+			slot = 2 * slot + (tree[slot] < value)
+		# undo the right turns taken after the last left turn
+		slot >>= (slot ^ (slot + 1)).bit_length()
+		return self.positions[slot]
+
+	def upper_bound(self, value):
+		"""Returns the index in the sorted array of the first element greater than value"""
+		tree = self.tree
+		size = self.size
+		slot = 1
+		while slot <= size:
+			slot = 2 * slot + (not value < tree[slot])
+		slot >>= (slot ^ (slot + 1)).bit_length()
+		return self.positions[slot]
+
+	def search_many(self, queries, side='left'):
+		"""Answers a batch of lower_bound or upper_bound queries"""
+		if side not in ('left', 'right'):
+			raise ValueError("side must be 'left' or 'right'")
+		if self.__numpy_tree is None:
+			search = self.lower_bound if side == 'left' else self.upper_bound
+			return [search(query) for query in queries]
+		# every query walks down the tree one level per vectorized step; a
+		# query that has already fallen off the tree keeps turning right,
+		# which the final shift undoes along with its other right turns
+		queries = numpy.asarray(queries)
+		slots = numpy.ones(len(queries), dtype=numpy.int64)
+		for _ in range(self.levels):
+			if side == 'left':
+				right = self.__numpy_tree[slots] < queries
+			else:
+				right = self.__numpy_tree[slots] <= queries
+			slots = 2 * slots + (right | (slots > self.size))
+		slots >>= numpy.log2((slots ^ (slots + 1)) + 1).astype(numpy.int64)
+		return self.__numpy_positions[slots]
+
+def __sort_by_key(arr, key, reverse, sort_fn):
+	# Decorate-sort-undecorate. We call key exactly once per element and sort
+	# (key, position) pairs, so the sort compares cached keys and never the
+	# values themselves, and equal keys keep their original order. For reverse
+	# we negate the positions and flip the result, which keeps equal keys in
+	# their original order too.
+	values = list(arr)
+	keys = values if key is None else [key(value) for value in values]
+	sign = -1 if reverse else 1
+	decorated = [(keys[index], sign * index) for index in range(len(values))]
+	sort_fn(decorated)
+	if reverse:
+		decorated.reverse()
+	for position, item in enumerate(decorated):
+		arr[position] = values[sign * item[1]]
+
+def bubblesort(arr, key=None, reverse=False):
 	"""
 	We iterate through each item in the array. If the item is bigger than the
 	item directly to the right of it, we swap the two elements. This causes the
 	smallest elements to "bubble" up to the front of the array.
 	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, bubblesort)
+		return
 	is_sorted = False
 	while not is_sorted:
 		is_sorted = True
@@ -54,7 +340,7 @@ def bubblesort(arr):
 				arr[i], arr[i+1] = arr[i+1], arr[i]
 				is_sorted = False
 
-def bubblesort_improved(arr):
+def bubblesort_improved(arr, key=None, reverse=False):
 	"""
 	Bubble sort iterates through the whole array over and over. With each
 	iteration, we can observe that the greatest element gets slotted into the
@@ -62,6 +348,9 @@ def bubblesort_improved(arr):
 	of n numbers, we only need to compare the first n-1 numbers; we can shrink
 	the end index by one during each iteration.
 	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, bubblesort_improved)
+		return
 	is_sorted = False
 	last_unsorted = len(arr) - 1
 	while not is_sorted:
@@ -72,12 +361,15 @@ def bubblesort_improved(arr):
 				is_sorted = False
 		last_unsorted -= 1
 
-def cocktailshakersort(arr):
+def cocktailshakersort(arr, key=None, reverse=False):
 	"""
 	Improving on bubblesort_improved, we can use the same strategy with the
 	start index, so the elements of the array bubble up and down with each
 	iteration, effectively shrinking our unsorted portion on both ends.
 	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, cocktailshakersort)
+		return
 	is_sorted = False
 	start_index = 0
 	end_index = len(arr) - 1
@@ -94,7 +386,7 @@ def cocktailshakersort(arr):
 				is_sorted = False
 		start_index += 1
 
-def insertionsort(arr):
+def insertionsort(arr, key=None, reverse=False):
 	"""
 	We segment the array into two portions: sorted and unsorted. Initially, the
 	sorted section is just the first element in the array. Then, we take an
@@ -103,6 +395,9 @@ def insertionsort(arr):
 	then shifting the sorted portion up by one before inserting the element
 	back into its correct index.
 	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, insertionsort)
+		return
 	for i in range(1, len(arr)):
 		temp = arr[i]
 		slot = i
@@ -111,16 +406,31 @@ def insertionsort(arr):
 			slot -= 1
 		arr[slot] = temp
 
-def mergesort(arr):
+def mergesort(arr, natural=False, key=None, reverse=False):
 	"""
 	This algorithm builds off the concept of merging arrays. Merging two sorted
 	arrays is easy; we use two pointers, one per array, and merge the arrays 
 	by iterating through each one. Building off of this, we can split our input
 	array down into subarrays of size one, and then go about merging them like
 	we would two larger, sorted arrays.
+
+	With natural=True we instead sort bottom-up without recursion or slicing.
+	We walk the array once to find the runs that are already in order,
+	reversing the ones that are strictly descending and extending short ones
+	to MIN_RUN elements with an insertion sort. Then we merge neighbouring runs
+	pairwise until only one is left. Every merge copies the smaller run into a
+	single buffer that is allocated once up front, and once one run keeps
+	winning we "gallop" ahead with an exponential search instead of comparing
+	element by element. Mostly sorted input is sorted in close to O(n).
 	"""
-	for index, value in enumerate(__mergesort(arr)):
-		arr[index] = value
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, lambda data: mergesort(data, natural=natural))
+		return
+	if natural:
+		__naturalmergesort(arr)
+	else:
+		for index, value in enumerate(__mergesort(arr)):
+			arr[index] = value
 
 def __mergesort(arr):
 	if len(arr) <= 1:
@@ -144,11 +454,486 @@ def merge(left, right):
 	result += right[right_pointer:]
 	return result
 
+def kway_merge(*iterables, key=None, loser_tree=False):
+	"""
+	Lazily merge any number of sorted iterables into one sorted stream. We
+	only ever hold the head of each input, in a MinHeap of (key, input index,
+	value) entries; the smallest head is yielded and replaced by the next
+	value from the same input, which costs one sift. Equal values come out in
+	the order of the inputs they came from, so the merge is stable.
+
+	With loser_tree=True we use a tournament tree instead. Every internal node
+	remembers the loser of the match played there and the overall winner sits
+	on top, so replacing the winner only replays the matches on the path from
+	its leaf to the root: exactly log2(k) comparisons, against about twice
+	that for a heap, which pays off at very high fan-in.
+	"""
+	iterators = [iter(iterable) for iterable in iterables]
+	if loser_tree:
+		return __kway_merge_losertree(iterators, key)
+	return __kway_merge_heap(iterators, key)
+
+def __kway_merge_heap(iterators, key):
+	heads = []
+	for index, iterator in enumerate(iterators):
+		for value in iterator:
+			heads.append((value if key is None else key(value), index, value))
+			break
+	heap = MinHeap(heads, inplace=True)
+	while len(heap) > 1:
+		_, index, value = heap.peek()
+		yield value
+		for value in iterators[index]:
+			heap.replace((value if key is None else key(value), index, value))
+			break
+		else:
+			heap.extract()
+	if heap:
+		# only one input left, so there is nothing to compare against
+		_, index, value = heap.peek()
+		yield value
+		yield from iterators[index]
+
+def __kway_merge_losertree(iterators, key):
+	k = len(iterators)
+	if k == 0:
+		return
+	keys = [None] * k
+	values = [None] * k
+	done = [False] * k
+
+	def advance(index):
+		for value in iterators[index]:
+			keys[index] = value if key is None else key(value)
+			values[index] = value
+			return
+		keys[index] = values[index] = None
+		done[index] = True
+
+	def beats(a, b):
+		# whether input a's head comes out before input b's, with exhausted
+		# inputs losing every match and ties going to the earlier input
+		if done[a] or done[b]:
+			return done[b] and (not done[a] or a < b)
+		return keys[a] < keys[b] or (not keys[b] < keys[a] and a < b)
+
+	for index in range(k):
+		advance(index)
+	# node i has children 2i and 2i+1, and input i is the leaf at k+i
+	losers = [0] * k
+	winners = [0] * k + list(range(k))
+	for node in range(k - 1, 0, -1):
+		a, b = winners[2*node], winners[2*node+1]
+		if beats(a, b):
+			winners[node], losers[node] = a, b
+		else:
+			winners[node], losers[node] = b, a
+	winner = winners[1] if k > 1 else 0
+	while not done[winner]:
+		yield values[winner]
+		advance(winner)
+		node = (winner + k) >> 1
+		while node:
+			if beats(losers[node], winner):
+				losers[node], winner = winner, losers[node]
+			node >>= 1
+
+def __naturalmergesort(arr):
+	n = len(arr)
+	if n < 2:
+		return
+	bounds = [0]
+	start = 0
+	while start < n:
+		end = start + 1
+		if end < n and arr[end] < arr[start]:
+			while end + 1 < n and arr[end+1] < arr[end]:
+				end += 1
+			end += 1
+			__reverse_range(arr, start, end)
+		else:
+			while end < n and not arr[end] < arr[end-1]:
+				end += 1
+		if end - start < MIN_RUN and end < n:
+			sorted_end = end
+			end = min(start + MIN_RUN, n)
+			__binary_insertionsort_range(arr, start, end, sorted_end)
+		bounds.append(end)
+		start = end
+
+	buffer = [None] * (n // 2 + 1)
+	while len(bounds) > 2:
+		merged = [0]
+		for index in range(2, len(bounds), 2):
+			__merge_runs(arr, buffer, bounds[index-2], bounds[index-1], bounds[index])
+			merged.append(bounds[index])
+		if len(bounds) % 2 == 0:
+			merged.append(bounds[-1])
+		bounds = merged
+
+def __binary_insertionsort_range(arr, start, end, sorted_end):
+	# arr[start:sorted_end] is already sorted; insert the rest after any equal
+	# elements so the sort stays stable
+	for i in range(sorted_end, end):
+		temp = arr[i]
+		lo = start
+		hi = i
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if temp < arr[mid]:
+				hi = mid
+			else:
+				lo = mid + 1
+		for slot in range(i, lo, -1):
+			arr[slot] = arr[slot-1]
+		arr[lo] = temp
+
+def __reverse_range(arr, start, end):
+	end -= 1
+	while start < end:
+		arr[start], arr[end] = arr[end], arr[start]
+		start += 1
+		end -= 1
+
+def __merge_runs(arr, buffer, lo, mid, hi):
+	# elements at the start of the left run and the end of the right run may
+	# already be in their final positions
+	lo = __gallop_right(arr, arr[mid], lo, mid)
+	if lo == mid:
+		return
+	hi = __gallop_left(arr, arr[mid-1], mid, hi, from_right=True)
+	if mid - lo <= hi - mid:
+		__merge_lo(arr, buffer, lo, mid, hi)
+	else:
+		__merge_hi(arr, buffer, lo, mid, hi)
+
+def __merge_lo(arr, buffer, lo, mid, hi):
+	# copy the left run into the buffer and merge from the front
+	left_length = mid - lo
+	for index in range(left_length):
+		buffer[index] = arr[lo+index]
+	left = 0
+	right = mid
+	dest = lo
+	left_wins = right_wins = 0
+	while left < left_length and right < hi:
+		if arr[right] < buffer[left]:
+			arr[dest] = arr[right]
+			dest += 1
+			right += 1
+			right_wins += 1
+			left_wins = 0
+			if right_wins >= MIN_GALLOP:
+				end = __gallop_left(arr, buffer[left], right, hi)
+				while right < end:
+					arr[dest] = arr[right]
+					dest += 1
+					right += 1
+				right_wins = 0
+		else:
+			arr[dest] = buffer[left]
+			dest += 1
+			left += 1
+			left_wins += 1
+			right_wins = 0
+			if left_wins >= MIN_GALLOP and right < hi:
+				end = __gallop_right(buffer, arr[right], left, left_length)
+				while left < end:
+					arr[dest] = buffer[left]
+					dest += 1
+					left += 1
+				left_wins = 0
+	while left < left_length:
+		arr[dest] = buffer[left]
+		dest += 1
+		left += 1
+
+def __merge_hi(arr, buffer, lo, mid, hi):
+	# copy the right run into the buffer and merge from the back
+	right_length = hi - mid
+	for index in range(right_length):
+		buffer[index] = arr[mid+index]
+	left = mid - 1
+	right = right_length - 1
+	dest = hi - 1
+	left_wins = right_wins = 0
+	while left >= lo and right >= 0:
+		if buffer[right] < arr[left]:
+			arr[dest] = arr[left]
+			dest -= 1
+			left -= 1
+			left_wins += 1
+			right_wins = 0
+			if left_wins >= MIN_GALLOP and left >= lo:
+				start = __gallop_right(arr, buffer[right], lo, left + 1, from_right=True)
+				while left >= start:
+					arr[dest] = arr[left]
+					dest -= 1
+					left -= 1
+				left_wins = 0
+		else:
+			arr[dest] = buffer[right]
+			dest -= 1
+			right -= 1
+			right_wins += 1
+			left_wins = 0
+			if right_wins >= MIN_GALLOP and right >= 0:
+				start = __gallop_left(buffer, arr[left], 0, right + 1, from_right=True)
+				while right >= start:
+					arr[dest] = buffer[right]
+					dest -= 1
+					right -= 1
+				right_wins = 0
+	while right >= 0:
+		arr[dest] = buffer[right]
+		dest -= 1
+		right -= 1
+
+def __gallop_left(arr, value, lo, hi, from_right=False):
+	# first index in arr[lo:hi] whose element is not less than value, found by
+	# probing 1, 2, 4, 8... elements in from one end and then binary searching
+	last = 0
+	offset = 1
+	if from_right:
+		while hi - offset >= lo and not arr[hi-offset] < value:
+			last = offset
+			offset *= 2
+		lo, hi = max(lo, hi - offset + 1), hi - last
+	else:
+		while lo + offset - 1 < hi and arr[lo+offset-1] < value:
+			last = offset
+			offset *= 2
+		lo, hi = lo + last, min(hi, lo + offset - 1)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if arr[mid] < value:
+			lo = mid + 1
+		else:
+			hi = mid
+	return lo
+
+def __gallop_right(arr, value, lo, hi, from_right=False):
+	# first index in arr[lo:hi] whose element is greater than value
+	last = 0
+	offset = 1
+	if from_right:
+		while hi - offset >= lo and value < arr[hi-offset]:
+			last = offset
+			offset *= 2
+		lo, hi = max(lo, hi - offset + 1), hi - last
+	else:
+		while lo + offset - 1 < hi and not value < arr[lo+offset-1]:
+			last = offset
+			offset *= 2
+		lo, hi = lo + last, min(hi, lo + offset - 1)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if value < arr[mid]:
+			hi = mid
+		else:
+			lo = mid + 1
+	return lo
+
+def externalsort(iterable, key=None, memory_limit=EXTERNAL_MEMORY_LIMIT, fan_in=EXTERNAL_FAN_IN, tempdir=None):
+	"""
+	External merge sort for inputs that do not fit in memory. We read the
+	input as a stream and collect values until their estimated size reaches
+	memory_limit bytes. Each chunk is sorted in memory with the natural merge
+	sort and spilled to a temporary file as a sorted "run" of pickled blocks.
+	If there are more than fan_in runs, we merge them fan_in at a time into
+	longer runs until there are few enough. Finally, we kway_merge the
+	remaining runs, which holds only the head of every run, and yield the
+	values in order, so the output is never held in memory either. The sort is
+	stable.
+	"""
+	if fan_in < 2:
+		raise ValueError('fan_in must be at least 2')
+	with tempfile.TemporaryDirectory(dir=tempdir) as directory:
+		runs = []
+		chunk = []
+		used = 0
+		for value in iterable:
+			chunk.append(value)
+			used += sys.getsizeof(value) + 8
+			if used >= memory_limit:
+				mergesort(chunk, natural=True, key=key)
+				runs.append(__write_run(directory, chunk))
+				chunk = []
+				used = 0
+		if not runs:
+			mergesort(chunk, natural=True, key=key)
+			yield from chunk
+			return
+		if chunk:
+			mergesort(chunk, natural=True, key=key)
+			runs.append(__write_run(directory, chunk))
+		del chunk
+
+		while len(runs) > fan_in:
+			merged = []
+			for start in range(0, len(runs), fan_in):
+				group = runs[start:start+fan_in]
+				if len(group) == 1:
+					merged.append(group[0])
+					continue
+				merged.append(__write_run(directory, __merge_run_files(group, key)))
+				for path in group:
+					os.remove(path)
+			runs = merged
+		yield from __merge_run_files(runs, key)
+
+def __write_run(directory, values):
+	descriptor, path = tempfile.mkstemp(dir=directory, suffix='.run')
+	with os.fdopen(descriptor, 'wb') as run:
+		block = []
+		for value in values:
+			block.append(value)
+			if len(block) == EXTERNAL_BLOCK_SIZE:
+				pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+				block = []
+		if block:
+			pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+	return path
+
+def __read_run(path):
+	with open(path, 'rb') as run:
+		while True:
+			try:
+				block = pickle.load(run)
+			except EOFError:
+				return
+			yield from block
+
+def __merge_run_files(paths, key):
+	# kway_merge breaks ties by input index, and runs are in input order, so
+	# the merge is stable
+	readers = [__read_run(path) for path in paths]
+	try:
+		yield from kway_merge(*readers, key=key)
+	finally:
+		for reader in readers:
+			reader.close()
+
+def parallel_sort(arr, workers=None, key=None, reverse=False):
+	"""
+	Sort using several processes. We split the array into one partition per
+	worker, sort the partitions concurrently in a process pool with the hybrid
+	sort, and then merge the sorted partitions back into the array with a
+	k-way merge. Arrays of plain ints or floats are handed to the workers
+	through a shared memory buffer, so each partition is sorted in place
+	instead of being pickled to the worker and back. Other values are pickled;
+	with a key function only the keys and their positions are sent. Below
+	PARALLEL_THRESHOLD elements the overhead is not worth it and we sort
+	serially.
+	"""
+	n = len(arr)
+	workers = workers or os.cpu_count() or 1
+	if workers < 2 or n < PARALLEL_THRESHOLD:
+		sort(arr, key=key, reverse=reverse)
+		return
+	ProcessPoolExecutor, shared_memory = __import_multiprocessing()
+	bounds = [n * index // workers for index in range(workers + 1)]
+	typecode = __shared_typecode(arr) if key is None else None
+	if reverse and typecode == 'd':
+		# equal floats can still differ, like 0.0 and -0.0, so keep them stable
+		typecode = None
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		if typecode:
+			itemsize = array(typecode).itemsize
+			block = shared_memory.SharedMemory(create=True, size=n * itemsize)
+			try:
+				view = block.buf.cast(typecode)
+				view[:] = array(typecode, arr)
+				futures = [executor.submit(__sort_shared_partition, block.name, typecode, bounds[index], bounds[index+1]) for index in range(workers)]
+				for future in futures:
+					future.result()
+				partitions = [view[bounds[index]:bounds[index+1]].tolist() for index in range(workers)]
+				view.release()
+			finally:
+				block.close()
+				block.unlink()
+			for index, value in enumerate(kway_merge(*partitions)):
+				arr[index] = value
+		elif key is not None or reverse:
+			# negated positions keep equal keys in input order once the merged
+			# result is reversed, as in __sort_by_key
+			sign = -1 if reverse else 1
+			values = list(arr)
+			keys = values if key is None else [key(value) for value in values]
+			decorated = [(keys[index], sign * index) for index in range(n)]
+			futures = [executor.submit(__sort_partition, decorated[bounds[index]:bounds[index+1]]) for index in range(workers)]
+			for index, item in enumerate(kway_merge(*[future.result() for future in futures])):
+				arr[index] = values[sign * item[1]]
+		else:
+			futures = [executor.submit(__sort_partition, arr[bounds[index]:bounds[index+1]]) for index in range(workers)]
+			for index, value in enumerate(kway_merge(*[future.result() for future in futures])):
+				arr[index] = value
+	if reverse:
+		arr.reverse()
+
+def __sort_partition(partition):
+	sort(partition)
+	return partition
+
+def __sort_shared_partition(name, typecode, start, end):
+	_, shared_memory = __import_multiprocessing()
+	block = shared_memory.SharedMemory(name=name)
+	try:
+		view = block.buf.cast(typecode)
+		partition = view[start:end].tolist()
+		sort(partition)
+		view[start:end] = array(typecode, partition)
+		view.release()
+	finally:
+		block.close()
+
+def __shared_typecode(arr):
+	# 'q' for 64 bit ints and 'd' for floats, or None if the values can't be
+	# stored in a shared buffer without changing them
+	types = set(map(type, arr))
+	if types == {int}:
+		try:
+			array('q', arr)
+		except OverflowError:
+			return None
+		return 'q'
+	if types == {float}:
+		return 'd'
+	return None
+
+__multiprocessing = None
+__multiprocessing_lock = threading.Lock()
+
+def __import_multiprocessing():
+	# queue.py in this directory shadows the standard library queue module
+	# that multiprocessing depends on, so we hide this directory from the
+	# import path while multiprocessing loads. That rewrites the global
+	# sys.path and sys.modules, so we do it once, under a lock; other threads
+	# importing at the same moment can still see the rewritten path
+	global __multiprocessing
+	with __multiprocessing_lock:
+		if __multiprocessing is None:
+			here = os.path.dirname(os.path.abspath(__file__))
+			path = sys.path[:]
+			local_queue = sys.modules.pop('queue', None)
+			sys.path[:] = [entry for entry in path if os.path.abspath(entry or os.curdir) != here]
+			try:
+				from concurrent.futures import process
+				from multiprocessing import shared_memory
+			finally:
+				sys.path[:] = path
+				if local_queue is not None:
+					sys.modules['queue'] = local_queue
+				else:
+					sys.modules.pop('queue', None)
+			__multiprocessing = (process.ProcessPoolExecutor, shared_memory)
+	return __multiprocessing
+
 # TODO
 def shellsort(arr):
 	return
 
-def quicksort(arr):
+def quicksort(arr, threeway=False, key=None, reverse=False):
 	"""
 	Basic quick sort implementation. We start by designating the last item in
 	our array as the "pivot." Then, we segment the portion of our array before
@@ -160,8 +945,26 @@ def quicksort(arr):
 	than the pivot, while all the elements after the pivot are greater. We then
 	repeat this process with the subarrays before and after our pivot until the
 	whole array is sorted.
+
+	With threeway=True we instead pick the pivot with a median of three (or a
+	ninther for large ranges) and partition the range into three parts: less
+	than, equal to, and greater than the pivot. Everything equal to the pivot is
+	done, so arrays with many duplicate values sort quickly. Instead of
+	recursing, we keep the ranges still to be sorted on an explicit stack,
+	pushing the larger side and continuing with the smaller one, so the stack
+	never holds more than O(log n) ranges. The pivot choice is deterministic,
+	so an adversary that picks values as they are compared (McIlroy's
+	antiqsort) can make every partition lopsided; like introsort, we heapsort
+	any range that is still being partitioned 2 log n levels deep, which
+	keeps the worst case at O(n log n).
 	"""
-	__quicksort(arr, 0, len(arr)-1)
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, lambda data: quicksort(data, threeway=threeway))
+		return
+	if threeway:
+		__quicksort3(arr)
+	else:
+		__quicksort(arr, 0, len(arr)-1)
 
 def __quicksort(arr, start, end):
 	if start >= end:
@@ -181,9 +984,66 @@ def __quicksort(arr, start, end):
 			range_end -= 1
 		else:
 			range_start += 1
+	if __observer is not None:
+		__observer.partition(range_end - start + 1, end - range_end - 1)
 	__quicksort(arr, start, range_end)
 	__quicksort(arr, range_end+2, end)
 
+def __quicksort3(arr):
+	stack = [(0, len(arr)-1, 2 * max(len(arr), 1).bit_length())]
+	while stack:
+		start, end, depth = stack.pop()
+		while end - start >= INSERTION_SORT_THRESHOLD:
+			if depth == 0:
+				__heapsort_range(arr, start, end+1)
+				break
+			depth -= 1
+			pivot = arr[__choose_pivot(arr, start, end)]
+			# arr[start:lt] < pivot, arr[lt:i] == pivot, arr[gt+1:end+1] > pivot
+			lt = i = start
+			gt = end
+			while i <= gt:
+				value = arr[i]
+				if value < pivot:
+					arr[lt], arr[i] = value, arr[lt]
+					lt += 1
+					i += 1
+				elif pivot < value:
+					arr[gt], arr[i] = value, arr[gt]
+					gt -= 1
+				else:
+					i += 1
+			if __observer is not None:
+				__observer.partition(lt - start, end - gt)
+			if lt - start < end - gt:
+				stack.append((gt+1, end, depth))
+				end = lt - 1
+			else:
+				stack.append((start, lt-1, depth))
+				start = gt + 1
+		else:
+			__insertionsort_range(arr, start, end+1)
+
+def __choose_pivot(arr, start, end):
+	mid = (start + end) // 2
+	if end - start < NINTHER_THRESHOLD:
+		return __median3(arr, start, mid, end)
+	step = (end - start) // 8
+	return __median3(arr,
+		__median3(arr, start, start + step, start + 2*step),
+		__median3(arr, mid - step, mid, mid + step),
+		__median3(arr, end - 2*step, end - step, end))
+
+def __median3(arr, a, b, c):
+	# index of the median of arr[a], arr[b], arr[c]
+	if arr[a] < arr[b]:
+		if arr[b] < arr[c]:
+			return b
+		return c if arr[a] < arr[c] else a
+	if arr[a] < arr[c]:
+		return a
+	return c if arr[b] < arr[c] else b
+
 # TODO
 def selectionsort(arr):
 	return
@@ -192,30 +1052,769 @@ def selectionsort(arr):
 def doubleselectionsort(arr):
 	return
 
-# TODO
-def heapsort(arr):
-	return
+def heapsort(arr, arity=2, key=None, reverse=False):
+	"""
+	In-place heap sort. We first turn the array into a max heap, where every
+	element is at least as large as its children. Then we repeatedly swap the
+	largest element, at the root, with the last element of the heap, shrink
+	the heap by one, and restore the heap by sifting the swapped element down.
+	We sift bottom-up, as described by Floyd: the hole at the root is moved
+	down to a leaf by promoting the larger child at each level, and then the
+	element climbs back up to its place, which takes about half as many
+	comparisons since it usually belongs near the bottom. With arity=d each
+	element has d children instead of two, so the heap is shallower and each
+	level's children sit next to each other in memory. This is O(n log n) in
+	every case and uses O(1) extra memory.
+	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, lambda data: heapsort(data, arity=arity))
+		return
+	if arity < 2:
+		raise ValueError('arity must be at least 2')
+	__heapsort_range(arr, 0, len(arr), arity)
 
-# TODO
-def radixsort(arr):
-	return
+def radixsort(arr, bits=8, key=None, reverse=False):
+	"""
+	Least significant digit radix sort for integers and floats. Instead of
+	comparing elements, we look at their keys bits digits at a time, starting
+	with the least significant digit. For each digit we build a histogram of
+	how many keys have each digit value, turn the histogram into the starting
+	position of every bucket, and scatter the keys into their buckets. Since
+	each pass is stable, after the last pass the keys are sorted. Passes where
+	every key has the same digit are skipped.
+
+	Negative integers and IEEE floats don't sort correctly by their raw bits,
+	so we first transform them: signed integers get their sign bit flipped, and
+	floats get their sign bit flipped if positive or all their bits flipped if
+	negative. The transform is undone after sorting.
+
+	Accepts lists of ints or of floats, but not both, since floats can't
+	key every int exactly; array.array and other writable buffers in native
+	byte order; and NumPy arrays, all sorted in place. NumPy arrays are sorted with
+	vectorized passes. Inputs shorter than RADIX_THRESHOLD are comparison
+	sorted.
+
+	With key=, which must return ints or floats, key is called once per value
+	and we radix sort the transformed keys with each value's position packed
+	into their low digits, so equal keys keep their original order. With
+	reverse=True the transformed keys are flipped instead of the result, which
+	keeps equal keys in their original order too.
+	"""
+	if not 1 <= bits <= 16:
+		raise ValueError('bits must be between 1 and 16')
+	if key is not None:
+		__radixsort_by_key(arr, bits, key, reverse)
+		return
+	if reverse:
+		# equal numbers are interchangeable, so we can flip the sorted array
+		radixsort(arr, bits)
+		if numpy is not None and isinstance(arr, numpy.ndarray):
+			arr[:] = arr[::-1].copy()
+		else:
+			__reverse_range(arr, 0, len(arr))
+		return
+	if numpy is not None and isinstance(arr, numpy.ndarray):
+		__radixsort_numpy(arr, bits)
+	elif isinstance(arr, list):
+		__radixsort_list(arr, bits)
+	else:
+		__radixsort_buffer(memoryview(arr), bits)
+
+def __radixsort_list(arr, bits):
+	types = set(map(type, arr))
+	if not types <= {int, float}:
+		raise TypeError('radixsort can only sort ints and floats')
+	if types == {int, float}:
+		raise TypeError("radixsort can't sort a mix of ints and floats")
+	if len(arr) < RADIX_THRESHOLD:
+		sort(arr)
+	elif types == {int}:
+		# Python ints are unbounded, so we sort their offset from the minimum
+		minimum = min(arr)
+		keys = __radix_passes([value - minimum for value in arr], bits, max(arr) - minimum)
+		for index, value in enumerate(keys):
+			arr[index] = value + minimum
+	else:
+		values = array('d', arr)
+		__radixsort_buffer(memoryview(values), bits)
+		arr[:] = values
+
+def __radixsort_by_key(arr, bits, key, reverse):
+	values = list(arr)
+	n = len(values)
+	if n == 0:
+		return
+	keys = [key(value) for value in values]
+	if all(isinstance(value, numbers.Integral) for value in keys):
+		keys = [int(value) for value in keys]
+		minimum = min(keys)
+		keys = [value - minimum for value in keys]
+	elif all(isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral) for value in keys):
+		raw = array('Q', array('d', keys).tobytes())
+		sign = 1 << 63
+		full = (1 << 64) - 1
+		keys = [full ^ value if value & sign else value | sign for value in raw]
+	else:
+		raise TypeError('radixsort keys must be all ints or all floats')
+	largest = max(keys)
+	if reverse:
+		keys = [largest - value for value in keys]
+	packed = __radix_passes([value * n + index for index, value in enumerate(keys)], bits, largest * n + n - 1)
+	for position, item in enumerate(packed):
+		arr[position] = values[item % n]
+
+def __radixsort_buffer(view, bits):
+	if view.readonly:
+		raise TypeError('radixsort needs a writable buffer')
+	if view.ndim != 1:
+		raise TypeError('radixsort can only sort one-dimensional buffers')
+	kind = view.format.lstrip('@=<>!')
+	if kind not in 'bhilqBHILQfd' or len(kind) != 1:
+		raise TypeError(f"radixsort can't sort buffers of format {view.format!r}")
+	order = view.format[0]
+	if order in '>!' and sys.byteorder == 'little' or order == '<' and sys.byteorder == 'big':
+		raise TypeError(f"radixsort can't sort buffers of non-native byte order {view.format!r}")
+	if len(view) < RADIX_THRESHOLD:
+		# memoryview can't read '=', '<' or '>' formats itself, so go through
+		# struct, which also knows their standard sizes
+		layout = f'{view.format[:-1] or "@"}{len(view)}{kind}'
+		values = list(struct.unpack(layout, view.cast('B')))
+		sort(values)
+		view.cast('B')[:] = struct.pack(layout, *values)
+		return
+	width = view.itemsize * 8
+	raw = view.cast('B').cast({1: 'B', 2: 'H', 4: 'I', 8: 'Q'}[view.itemsize])
+	sign = 1 << (width - 1)
+	full = (1 << width) - 1
+	keys = raw.tolist()
+	if kind in 'fd':
+		keys = [full ^ key if key & sign else key | sign for key in keys]
+	elif kind in 'bhilq':
+		keys = [key ^ sign for key in keys]
+	keys = __radix_passes(keys, bits, full)
+	if kind in 'fd':
+		keys = [key ^ sign if key & sign else full ^ key for key in keys]
+	elif kind in 'bhilq':
+		keys = [key ^ sign for key in keys]
+	raw[:] = array(raw.format, keys)
+
+def __radix_passes(keys, bits, largest):
+	# sort non-negative integer keys no larger than largest
+	n = len(keys)
+	radix = 1 << bits
+	mask = radix - 1
+	scattered = [0] * n
+	for shift in range(0, max(largest.bit_length(), 1), bits):
+		counts = [0] * radix
+		for key in keys:
+			counts[(key >> shift) & mask] += 1
+		if n in counts:
+			continue
+		position = 0
+		for digit in range(radix):
+			counts[digit], position = position, position + counts[digit]
+		for key in keys:
+			digit = (key >> shift) & mask
+			scattered[counts[digit]] = key
+			counts[digit] += 1
+		keys, scattered = scattered, keys
+	return keys
 
-def bogosort(arr):
+def __radixsort_numpy(arr, bits):
+	if arr.ndim != 1 or arr.dtype.kind not in 'iuf':
+		raise TypeError(f"radixsort can't sort arrays of dtype {arr.dtype}")
+	if not arr.dtype.isnative:
+		# the bit tricks below read keys in native byte order
+		native = arr.astype(arr.dtype.newbyteorder('='))
+		__radixsort_numpy(native, bits)
+		arr[:] = native
+		return
+	if len(arr) < RADIX_THRESHOLD:
+		arr.sort()
+		return
+	unsigned = numpy.dtype(f'u{arr.dtype.itemsize}')
+	width = arr.dtype.itemsize * 8
+	sign = unsigned.type(1 << (width - 1))
+	keys = arr.view(unsigned).copy()
+	if arr.dtype.kind == 'f':
+		keys = numpy.where(keys & sign, ~keys, keys | sign)
+	elif arr.dtype.kind == 'i':
+		keys ^= sign
+	bits = min(bits, width)
+	radix = 1 << bits
+	mask = unsigned.type(radix - 1)
+	digit_type = numpy.uint8 if bits <= 8 else numpy.uint16
+	for shift in range(0, width, bits):
+		digits = ((keys >> unsigned.type(shift)) & mask).astype(digit_type)
+		if numpy.bincount(digits, minlength=radix).max() == len(keys):
+			continue
+		# a stable argsort of 8 or 16 bit digits is a counting sort in NumPy,
+		# so this scatters every key into its bucket in one vectorized pass
+		keys = keys[numpy.argsort(digits, kind='stable')]
+	if arr.dtype.kind == 'f':
+		keys = numpy.where(keys & sign, keys ^ sign, ~keys)
+	elif arr.dtype.kind == 'i':
+		keys ^= sign
+	arr.view(unsigned)[:] = keys
+
+def bogosort(arr, seed=None, key=None, reverse=False):
 	"""
 	We generate a random permutation of our input array. If this permutation is
 	sorted, we are done. If it is not, we generate a new permutation and
 	continue.
 	"""
-	clone = deepcopy(arr)
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, lambda data: bogosort(data, seed=seed))
+		return
+	rng = __rng(seed)
 	is_sorted = False
 	while not is_sorted:
-		clone = unsort(clone)
+		unsort(arr, inplace=True, seed=rng)
 		is_sorted = True
-		for index in range(0, len(clone)-1):
-			if clone[index] > clone[index+1]:
+		for index in range(0, len(arr)-1):
+			if arr[index] > arr[index+1]:
 				is_sorted = False
-	for index, item in enumerate(clone):
-		arr[index] = item
+
+def sort(arr, key=None, reverse=False):
+	"""
+	Adaptive hybrid sort. We start by scanning the array once and counting the
+	places where an element is smaller than the one before it. If there are
+	none, the array is already sorted. If every element is smaller than the one
+	before it, the array is reversed and we just flip it. If there are only a
+	few, the array is nearly sorted and we try an insertion sort that gives up
+	after a linear number of moves. Otherwise we use a pattern-defeating quick
+	sort: short ranges are insertion sorted, pivots are picked with a median of
+	three (or a ninther for large ranges), partitions that are already in order
+	are finished off with a cheap insertion sort, and unbalanced partitions
+	shuffle a few elements to break up adversarial patterns. If we see too many
+	unbalanced partitions, we fall back to heap sort, so the worst case stays
+	O(n log n). We always recurse into the smaller partition and loop on the
+	larger one, so the recursion depth is O(log n).
+	"""
+	if key is not None or reverse:
+		__sort_by_key(arr, key, reverse, __hybridsort)
+		return
+	__hybridsort(arr)
+
+def __hybridsort(arr):
+	n = len(arr)
+	if n < 2:
+		return
+	descents = 0
+	for i in range(1, n):
+		if arr[i] < arr[i-1]:
+			descents += 1
+	if descents == 0:
+		return
+	if descents == n - 1:
+		arr.reverse()
+		return
+	if descents <= n // NEARLY_SORTED_RATIO and __partial_insertionsort(arr, 0, n, n):
+		return
+	__pdqsort(arr, 0, n, True, n.bit_length())
+
+def __insertionsort_range(arr, begin, end):
+	for i in range(begin + 1, end):
+		temp = arr[i]
+		slot = i
+		while slot > begin and temp < arr[slot-1]:
+			arr[slot] = arr[slot-1]
+			slot -= 1
+		arr[slot] = temp
+
+def __partial_insertionsort(arr, begin, end, limit):
+	# insertion sort that gives up once it has moved more than limit elements
+	moves = 0
+	for i in range(begin + 1, end):
+		temp = arr[i]
+		slot = i
+		while slot > begin and temp < arr[slot-1]:
+			arr[slot] = arr[slot-1]
+			slot -= 1
+		arr[slot] = temp
+		moves += i - slot
+		if moves > limit:
+			return False
+	return True
+
+def __sort3(arr, a, b, c):
+	# order arr[a] <= arr[b] <= arr[c]
+	if arr[b] < arr[a]:
+		arr[a], arr[b] = arr[b], arr[a]
+	if arr[c] < arr[b]:
+		arr[b], arr[c] = arr[c], arr[b]
+		if arr[b] < arr[a]:
+			arr[a], arr[b] = arr[b], arr[a]
+
+def __partition_right(arr, begin, end):
+	# partition around arr[begin]; elements equal to the pivot go right
+	pivot = arr[begin]
+	first = begin + 1
+	while first < end and arr[first] < pivot:
+		first += 1
+	last = end - 1
+	while last >= first and not arr[last] < pivot:
+		last -= 1
+	already_partitioned = first > last
+	while first < last:
+		arr[first], arr[last] = arr[last], arr[first]
+		first += 1
+		while arr[first] < pivot:
+			first += 1
+		last -= 1
+		while not arr[last] < pivot:
+			last -= 1
+	pivot_pos = first - 1
+	arr[begin] = arr[pivot_pos]
+	arr[pivot_pos] = pivot
+	return pivot_pos, already_partitioned
+
+def __partition_left(arr, begin, end):
+	# partition around arr[begin]; elements equal to the pivot go left
+	pivot = arr[begin]
+	last = end - 1
+	while pivot < arr[last]:
+		last -= 1
+	first = begin + 1
+	while first < last and not pivot < arr[first]:
+		first += 1
+	while first < last:
+		arr[first], arr[last] = arr[last], arr[first]
+		last -= 1
+		while pivot < arr[last]:
+			last -= 1
+		first += 1
+		while first < last and not pivot < arr[first]:
+			first += 1
+	arr[begin] = arr[last]
+	arr[last] = pivot
+	return last
+
+def __heapsort_range(arr, begin, end, arity=2):
+	n = end - begin
+	for start in range((n - 2) // arity, -1, -1):
+		__sift_down_range(arr, begin, start, n, arity, arr[begin+start])
+	for size in range(n - 1, 0, -1):
+		value = arr[begin+size]
+		arr[begin+size] = arr[begin]
+		__sift_down_range(arr, begin, 0, size, arity, value)
+
+def __sift_down_range(arr, begin, root, size, arity, value):
+	# Floyd's bottom-up sift: put value in the heap of size elements starting
+	# at begin, with a hole at root. We first walk the hole down to a leaf,
+	# always moving the largest child up, without comparing against value.
+	# Since value usually came from the bottom of the heap, it belongs near
+	# the bottom, so we then walk back up to find its place.
+	hole = root
+	child = arity * hole + 1
+	while child < size:
+		largest = child
+		for sibling in range(child + 1, min(child + arity, size)):
+			if arr[begin+largest] < arr[begin+sibling]:
+				largest = sibling
+		arr[begin+hole] = arr[begin+largest]
+		hole = largest
+		child = arity * hole + 1
+	while hole > root:
+		parent = (hole - 1) // arity
+		if not arr[begin+parent] < value:
+			break
+		arr[begin+hole] = arr[begin+parent]
+		hole = parent
+	arr[begin+hole] = value
+
+def __pdqsort(arr, begin, end, leftmost, bad_allowed):
+	while True:
+		size = end - begin
+		if size < INSERTION_SORT_THRESHOLD:
+			__insertionsort_range(arr, begin, end)
+			return
+
+		half = size // 2
+		if size > NINTHER_THRESHOLD:
+			__sort3(arr, begin, begin + half, end - 1)
+			__sort3(arr, begin + 1, begin + half - 1, end - 2)
+			__sort3(arr, begin + 2, begin + half + 1, end - 3)
+			__sort3(arr, begin + half - 1, begin + half, begin + half + 1)
+			arr[begin], arr[begin+half] = arr[begin+half], arr[begin]
+		else:
+			__sort3(arr, begin + half, begin, end - 1)
+
+		# if the pivot equals the element before this range, every element
+		# equal to it belongs here and is already in its final position
+		if not leftmost and not arr[begin-1] < arr[begin]:
+			pivot_pos = __partition_left(arr, begin, end)
+			if __observer is not None:
+				__observer.partition(pivot_pos - begin, end - pivot_pos - 1)
+			begin = pivot_pos + 1
+			continue
+
+		pivot_pos, already_partitioned = __partition_right(arr, begin, end)
+		left_size = pivot_pos - begin
+		right_size = end - pivot_pos - 1
+		if __observer is not None:
+			__observer.partition(left_size, right_size)
+
+		if left_size < size // 8 or right_size < size // 8:
+			bad_allowed -= 1
+			if bad_allowed == 0:
+				__heapsort_range(arr, begin, end)
+				return
+			if left_size >= INSERTION_SORT_THRESHOLD:
+				quarter = left_size // 4
+				arr[begin], arr[begin+quarter] = arr[begin+quarter], arr[begin]
+				arr[pivot_pos-1], arr[pivot_pos-quarter] = arr[pivot_pos-quarter], arr[pivot_pos-1]
+			if right_size >= INSERTION_SORT_THRESHOLD:
+				quarter = right_size // 4
+				arr[pivot_pos+1], arr[pivot_pos+1+quarter] = arr[pivot_pos+1+quarter], arr[pivot_pos+1]
+				arr[end-1], arr[end-quarter] = arr[end-quarter], arr[end-1]
+		elif already_partitioned \
+				and __partial_insertionsort(arr, begin, pivot_pos, PARTIAL_INSERTION_SORT_LIMIT) \
+				and __partial_insertionsort(arr, pivot_pos + 1, end, PARTIAL_INSERTION_SORT_LIMIT):
+			return
+
+		if left_size < right_size:
+			__pdqsort(arr, begin, pivot_pos, leftmost, bad_allowed)
+			begin = pivot_pos + 1
+			leftmost = False
+		else:
+			__pdqsort(arr, pivot_pos + 1, end, False, bad_allowed)
+			end = pivot_pos
+
+def select(arr, k, key=None, reverse=False):
+	"""
+	Introselect. We rearrange arr so that arr[k] holds the value it would have
+	if arr were sorted, everything before it is no larger and everything after
+	it is no smaller, and return that value. Like quick sort, we partition the
+	array around a pivot, into values less than, equal to, and greater than
+	it, but then we only continue into the part that contains index k. This
+	takes O(n) on average. If two partitions in a row haven't halved the
+	range, the pivots have been bad, so we switch to the median of medians:
+	we take the median of every group of five values and use the median of
+	those as the pivot, which guarantees O(n) in the worst case.
+	With key= or reverse=, arr[k] holds the value sorted(arr, key=key,
+	reverse=reverse) would put there.
+	"""
+	if not 0 <= k < len(arr):
+		raise IndexError('select index out of range')
+	if key is not None or reverse:
+		# the keyed sort flips the whole array afterwards for reverse, so in
+		# that case we select the mirrored index
+		target = len(arr) - 1 - k if reverse else k
+		__sort_by_key(arr, key, reverse, lambda data: select(data, target))
+		return arr[k]
+	__introselect(arr, 0, len(arr) - 1, k, True)
+	return arr[k]
+
+def partial_sort(arr, k, key=None, reverse=False):
+	"""
+	Rearrange arr so that arr[:k] holds the k smallest values in sorted order.
+	The order of the rest of the array is unspecified. We select the kth
+	smallest value, which leaves the k smallest values at the front, and sort
+	just those, for O(n + k log k). With reverse=True the front holds the k
+	largest values instead, largest first.
+	"""
+	if key is not None or reverse:
+		# the keyed sort flips the whole array afterwards for reverse, so in
+		# that case we sort the k largest at the back of the array instead
+		__sort_by_key(arr, key, reverse, lambda data: __partial_sort(data, k, reverse))
+		return
+	__partial_sort(arr, k, False)
+
+def __partial_sort(arr, k, at_back):
+	n = len(arr)
+	if k >= n:
+		__hybridsort(arr)
+	elif k <= 0:
+		return
+	elif at_back:
+		select(arr, n - k)
+		__pdqsort(arr, n - k, n, False, k.bit_length())
+	else:
+		select(arr, k - 1)
+		__pdqsort(arr, 0, k, True, k.bit_length())
+
+def nlargest(iterable, k, key=None):
+	"""
+	Stream over iterable and return its k largest values, largest first, in
+	O(k) memory. We keep the k largest values seen so far in a min heap, so the
+	smallest of them is on top; a new value only has to beat that one to get
+	in. Values with equal keys are returned in the order they were seen.
+	"""
+	if k <= 0:
+		return []
+	heap = MinHeap()
+	for index, value in enumerate(iterable):
+		# later values get smaller tie breakers, so they're evicted first
+		item = (value if key is None else key(value), -index, value)
+		if heap.get_size() < k:
+			heap.insert(item)
+		elif heap.get_min() < item:
+			heap.replace(item)
+	result = list(heap)
+	sort(result, reverse=True)
+	return [item[2] for item in result]
+
+def nsmallest(iterable, k, key=None):
+	"""
+	Stream over iterable and return its k smallest values, smallest first, in
+	O(k) memory, keeping the k smallest values seen so far in a max heap.
+	"""
+	if k <= 0:
+		return []
+	heap = MaxHeap()
+	for index, value in enumerate(iterable):
+		item = (value if key is None else key(value), index, value)
+		if heap.get_size() < k:
+			heap.insert(item)
+		elif item < heap.get_max():
+			heap.replace(item)
+	result = list(heap)
+	sort(result)
+	return [item[2] for item in result]
+
+def __introselect(arr, lo, hi, k, introspective):
+	# with cheap pivots, the range has to halve every two partitions, so the
+	# work is bounded by a geometric series; otherwise we give up on them
+	size = hi - lo + 1
+	partitions = 0
+	while hi - lo >= SELECT_THRESHOLD:
+		if introspective:
+			pivot = arr[__choose_pivot(arr, lo, hi)]
+		else:
+			pivot = __median_of_medians(arr, lo, hi)
+		lt = i = lo
+		gt = hi
+		while i <= gt:
+			value = arr[i]
+			if value < pivot:
+				arr[lt], arr[i] = value, arr[lt]
+				lt += 1
+				i += 1
+			elif pivot < value:
+				arr[gt], arr[i] = value, arr[gt]
+				gt -= 1
+			else:
+				i += 1
+		if __observer is not None:
+			__observer.partition(lt - lo, hi - gt)
+		if k < lt:
+			hi = lt - 1
+		elif k > gt:
+			lo = gt + 1
+		else:
+			return
+		partitions += 1
+		if introspective and partitions % 2 == 0:
+			if hi - lo + 1 > size // 2:
+				introspective = False
+			size = hi - lo + 1
+	__insertionsort_range(arr, lo, hi + 1)
+
+def __median_of_medians(arr, lo, hi):
+	# move the median of every group of five to the front of the range, then
+	# select the median of those
+	count = 0
+	for start in range(lo, hi + 1, 5):
+		end = min(start + 5, hi + 1)
+		__insertionsort_range(arr, start, end)
+		median = (start + end - 1) // 2
+		arr[lo+count], arr[median] = arr[median], arr[lo+count]
+		count += 1
+	middle = lo + (count - 1) // 2
+	__introselect(arr, lo, lo + count - 1, middle, False)
+	return arr[middle]
+
+class SortStats:
+	"""Counters collected from one instrumented sort call"""
+	def __init__(self, algorithm, size):
+		self.algorithm = algorithm
+		self.size = size
+		self.comparisons = 0
+		self.moves = 0
+		self.max_depth = 0
+		self.partitions = 0
+		self.worst_balance = None
+		self.total_balance = 0.0
+		self.peak_bytes = 0
+		self.seconds = 0.0
+
+	def __repr__(self):
+		return f'SortStats({self.as_dict()})'
+
+	@property
+	def mean_balance(self):
+		"""Average partition balance, or None if there were no partitions"""
+		if self.partitions == 0:
+			return None
+		return self.total_balance / self.partitions
+
+	def partition(self, left, right):
+		"""Record a partition into parts of size left and right"""
+		# balance is the smaller part's share: 0.5 is a perfect split and 0 is
+		# the quadratic worst case
+		balance = min(left, right) / max(left + right, 1)
+		self.partitions += 1
+		self.total_balance += balance
+		if self.worst_balance is None or balance < self.worst_balance:
+			self.worst_balance = balance
+
+	def as_dict(self):
+		"""Counters as a JSON serializable dictionary"""
+		return {
+			'algorithm': self.algorithm,
+			'size': self.size,
+			'seconds': self.seconds,
+			'comparisons': self.comparisons,
+			'moves': self.moves,
+			'max_depth': self.max_depth,
+			'partitions': self.partitions,
+			'worst_balance': self.worst_balance,
+			'mean_balance': self.mean_balance,
+			'peak_bytes': self.peak_bytes,
+		}
+
+class ComparisonProbe:
+	"""Wraps a value and counts every comparison made against it"""
+	__slots__ = ('value',)
+	stats = None
+
+	def __init__(self, value):
+		self.value = value
+
+	def __lt__(self, other):
+		ComparisonProbe.stats.comparisons += 1
+		return self.value < other.value
+
+	def __gt__(self, other):
+		ComparisonProbe.stats.comparisons += 1
+		return self.value > other.value
+
+	def __le__(self, other):
+		ComparisonProbe.stats.comparisons += 1
+		return self.value <= other.value
+
+	def __ge__(self, other):
+		ComparisonProbe.stats.comparisons += 1
+		return self.value >= other.value
+
+	def __eq__(self, other):
+		ComparisonProbe.stats.comparisons += 1
+		return self.value == other.value
+
+	__hash__ = None
+
+class MoveProbe(list):
+	"""List that counts every element written into it"""
+	stats = None
+
+	def __setitem__(self, index, value):
+		if isinstance(index, slice):
+			MoveProbe.stats.moves += len(range(*index.indices(len(self))))
+		else:
+			MoveProbe.stats.moves += 1
+		super().__setitem__(index, value)
+
+def instrumented(sort_fn, sink=None, name=None, count_comparisons=True):
+	"""
+	Wrap one of the sorts in this module so every call collects a SortStats
+	and reports it to sink. The wrapper sorts a copy of the array whose
+	elements count their comparisons and which counts the elements written
+	into it, then copies the result back. While it runs we also track the
+	deepest nesting of this module's functions with a profiler hook, the
+	balance of every quick sort partition, and the peak memory allocated.
+	sink may be any callable taking a SortStats, a logging.Logger, or the
+	path of a JSON lines file. Set count_comparisons=False for sorts that
+	don't compare elements, such as radixsort.
+
+	With key= or reverse=, the wrapper decorates the values with their keys
+	and positions itself, as the sorts do, and instruments the sort of the
+	decorated list, so the counts are the algorithm's own work on the keys.
+
+	None of this is active unless a sort is called through the wrapper; the
+	sorts only check once per partition whether anyone is watching. Calls
+	should not be instrumented from several threads at once.
+	"""
+	if isinstance(sink, logging.Logger):
+		sink = log_sink(sink)
+	elif isinstance(sink, (str, os.PathLike)):
+		sink = jsonl_sink(sink)
+	name = name or getattr(sort_fn, '__name__', repr(sort_fn))
+
+	def wrapper(arr, *args, **kwargs):
+		global __observer
+		stats = SortStats(name, len(arr))
+		ComparisonProbe.stats = MoveProbe.stats = stats
+		key = kwargs.pop('key', None)
+		reverse = kwargs.pop('reverse', False)
+		values = list(arr)
+		decorated = key is not None or reverse
+		if decorated:
+			# the same (key, signed position) pairs __sort_by_key sorts
+			sign = -1 if reverse else 1
+			keys = values if key is None else [key(value) for value in values]
+			items = [(keys[index], sign * index) for index in range(len(values))]
+		else:
+			items = values
+		if count_comparisons:
+			probes = MoveProbe(ComparisonProbe(item) for item in items)
+		else:
+			probes = MoveProbe(items)
+
+		codes = {value.__code__ for value in globals().values() if isinstance(value, types.FunctionType) and value.__module__ == __name__}
+		depth = 0
+		def profile(frame, event, arg):
+			nonlocal depth
+			if frame.f_code in codes:
+				if event == 'call':
+					depth += 1
+					stats.max_depth = max(stats.max_depth, depth)
+				elif event == 'return':
+					depth -= 1
+
+		previous_profile = sys.getprofile()
+		tracing = tracemalloc.is_tracing()
+		if not tracing:
+			tracemalloc.start()
+		tracemalloc.reset_peak()
+		before = tracemalloc.get_traced_memory()[0]
+		__observer = stats
+		sys.setprofile(profile)
+		start = time.perf_counter()
+		try:
+			sort_fn(probes, *args, **kwargs)
+		finally:
+			stats.seconds = time.perf_counter() - start
+			sys.setprofile(previous_profile)
+			__observer = None
+			stats.peak_bytes = tracemalloc.get_traced_memory()[1] - before
+			if not tracing:
+				tracemalloc.stop()
+		results = [probe.value for probe in probes] if count_comparisons else list(probes)
+		if decorated:
+			if reverse:
+				results.reverse()
+			results = [values[sign * item[1]] for item in results]
+		for index, value in enumerate(results):
+			arr[index] = value
+		if sink is not None:
+			sink(stats)
+		return stats
+
+	return wrapper
+
+def log_sink(logger, level=logging.INFO):
+	"""Sink that logs every SortStats to logger"""
+	def sink(stats):
+		logger.log(level, 'sort stats: %s', json.dumps(stats.as_dict()))
+	return sink
+
+def jsonl_sink(path):
+	"""Sink that appends every SortStats to a JSON lines file"""
+	def sink(stats):
+		with open(path, 'a') as output:
+			output.write(json.dumps(stats.as_dict()) + '\n')
+	return sink
 
 if __name__ == '__main__':
 	arr = unsort(list(range(0, 40)))
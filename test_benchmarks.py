@@ -0,0 +1,34 @@
+import json
+
+import benchmarks
+
+def test_run_suite_records_every_run():
+	results = benchmarks.run_suite(sizes=(50,), sorts=['insertionsort', 'radixsort'], repeat=1)
+	assert len(results) == 2 * len(benchmarks.distributions(50))
+	for result in results:
+		assert result['size'] == 50
+		assert result['seconds'] >= 0 and result['writes'] >= 0 and result['peak_bytes'] >= 0
+	# radixsort never compares elements, so its comparisons are not counted
+	assert all(result['comparisons'] > 0 for result in results if result['algorithm'] == 'insertionsort')
+
+def test_run_suite_records_errors(monkeypatch):
+	def broken(arr):
+		raise RuntimeError('broken sort')
+	monkeypatch.setitem(benchmarks.SORTS, 'broken', (broken, None, True))
+	results = benchmarks.run_suite(sizes=(10,), sorts=['broken'], repeat=1)
+	assert {result['error'] for result in results} == {'RuntimeError'}
+
+def test_compare_results_finds_regressions(tmp_path):
+	results = benchmarks.run_suite(sizes=(20,), sorts=['sort'], repeat=1)
+	baseline = tmp_path / 'baseline.json'
+	current = tmp_path / 'current.json'
+	benchmarks.write_results(results, baseline)
+	slower = [dict(result, comparisons=result['comparisons'] * 2 + 1) for result in results]
+	slower[0] = {key: value for key, value in slower[0].items() if key in ('algorithm', 'distribution', 'size')}
+	slower[0]['error'] = 'RuntimeError'
+	benchmarks.write_results(slower, current)
+	assert json.loads(baseline.read_text())['results'] == results
+	assert benchmarks.compare_results(baseline, baseline) == []
+	regressions = benchmarks.compare_results(baseline, current)
+	assert len(regressions) == len(results)
+	assert 'now fails with RuntimeError' in regressions[0]
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import pytest
+
+from concurrentqueues import AsyncPriorityQueue, ThreadSafePriorityQueue
+
+def test_cancelled_getter_passes_its_wakeup_on():
+	async def main():
+		queue = AsyncPriorityQueue()
+		first = asyncio.create_task(queue.get())
+		second = asyncio.create_task(queue.get())
+		await asyncio.sleep(0)
+		# the put wakes the first getter, which is cancelled before it runs
+		await queue.put('job', 1)
+		first.cancel()
+		return await asyncio.wait_for(second, 1)
+	assert asyncio.run(main()) == 'job'
+
+def test_update_priority_is_locked():
+	async def main():
+		queue = AsyncPriorityQueue()
+		handle = await queue.put('later', 5)
+		await queue.put('sooner', 3)
+		await queue.update_priority(handle, 1)
+		return await queue.get_many(2)
+	assert asyncio.run(main()) == ['later', 'sooner']
+
+def test_put_waits_for_space():
+	async def main():
+		queue = AsyncPriorityQueue(maxsize=2)
+		await queue.put('a', 2)
+		await queue.put('b', 1)
+		assert queue.full()
+		with pytest.raises(TimeoutError):
+			await queue.put('c', 0, timeout=0.01)
+		blocked = asyncio.create_task(queue.put('c', 0))
+		await asyncio.sleep(0)
+		assert not blocked.done()
+		assert await queue.get() == 'b'
+		await asyncio.wait_for(blocked, 1)
+		assert queue.metrics.blocked_puts == 1 and queue.metrics.max_depth == 2
+		return await queue.get_many(5, timeout=0.01)
+	assert asyncio.run(main()) == ['c', 'a']
+
+def test_get_timeouts():
+	async def main():
+		queue = AsyncPriorityQueue()
+		with pytest.raises(TimeoutError):
+			await queue.get(timeout=0.01)
+		assert await queue.get_many(3, timeout=0.01) == []
+		handle = await queue.put('x', 1)
+		assert await queue.remove(handle) == 'x' and queue.empty()
+	asyncio.run(main())
+
+def test_producers_and_consumers():
+	async def main():
+		queue = AsyncPriorityQueue(maxsize=8)
+		async def produce(start):
+			for value in range(start, start + 100):
+				await queue.put(value, value)
+		async def consume():
+			values = []
+			while len(values) < 200:
+				values += await queue.get_many(min(16, 200 - len(values)))
+			return values
+		consumer = asyncio.create_task(consume())
+		await asyncio.gather(produce(0), produce(100))
+		return await asyncio.wait_for(consumer, 5)
+	values = asyncio.run(main())
+	assert sorted(values) == list(range(200))
+
+def test_thread_safe_queue():
+	queue = ThreadSafePriorityQueue(maxsize=4)
+	with pytest.raises(TimeoutError):
+		queue.get(timeout=0.01)
+	def produce(start):
+		for value in range(start, start + 500):
+			queue.put(value, value)
+	producers = [threading.Thread(target=produce, args=(start,)) for start in (0, 500)]
+	for producer in producers:
+		producer.start()
+	values = []
+	while len(values) < 1000:
+		values += queue.get_many(10, timeout=1)
+	for producer in producers:
+		producer.join()
+	assert sorted(values) == list(range(1000))
+	assert queue.metrics.puts == queue.metrics.gets == 1000 and queue.metrics.max_depth <= 4
+	handle = queue.put('x', 5)
+	queue.put('y', 3)
+	queue.update_priority(handle, 1)
+	assert queue.get() == 'x' and queue.get_many(5, timeout=0.01) == ['y']
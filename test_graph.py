@@ -0,0 +1,325 @@
+from collections import deque
+from random import Random
+
+import pytest
+
+import graph as graph_module
+from graph import DisjointSet, Graph, NegativeCycleError
+
+def random_graph(num_vertices=2000, num_edges=20000, seed=0):
+	rng = Random(seed)
+	edges = [(rng.randrange(num_vertices), rng.randrange(num_vertices)) for _ in range(num_edges)]
+	return Graph.from_edges(edges, num_vertices)
+
+@pytest.mark.parametrize('direction', ['top-down', 'bottom-up'])
+def test_bfs_fixed_direction(direction):
+	graph = random_graph()
+	steps = []
+	distances, parents = graph.bfs_tree(0, direction=direction, steps=steps)
+	assert steps and set(steps) == {direction}
+	assert list(distances) == list(graph.bfs_tree(0)[0])
+
+def test_bfs_direction_optimizing_switches():
+	graph = random_graph()
+	steps = []
+	graph.bfs_tree(0, steps=steps)
+	# a small frontier starts top-down, and the middle levels of a random
+	# graph cover most of its edges, so the search turns bottom-up
+	assert steps[0] == 'top-down'
+	assert 'bottom-up' in steps
+
+def test_bfs_rejects_unknown_direction():
+	with pytest.raises(ValueError):
+		random_graph().bfs_tree(0, direction='sideways')
+
+def test_numpy_scalar_sources():
+	numpy = pytest.importorskip('numpy')
+	edges = numpy.array([(0, 1), (1, 2), (2, 3)])
+	graph = Graph.from_edges(edges, weights=[1.0, 2.0, -1.0], directed=True)
+	source = numpy.int64(0)
+	assert list(graph.dijkstra(source, targets=numpy.int32(2)).path(2)) == [0, 1, 2]
+	assert graph.bellmanford(source)[3] == 2.0
+	assert list(graph.bfs_tree(source)[0]) == [0, 1, 2, 3]
+	assert list(graph.bfs_tree(numpy.array([0, 2]))[0]) == [0, 1, 0, 1]
+
+def test_bfs_generator_visits_by_level():
+	graph = random_graph(num_vertices=500, num_edges=600, seed=2)
+	order = list(graph.bfs(0))
+	distances = graph.bfs_tree(0)[0]
+	assert sorted(order) == [vertex for vertex in range(500) if distances[vertex] >= 0]
+	assert [distances[vertex] for vertex in order] == sorted(distances[vertex] for vertex in order)
+	assert sorted(graph.bfs()) == list(range(500))
+
+def adjacency(graph):
+	# the edges of every vertex as sorted (target, weight) pairs, since batches
+	# of edges and reversed undirected edges can be stored in any order
+	return [sorted(zip(map(int, graph.neighbors(vertex)), map(float, graph.edge_weights(vertex)))) for vertex in range(len(graph))]
+
+def test_csr_layout():
+	graph = Graph.from_edges([(0, 2, 5.0), (1, 0), (0, 1, 2.0), (2, 2)], directed=True)
+	assert list(graph.offsets) == [0, 2, 3, 4]
+	assert list(graph.targets) == [2, 1, 0, 2]
+	assert list(graph.weights) == [5.0, 2.0, 1.0, 1.0]
+	assert graph.degree(0) == 2 and graph.num_edges == 4
+	assert graph.bytes_per_edge == graph.nbytes / 4
+	undirected = Graph.from_edges([(0, 1), (1, 1)], num_vertices=3)
+	assert adjacency(undirected) == [[(1, 1.0)], [(0, 1.0), (1, 1.0)], []]
+	assert sorted(undirected.edges()) == [(0, 1, 1), (1, 1, 1)]
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_add_edge_matches_from_edges(directed):
+	rng = Random(3)
+	edges = [(rng.randrange(50), rng.randrange(50), float(rng.randrange(10))) for _ in range(300)]
+	built = Graph.from_edges(edges, 50, directed=directed)
+	graph = Graph(10, directed=directed)
+	for start in range(0, len(edges), 70):
+		for source, target, weight in edges[start:start+70]:
+			graph.add_edge(source, target, weight)
+		# reading the arrays merges the buffered edges in
+		assert graph.num_edges == min(start + 70, len(edges))
+		graph.degree(0)
+	assert len(graph) == 50
+	assert adjacency(graph) == adjacency(built)
+	assert adjacency(graph.transpose().transpose()) == adjacency(built)
+
+def test_numpy_graph_matches_array_graph():
+	numpy = pytest.importorskip('numpy')
+	rng = Random(4)
+	edges = [(rng.randrange(40), rng.randrange(40)) for _ in range(200)]
+	weights = [float(rng.randrange(10)) for _ in edges]
+	for directed in (False, True):
+		expected = Graph.from_edges([edge + (weight,) for edge, weight in zip(edges, weights)], 40, directed=directed)
+		graph = Graph.from_edges(numpy.array(edges), 40, directed=directed, weights=weights)
+		assert isinstance(graph.targets, numpy.ndarray)
+		assert adjacency(graph) == adjacency(expected)
+		assert adjacency(graph.transpose()) == adjacency(expected.transpose())
+		graph.add_edge(3, 45, 7.0)
+		expected.add_edge(3, 45, 7.0)
+		assert adjacency(graph) == adjacency(expected)
+
+def reference_distances(graph, sources):
+	# plain Bellman-Ford over the edge list
+	distances = [float('inf')] * len(graph)
+	for source in sources:
+		distances[source] = 0
+	edges = list(graph.edges())
+	if not graph.directed:
+		edges += [(target, source, weight) for source, target, weight in edges]
+	for _ in range(len(graph)):
+		for source, target, weight in edges:
+			distances[target] = min(distances[target], distances[source] + weight)
+	return distances
+
+def grid(side, seed=0):
+	# directed grid with random weights of at least 1, so the Manhattan distance
+	# never overestimates
+	rng = Random(seed)
+	edges = []
+	for row in range(side):
+		for column in range(side):
+			vertex = row * side + column
+			if column + 1 < side:
+				edges += [(vertex, vertex + 1, rng.randint(1, 9)), (vertex + 1, vertex, rng.randint(1, 9))]
+			if row + 1 < side:
+				edges += [(vertex, vertex + side, rng.randint(1, 9)), (vertex + side, vertex, rng.randint(1, 9))]
+	return Graph.from_edges(edges, side * side, directed=True)
+
+def check_path(graph, paths, source, target):
+	path = paths.path(target)
+	assert path[0] == source and path[-1] == target
+	length = 0
+	for first, second in zip(path, path[1:]):
+		length += min(weight for neighbor, weight in zip(graph.neighbors(first), graph.edge_weights(first)) if neighbor == second)
+	assert length == paths[target]
+
+@pytest.mark.parametrize('engine', ['binary', 'dary', 'pairing'])
+def test_dijkstra_matches_reference(engine):
+	graph = grid(12)
+	expected = reference_distances(graph, [0, 77])
+	paths = graph.dijkstra([0, 77], engine=engine)
+	assert list(paths.distances) == expected and paths.num_settled == len(graph)
+	check_path(graph, paths, 77, 80)
+	undirected = Graph.from_edges([(0, 1, 4.0), (1, 2, 1.0), (0, 2, 7.0)], 4)
+	paths = undirected.dijkstra(2, engine=engine)
+	assert list(paths.distances) == [5.0, 1.0, 0.0, float('inf')] and paths.path(3) is None
+
+def test_dijkstra_early_exit_and_astar():
+	side = 30
+	graph = grid(side, seed=1)
+	target = (side // 2) * side + side // 2
+	full = graph.dijkstra(0)
+	early = graph.dijkstra(0, targets=target)
+	def manhattan(vertex):
+		return abs(vertex // side - target // side) + abs(vertex % side - target % side)
+	astar = graph.dijkstra(0, targets=target, heuristic=manhattan)
+	assert early[target] == astar[target] == full[target]
+	assert astar.num_settled < early.num_settled < full.num_settled
+	check_path(graph, astar, 0, target)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_bidirectional_dijkstra(seed):
+	graph = grid(15, seed=seed)
+	rng = Random(seed)
+	sources = [rng.randrange(len(graph)) for _ in range(2)]
+	target = rng.randrange(len(graph))
+	expected = graph.dijkstra(sources, targets=target)
+	paths = graph.dijkstra(sources, targets=target, bidirectional=True)
+	assert paths[target] == expected[target]
+	check_path(graph, paths, paths.path(target)[0], target)
+	assert paths.path(target)[0] in sources
+	with pytest.raises(ValueError):
+		graph.dijkstra(sources, bidirectional=True)
+
+def negative_graph(num_vertices=200, num_edges=1200, seed=0):
+	# negative weights without negative cycles: shift non-negative weights by
+	# vertex potentials, which changes every cycle's weight by zero
+	rng = Random(seed)
+	potentials = [rng.randint(0, 50) for _ in range(num_vertices)]
+	edges = []
+	for _ in range(num_edges):
+		source, target = rng.randrange(num_vertices), rng.randrange(num_vertices)
+		edges.append((source, target, float(rng.randint(0, 9) + potentials[source] - potentials[target])))
+	return Graph.from_edges(edges, num_vertices, directed=True)
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_bellmanford_with_negative_weights(vectorized):
+	if vectorized:
+		pytest.importorskip('numpy')
+	graph = negative_graph()
+	assert any(weight < 0 for _, _, weight in graph.edges())
+	paths = graph.bellmanford([0, 1], vectorized=vectorized)
+	assert list(paths.distances) == reference_distances(graph, [0, 1])
+	for target in range(len(graph)):
+		if paths[target] < float('inf'):
+			check_path(graph, paths, paths.path(target)[0], target)
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_bellmanford_finds_negative_cycles(vectorized):
+	if vectorized:
+		pytest.importorskip('numpy')
+	graph = negative_graph(seed=1)
+	for source, target, weight in [(5, 6, 1.0), (6, 7, -3.0), (7, 5, 1.0)]:
+		graph.add_edge(source, target, weight)
+	with pytest.raises(NegativeCycleError) as raised:
+		graph.bellmanford(5, vectorized=vectorized)
+	cycle = raised.value.cycle
+	total = 0
+	for first, second in zip(cycle, cycle[1:] + cycle[:1]):
+		total += min(weight for neighbor, weight in zip(graph.neighbors(first), graph.edge_weights(first)) if neighbor == second)
+	assert total < 0
+	# a cycle that the sources can't reach doesn't matter
+	isolated = Graph.from_edges([(0, 1, 2.0), (2, 3, -1.0), (3, 2, -1.0)], directed=True)
+	assert list(isolated.bellmanford(0, vectorized=vectorized).distances) == [0.0, 2.0, float('inf'), float('inf')]
+
+def reference_hops(graph, sources):
+	hops = [-1] * len(graph)
+	queue = deque(sources)
+	for source in sources:
+		hops[source] = 0
+	while queue:
+		vertex = queue.popleft()
+		for neighbor in graph.neighbors(vertex):
+			if hops[neighbor] == -1:
+				hops[neighbor] = hops[vertex] + 1
+				queue.append(int(neighbor))
+	return hops
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('direction', ['optimizing', 'top-down', 'bottom-up'])
+@pytest.mark.parametrize('use_numpy', [False, True])
+def test_bfs_matches_reference(directed, direction, use_numpy, monkeypatch):
+	if use_numpy:
+		pytest.importorskip('numpy')
+	else:
+		# run the pure Python frontier steps even where NumPy is installed
+		monkeypatch.setattr(graph_module, 'numpy', None)
+	rng = Random(5)
+	edges = [(rng.randrange(3000), rng.randrange(3000)) for _ in range(9000)]
+	graph = Graph.from_edges(edges, 3000, directed=directed)
+	sources = [0, 1, 2]
+	expected = reference_hops(graph, sources)
+	distances, parents = graph.bfs_tree(sources, direction=direction)
+	assert list(distances) == expected
+	for vertex in range(len(graph)):
+		parent = parents[vertex]
+		if expected[vertex] > 0:
+			assert expected[parent] == expected[vertex] - 1 and vertex in list(graph.neighbors(parent))
+		else:
+			assert parent == -1
+	levels = [sorted(map(int, frontier)) for frontier in graph.bfs_levels(sources, direction=direction)]
+	assert levels == [[vertex for vertex in range(len(graph)) if expected[vertex] == level] for level in range(max(expected) + 1)]
+
+def test_disjoint_set_matches_labels():
+	rng = Random(6)
+	sets = DisjointSet(100)
+	labels = list(range(100))
+	for _ in range(150):
+		if rng.random() < 0.1:
+			assert sets.add() == len(labels)
+			labels.append(len(labels))
+			continue
+		first, second = rng.randrange(len(labels)), rng.randrange(len(labels))
+		apart = labels[first] != labels[second]
+		assert sets.union(first, second) == apart
+		if apart:
+			old = labels[second]
+			labels = [labels[first] if label == old else label for label in labels]
+		assert sets.count == len(set(labels)) and len(sets) == len(labels)
+	for element in range(len(labels)):
+		assert sets.size(element) == labels.count(labels[element])
+		other = rng.randrange(len(labels))
+		assert sets.same(element, other) == (labels[element] == labels[other])
+	sets.grow(len(labels) + 5)
+	assert sets.count == len(set(labels)) + 5
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_components_follow_streamed_edges(directed):
+	rng = Random(7)
+	graph = Graph(50, directed=directed)
+	edges = []
+	assert graph.count_connected_components() == 50
+	for batch in range(5):
+		for _ in range(12):
+			edge = (rng.randrange(60), rng.randrange(60))
+			edges.append(edge)
+			graph.add_edge(*edge)
+		undirected = Graph.from_edges(edges, len(graph))
+		hops = reference_hops(undirected, [0])
+		labels = []
+		for vertex in range(len(graph)):
+			labels.append(min(other for other, hop in enumerate(reference_hops(undirected, [vertex])) if hop >= 0))
+		assert graph.count_connected_components() == len(set(labels))
+		for vertex in range(len(graph)):
+			assert graph.same_component(0, vertex) == (hops[vertex] >= 0)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_strongly_connected_components(seed):
+	rng = Random(seed)
+	edges = [(rng.randrange(120), rng.randrange(120)) for _ in range(180)]
+	graph = Graph.from_edges(edges, 120, directed=True)
+	reachable = [set(vertex for vertex, hop in enumerate(reference_hops(graph, [source])) if hop >= 0) for source in range(120)]
+	expected = {frozenset(other for other in reachable[vertex] if vertex in reachable[other]) for vertex in range(120)}
+	components = graph.get_strongly_connected_components()
+	assert {frozenset(component) for component in components} == expected
+	assert sum(map(len, components)) == 120
+	ids, condensation = graph.strongly_connected_components(condensation=True)
+	assert len(condensation) == len(components)
+	expected_edges = {(ids[source], ids[target]) for source, target in edges if ids[source] != ids[target]}
+	assert {(source, target) for source, target, _ in condensation.edges()} == expected_edges
+	# ids are a topological order of the condensation
+	assert all(source < target for source, target in expected_edges)
+
+def test_scc_on_long_paths_and_numpy():
+	n = 200000
+	cycle = Graph.from_edges([(vertex, (vertex + 1) % n) for vertex in range(n)], n, directed=True)
+	assert [len(component) for component in cycle.iter_strongly_connected_components()] == [n]
+	path = Graph.from_edges([(vertex, vertex + 1) for vertex in range(n - 1)], n, directed=True)
+	assert list(path.strongly_connected_components()) == list(range(n))
+	with pytest.raises(ValueError):
+		Graph.from_edges([(0, 1)]).get_strongly_connected_components()
+	numpy = pytest.importorskip('numpy')
+	edges = [(0, 1), (1, 0), (1, 2), (2, 3), (3, 2), (4, 4)]
+	expected = Graph.from_edges(edges, directed=True).strongly_connected_components(condensation=True)
+	ids, condensation = Graph.from_edges(numpy.array(edges), directed=True).strongly_connected_components(condensation=True)
+	assert list(ids) == list(expected[0])
+	assert sorted(condensation.edges()) == sorted(expected[1].edges())
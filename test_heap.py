@@ -0,0 +1,174 @@
+import random
+
+import pytest
+
+from heap import ENGINES, MaxHeap, MinHeap, PriorityQueue
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_meld_with_itself(engine):
+	heap = MinHeap([3, 1, 2], engine=engine)
+	with pytest.raises(ValueError):
+		heap.meld(heap)
+	assert len(heap) == 3
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_heap_from_numpy_array(engine):
+	numpy = pytest.importorskip('numpy')
+	heap = MinHeap(numpy.array([5, 3, 9, 1]), engine=engine)
+	assert [heap.pop() for _ in range(len(heap))] == [1, 3, 5, 9]
+	assert len(MinHeap(numpy.array([]), engine=engine)) == 0
+
+def test_heap_from_generator():
+	heap = MinHeap(value for value in [4, 2, 8])
+	assert heap.peek() == 2
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_failed_meld_keeps_other(engine):
+	queue = PriorityQueue([('a', 2), ('b', 1)], engine=engine)
+	heap = MinHeap([1], engine=engine)
+	with pytest.raises(TypeError):
+		heap.meld(queue)
+	assert len(queue) == 2 and list(heap) == [1]
+	other = MinHeap(['x', 'y'], engine=engine)
+	with pytest.raises(TypeError):
+		heap.meld(other)
+	assert len(other) == 2
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_meld_priority_queues(engine):
+	first = PriorityQueue([('a', 3)], engine=engine)
+	second = PriorityQueue([('b', 1), ('c', 2)], engine=engine)
+	first.meld(second)
+	assert len(second) == 0
+	assert [first.pop() for _ in range(3)] == ['b', 'c', 'a']
+
+class Counted:
+	"""Integer that counts the comparisons made against it"""
+	comparisons = 0
+
+	def __init__(self, value):
+		self.value = value
+
+	def __lt__(self, other):
+		Counted.comparisons += 1
+		return self.value < other.value
+
+def test_heapify_is_linear():
+	n = 10000
+	values = [Counted(value) for value in random.Random(0).sample(range(n), n)]
+	Counted.comparisons = 0
+	heap = MinHeap(values, inplace=True)
+	assert heap.heap is values
+	assert Counted.comparisons < 2 * n
+	assert [heap.pop().value for _ in range(n)] == list(range(n))
+
+def test_min_and_max_heaps():
+	values = random.Random(1).choices(range(50), k=500)
+	smallest, largest = MinHeap(values), MaxHeap()
+	largest.push_many(values[:100])
+	largest.push_many(values[100:])
+	assert smallest.heap_sort() == sorted(values) and len(smallest) == len(values)
+	assert [largest.extract_max() for _ in range(len(values))] == sorted(values, reverse=True)
+	assert largest.is_empty() and smallest.get_min() == min(values)
+
+def test_keyed_heap_keeps_ties_in_order():
+	calls = []
+	def key(task):
+		calls.append(task)
+		return task[1]
+	tasks = MaxHeap([('b', 2), ('a', 2), ('c', 7)], key=key)
+	tasks.push(('d', 2))
+	assert [tasks.pop() for _ in range(4)] == [('c', 7), ('b', 2), ('a', 2), ('d', 2)]
+	assert len(calls) == 4
+
+def test_fused_and_positional_operations():
+	heap = MinHeap([5, 3, 8, 1])
+	assert heap.pushpop(0) == 0 and heap.pushpop(4) == 1
+	assert heap.replace(9) == 3 and heap.peek() == 4
+	heap.remove(8)
+	assert sorted(heap) == [4, 5, 9]
+	assert heap.delete(-1) in (5, 9) and len(heap) == 2
+	with pytest.raises(ValueError):
+		heap.remove(42)
+	with pytest.raises(IndexError):
+		heap.delete(2)
+	heap.clear()
+	for operation in (heap.peek, heap.extract, lambda: heap.replace(1)):
+		with pytest.raises(IndexError):
+			operation()
+	assert heap.pushpop(7) == 7 and len(heap) == 0
+
+def test_priority_queue_handles_match_a_model():
+	rng = random.Random(2)
+	queue = PriorityQueue()
+	handles = {}
+	for step in range(3000):
+		operation = rng.random()
+		if operation < 0.4 or not handles:
+			handles[step] = queue.push(step, rng.randrange(100))
+		elif operation < 0.6:
+			handle = handles[rng.choice(list(handles))]
+			queue.update_priority(handle, rng.randrange(100))
+		elif operation < 0.7:
+			handle = handles[rng.choice(list(handles))]
+			queue.decrease_key(handle, handle.priority - rng.randrange(5))
+		elif operation < 0.8:
+			value = rng.choice(list(handles))
+			assert queue.remove(handles.pop(value)) == value
+		else:
+			# equal priorities come out in the order they were pushed
+			expected = min(handles.values(), key=lambda handle: (handle.priority, handle.order))
+			assert queue.peek_priority() == expected.priority
+			assert queue.pop() == expected.value
+			del handles[expected.value]
+		assert len(queue) == len(handles)
+	assert queue.heap_sort() == [handle.value for handle in sorted(handles.values(), key=lambda handle: (handle.priority, handle.order))]
+
+def test_handles_that_left_the_queue():
+	queue = PriorityQueue([('a', 1), ('b', 2)])
+	first, second = queue.push_many([('c', 0), ('d', 5)])
+	assert first in queue and queue.pop() == 'c' and first not in queue
+	for operation in (queue.remove, lambda handle: queue.update_priority(handle, 3)):
+		with pytest.raises(ValueError):
+			operation(first)
+	with pytest.raises(ValueError):
+		queue.decrease_key(second, 6)
+	queue.clear()
+	assert second not in queue
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('arity', [2, 3, 8])
+def test_engines_agree(engine, arity):
+	rng = random.Random(arity)
+	values = [rng.randrange(100) for _ in range(300)]
+	heap = MaxHeap(values[:100], engine=engine, arity=arity)
+	assert isinstance(heap, MaxHeap)
+	heap.push_many(values[100:200])
+	for value in values[200:250]:
+		heap.push(value)
+	heap.meld(MaxHeap(values[250:], engine=engine, arity=arity))
+	heap.remove(values[0])
+	expected = sorted(values, reverse=True)
+	expected.remove(values[0])
+	assert sorted(heap, reverse=True) == expected
+	assert heap.pushpop(-1) == expected[0] and heap.replace(1000) == expected[1]
+	assert [heap.pop() for _ in range(len(heap))] == [1000] + expected[2:] + [-1]
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_priority_queue_engines(engine):
+	queue = PriorityQueue(engine=engine)
+	handles = [queue.push(value, value % 7) for value in range(50)]
+	for handle in handles[::3]:
+		queue.update_priority(handle, -handle.value)
+	for handle in handles[1::5]:
+		queue.remove(handle)
+	remaining = [handle for index, handle in enumerate(handles) if index % 5 != 1]
+	expected = [handle.value for handle in sorted(remaining, key=lambda handle: (handle.priority, handle.order))]
+	assert queue.heap_sort() == expected
+	assert [queue.pop() for _ in range(len(queue))] == expected
+
+def test_unknown_engine():
+	with pytest.raises(ValueError):
+		MinHeap(engine='fibonacci')
+	with pytest.raises(ValueError):
+		MinHeap(engine='dary', arity=1)
@@ -0,0 +1,84 @@
+import bisect
+import random
+from functools import total_ordering
+
+import pytest
+
+from sortedlist import SortedList
+
+@total_ordering
+class Record:
+	"""Value ordered by key alone, so equal records can still be told apart"""
+	def __init__(self, key, name):
+		self.key = key
+		self.name = name
+
+	def __eq__(self, other):
+		return self.key == other.key
+
+	def __lt__(self, other):
+		return self.key < other.key
+
+@pytest.mark.parametrize('batch', [1, 10])
+def test_update_puts_new_values_after_equal_ones(batch):
+	values = SortedList([Record(key, f'old{key}') for key in range(5)] * 2)
+	new = [Record(index % 5, f'new{index}') for index in range(batch)]
+	values.update(new)
+	expected = SortedList([Record(key, f'old{key}') for key in range(5)] * 2)
+	for record in new:
+		expected.add(record)
+	assert [record.name for record in values] == [record.name for record in expected]
+	assert [record.name for record in values if record.key == 0][:2] == ['old0', 'old0']
+
+@pytest.mark.parametrize('load', [2, 5, 1000])
+def test_matches_a_sorted_list(load):
+	rng = random.Random(load)
+	values = SortedList(load=load)
+	model = []
+	for step in range(3000):
+		operation = rng.random()
+		if operation < 0.45 or not model:
+			value = rng.randrange(200)
+			values.add(value)
+			bisect.insort_right(model, value)
+		elif operation < 0.6:
+			value = rng.randrange(200)
+			assert values.discard(value) == (value in model)
+			if value in model:
+				model.remove(value)
+		elif operation < 0.75:
+			index = rng.randrange(-len(model), len(model))
+			assert values.pop(index) == model.pop(index)
+		elif operation < 0.8:
+			index = rng.randrange(len(model))
+			del values[index]
+			del model[index]
+		elif operation < 0.85:
+			batch = [rng.randrange(200) for _ in range(rng.randrange(min(len(model), 50) + 2))]
+			values.update(batch)
+			model = sorted(model + batch)
+		else:
+			value = rng.randrange(-1, 201)
+			assert (value in values) == (value in model)
+			assert values.bisect_left(value) == bisect.bisect_left(model, value)
+			assert values.bisect_right(value) == bisect.bisect_right(model, value)
+			assert values.count(value) == model.count(value)
+		assert len(values) == len(model)
+	assert list(values) == model and list(reversed(values)) == model[::-1]
+	assert [values[index] for index in range(-len(model), len(model))] == model + model
+	assert values[10:50] == model[10:50] and values[::3] == model[::3]
+
+def test_range_queries_and_errors():
+	values = SortedList([5, 1, 3, 3, 9, 7], load=2)
+	assert list(values.irange(3, 7)) == [3, 3, 5, 7]
+	assert list(values.irange(3, 7, inclusive=(False, False))) == [5]
+	assert list(values.irange(maximum=5, reverse=True)) == [5, 3, 3, 1]
+	assert values.index(3) == 1
+	with pytest.raises(ValueError):
+		values.index(4)
+	with pytest.raises(ValueError):
+		values.remove(4)
+	with pytest.raises(IndexError):
+		values[6]
+	values.clear()
+	assert len(values) == 0 and list(values) == [] and 3 not in values
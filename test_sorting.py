@@ -0,0 +1,488 @@
+import bisect
+import collections
+import ctypes
+import functools
+import itertools
+import json
+import logging
+import math
+import random
+import sys
+from array import array
+
+import pytest
+
+import sorting
+from sorting import radixsort
+
+@pytest.mark.parametrize('bits', [1, 8, 11, 16])
+def test_radixsort_lists(bits):
+	rng = random.Random(bits)
+	ints = [rng.randrange(-2**40, 2**40) for _ in range(2000)]
+	floats = [rng.uniform(-1e9, 1e9) for _ in range(2000)] + [float('inf'), float('-inf'), -0.0, 0.0, 5e-324]
+	for values in (ints, floats):
+		arr = list(values)
+		radixsort(arr, bits=bits)
+		assert arr == sorted(values)
+
+@pytest.mark.parametrize('typecode', 'bBhHiIlLqQfd')
+def test_radixsort_arrays(typecode):
+	rng = random.Random(typecode)
+	size = array(typecode).itemsize * 8
+	if typecode in 'fd':
+		values = [rng.uniform(-1e6, 1e6) for _ in range(1000)]
+	elif typecode.isupper():
+		values = [rng.randrange(2**size) for _ in range(1000)]
+	else:
+		values = [rng.randrange(-2**(size-1), 2**(size-1)) for _ in range(1000)]
+	arr = array(typecode, values)
+	radixsort(arr)
+	assert arr.tolist() == sorted(array(typecode, values).tolist())
+
+@pytest.mark.parametrize('dtype', ['int8', 'uint16', 'int32', 'int64', 'uint64', 'float32', 'float64'])
+def test_radixsort_numpy(dtype):
+	numpy = pytest.importorskip('numpy')
+	rng = numpy.random.default_rng(0)
+	if dtype.startswith('float'):
+		arr = rng.standard_normal(5000).astype(dtype) * 1000
+	else:
+		info = numpy.iinfo(dtype)
+		arr = rng.integers(info.min, info.max, 5000, dtype=dtype, endpoint=True)
+	expected = numpy.sort(arr)
+	radixsort(arr, bits=11)
+	assert (arr == expected).all()
+
+def test_radixsort_rejects_bad_input():
+	with pytest.raises(ValueError):
+		radixsort([1, 2, 3], bits=17)
+	with pytest.raises(TypeError):
+		radixsort(['b', 'a'])
+
+def test_radixsort_rejects_mixed_ints_and_floats():
+	with pytest.raises(TypeError):
+		radixsort([3, 1.5, 2] * 100)
+
+def test_radixsort_keeps_large_ints_exact():
+	arr = [2**60 + 1, 2**60, -2**60 - 1] * 100
+	radixsort(arr)
+	assert arr == sorted([2**60 + 1, 2**60, -2**60 - 1] * 100)
+
+@pytest.mark.parametrize('n', [10, 1000])
+def test_radixsort_numpy_big_endian(n):
+	numpy = pytest.importorskip('numpy')
+	values = [random.randint(-2**31, 2**31 - 1) for _ in range(n)]
+	arr = numpy.array(values, dtype='>i4')
+	radixsort(arr)
+	assert arr.dtype == numpy.dtype('>i4')
+	assert arr.tolist() == sorted(values)
+
+@pytest.mark.parametrize('n', [10, 1000])
+def test_radixsort_buffer_byte_order(n):
+	values = [random.randint(-2**31, 2**31 - 1) for _ in range(n)]
+	native = (ctypes.c_int32.__ctype_le__ if sorting.sys.byteorder == 'little' else ctypes.c_int32.__ctype_be__) * n
+	foreign = (ctypes.c_int32.__ctype_be__ if sorting.sys.byteorder == 'little' else ctypes.c_int32.__ctype_le__) * n
+	arr = native(*values)
+	radixsort(arr)
+	assert list(arr) == sorted(values)
+	with pytest.raises(TypeError):
+		radixsort(foreign(*values))
+
+KEYED_SORTS = [
+	sorting.bubblesort, sorting.bubblesort_improved, sorting.cocktailshakersort,
+	sorting.insertionsort, sorting.mergesort, functools.partial(sorting.mergesort, natural=True),
+	sorting.quicksort, functools.partial(sorting.quicksort, threeway=True), sorting.heapsort,
+	functools.partial(sorting.heapsort, arity=4), sorting.sort, sorting.radixsort,
+]
+
+@pytest.mark.parametrize('fn', KEYED_SORTS)
+@pytest.mark.parametrize('reverse', [False, True])
+def test_key_is_called_once_and_ties_keep_their_order(fn, reverse):
+	rng = random.Random(6)
+	records = [(rng.randrange(8), index) for index in range(200)]
+	calls = collections.Counter()
+
+	def key(record):
+		calls[record] += 1
+		return record[0]
+
+	arr = list(records)
+	fn(arr, key=key, reverse=reverse)
+	assert arr == sorted(records, key=lambda record: record[0], reverse=reverse)
+	assert set(calls.values()) == {1} and len(calls) == len(records)
+
+@pytest.mark.parametrize('n', [10, sorting.RADIX_THRESHOLD + 100])
+@pytest.mark.parametrize('reverse', [False, True])
+def test_radixsort_key_and_reverse_are_stable(n, reverse):
+	rng = random.Random(n)
+	records = [(rng.uniform(-5, 5), index) for index in range(n)]
+	for key in (lambda record: round(record[0]), lambda record: float(round(record[0]))):
+		arr = list(records)
+		radixsort(arr, key=key, reverse=reverse)
+		assert arr == sorted(records, key=key, reverse=reverse)
+
+@pytest.mark.parametrize('n', [1, 15, 16, 17, 500])
+def test_select_every_index(n):
+	rng = random.Random(n)
+	values = [rng.randrange(n // 3 + 1) for _ in range(n)]
+	expected = sorted(values)
+	for k in range(n):
+		arr = list(values)
+		assert sorting.select(arr, k) == expected[k]
+		assert max(arr[:k], default=expected[k]) <= arr[k] <= min(arr[k+1:], default=expected[k])
+	with pytest.raises(IndexError):
+		sorting.select(list(values), n)
+
+@pytest.mark.parametrize('n', [4000, 16000])
+def test_select_is_linear_against_antiqsort(n):
+	arr, state = antiqsort(n)
+	sorting.select(arr, n // 2)
+	assert state['comparisons'] < 30 * n
+
+@pytest.mark.parametrize('k', [0, 1, 10, 999, 1000, 2000])
+def test_partial_sort(k):
+	rng = random.Random(k)
+	values = [rng.randrange(100) for _ in range(1000)]
+	arr = list(values)
+	sorting.partial_sort(arr, k)
+	assert arr[:k] == sorted(values)[:k] and sorted(arr) == sorted(values)
+	arr = list(values)
+	sorting.partial_sort(arr, k, reverse=True)
+	assert arr[:k] == sorted(values, reverse=True)[:k] and sorted(arr) == sorted(values)
+
+def test_nlargest_and_nsmallest_keep_ties_in_order():
+	records = [(value % 5, index) for index, value in enumerate(random.Random(0).sample(range(100), 100))]
+	for k in (0, 1, 7, 100, 150):
+		assert sorting.nsmallest(iter(records), k, key=lambda record: record[0]) == sorted(records, key=lambda record: record[0])[:k]
+		assert sorting.nlargest(iter(records), k, key=lambda record: record[0]) == sorted(records, key=lambda record: record[0], reverse=True)[:k]
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_select_key_and_reverse(reverse):
+	words = ['pear', 'fig', 'banana', 'kiwi', 'apple', 'plum', 'cherry']
+	expected = sorted(words, key=len, reverse=reverse)
+	for k in range(len(words)):
+		arr = list(words)
+		assert len(sorting.select(arr, k, key=len, reverse=reverse)) == len(expected[k])
+		before, after = map(len, arr[:k]), map(len, arr[k + 1:])
+		if reverse:
+			assert min(before, default=len(arr[k])) >= len(arr[k]) >= max(after, default=0)
+		else:
+			assert max(before, default=0) <= len(arr[k]) <= min(after, default=len(arr[k]))
+
+@pytest.mark.parametrize('n', [0, 1, 2, 7, 8, 100])
+def test_bounds_match_bisect(n):
+	rng = random.Random(n)
+	arr = sorted(rng.randrange(n // 2 + 1) for _ in range(n))
+	queries = [rng.randrange(-1, n // 2 + 2) for _ in range(50)]
+	layout = sorting.EytzingerLayout(arr)
+	assert [sorting.lower_bound(arr, query) for query in queries] == [bisect.bisect_left(arr, query) for query in queries]
+	assert [sorting.upper_bound(arr, query) for query in queries] == [bisect.bisect_right(arr, query) for query in queries]
+	for side, search in (('left', bisect.bisect_left), ('right', bisect.bisect_right)):
+		expected = [search(arr, query) for query in queries]
+		assert sorting.search_many(arr, queries, side=side) == expected
+		assert layout.search_many(queries, side=side) == expected
+	assert [layout.lower_bound(query) for query in queries] == [bisect.bisect_left(arr, query) for query in queries]
+	assert [layout.upper_bound(query) for query in queries] == [bisect.bisect_right(arr, query) for query in queries]
+
+@pytest.mark.parametrize('n', [1, 7, 8, 100])
+def test_bounds_numpy(n):
+	numpy = pytest.importorskip('numpy')
+	rng = numpy.random.default_rng(n)
+	arr = numpy.sort(rng.integers(0, n, n))
+	queries = rng.integers(-1, n + 1, 50)
+	for side in ('left', 'right'):
+		expected = numpy.searchsorted(arr, queries, side=side).tolist()
+		assert list(sorting.search_many(arr, queries, side=side)) == expected
+		assert list(sorting.EytzingerLayout(arr).search_many(queries, side=side)) == expected
+
+def test_search_within_range():
+	arr = [1, 2, 2, 2, 3]
+	assert sorting.lower_bound(arr, 2, lo=2) == 2
+	assert sorting.upper_bound(arr, 2, hi=3) == 3
+	assert sorting.binarysearch(arr, 3) == 4
+	assert sorting.binarysearch(arr, 4) == -1
+
+def test_unsort_copies_unless_inplace():
+	arr = list(range(100))
+	shuffled = sorting.unsort(arr, seed=1)
+	assert arr == list(range(100)) and sorted(shuffled) == arr
+	assert sorting.unsort(arr, seed=1) == shuffled
+	assert sorting.unsort(arr, inplace=True, seed=random.Random(1)) is arr
+	assert arr == shuffled
+
+def test_unsort_is_uniform():
+	rng = random.Random(0)
+	counts = collections.Counter(tuple(sorting.unsort('abc', seed=rng)) for _ in range(6000))
+	assert len(counts) == 6
+	assert all(800 < count < 1200 for count in counts.values())
+
+def test_reservoir_sample():
+	assert sorted(sorting.reservoir_sample(range(3), 5, seed=0)) == [0, 1, 2]
+	assert sorting.reservoir_sample(range(10), 0) == []
+	rng = random.Random(0)
+	counts = collections.Counter()
+	for _ in range(2000):
+		sample = sorting.reservoir_sample(iter(range(100)), 10, seed=rng)
+		assert len(set(sample)) == 10
+		counts.update(value // 10 for value in sample)
+	# every tenth of the stream is picked about as often
+	assert all(1600 < count < 2400 for count in counts.values())
+
+def test_externalshuffle_is_a_seeded_permutation(tmp_path):
+	records = [str(index) * 20 for index in range(2000)]
+	shuffled = list(sorting.externalshuffle(iter(records), memory_limit=5000, fan_out=4, seed=3, tempdir=tmp_path))
+	assert sorted(shuffled) == sorted(records) and shuffled != records
+	assert list(sorting.externalshuffle(records, memory_limit=5000, fan_out=4, seed=3)) == shuffled
+	assert not list(tmp_path.iterdir())
+
+@pytest.mark.parametrize('arity', [2, 3, 4, 8])
+@pytest.mark.parametrize('n', [0, 1, 2, 9, 1000])
+def test_heapsort_arities(arity, n):
+	rng = random.Random(n)
+	values = [rng.randrange(n // 2 + 1) for _ in range(n)]
+	for arr in (list(values), sorted(values), sorted(values, reverse=True)):
+		sorting.heapsort(arr, arity=arity)
+		assert arr == sorted(values)
+
+def test_heapsort_sifts_bottom_up():
+	n = 10000
+	arr = sorting.unsort(range(n), seed=1)
+	stats = sorting.instrumented(sorting.heapsort)(arr)
+	assert arr == list(range(n))
+	# a top-down sift makes about 2 n log n comparisons
+	assert stats.comparisons < 1.2 * n * math.log2(n)
+
+def test_heapsort_rejects_small_arity():
+	with pytest.raises(ValueError):
+		sorting.heapsort([2, 1], arity=1)
+
+@pytest.mark.parametrize('loser_tree', [False, True])
+@pytest.mark.parametrize('k', [0, 1, 2, 3, 8, 33])
+def test_kway_merge_is_stable(loser_tree, k):
+	rng = random.Random(k)
+	inputs = [sorted((rng.randrange(10), source, index) for index in range(rng.randrange(20))) for source in range(k)]
+	merged = list(sorting.kway_merge(*inputs, key=lambda record: record[0], loser_tree=loser_tree))
+	assert merged == sorted((record for records in inputs for record in records), key=lambda record: (record[0], record[1]))
+
+@pytest.mark.parametrize('loser_tree', [False, True])
+def test_kway_merge_is_lazy(loser_tree):
+	evens, odds = itertools.count(0, 2), itertools.count(1, 2)
+	merged = sorting.kway_merge(evens, odds, iter([]), loser_tree=loser_tree)
+	assert list(itertools.islice(merged, 10)) == list(range(10))
+
+def test_externalshuffle_records_larger_than_memory_limit():
+	records = ['x' * 5000 + str(index) for index in range(50)]
+	shuffled = list(sorting.externalshuffle(records, memory_limit=1000, fan_out=2, seed=1))
+	assert sorted(shuffled) == sorted(records)
+
+def test_externalsort_merges_runs_stably():
+	rng = random.Random(2)
+	records = [(rng.randrange(20), index) for index in range(3000)]
+	result = list(sorting.externalsort(iter(records), key=lambda record: record[0], memory_limit=2000, fan_in=3))
+	assert result == sorted(records, key=lambda record: record[0])
+
+def test_externalsort_removes_its_runs(tmp_path):
+	values = [random.random() for _ in range(5000)]
+	merged = sorting.externalsort(values, memory_limit=4000, fan_in=2, tempdir=tmp_path)
+	assert next(merged) == min(values)
+	assert list(tmp_path.iterdir())
+	assert [min(values)] + list(merged) == sorted(values)
+	assert not list(tmp_path.iterdir())
+
+def test_externalsort_rejects_small_fan_in():
+	with pytest.raises(ValueError):
+		list(sorting.externalsort([3, 1, 2], fan_in=1))
+
+def test_parallel_sort_reverse_is_stable():
+	rng = random.Random(1)
+	records = [(rng.randrange(50), index) for index in range(sorting.PARALLEL_THRESHOLD + 1000)]
+	arr = list(records)
+	sorting.parallel_sort(arr, workers=2, key=lambda record: record[0], reverse=True)
+	assert arr == sorted(records, key=lambda record: record[0], reverse=True)
+
+def antiqsort(n):
+	# McIlroy's adversary decides values as they are compared, so that every
+	# pivot is nearly the smallest value in its range. Returns the items to
+	# sort and a counter of the comparisons made
+	gas = n
+	values = [gas] * n
+	state = {'solid': 0, 'candidate': 0, 'comparisons': 0}
+
+	def compare(first, second):
+		state['comparisons'] += 1
+		if values[first] == gas and values[second] == gas:
+			frozen = first if first == state['candidate'] else second
+			values[frozen] = state['solid']
+			state['solid'] += 1
+		if values[first] == gas:
+			state['candidate'] = first
+		elif values[second] == gas:
+			state['candidate'] = second
+		return values[first] - values[second]
+
+	class Item:
+		def __init__(self, index):
+			self.index = index
+
+		def __lt__(self, other):
+			return compare(self.index, other.index) < 0
+
+	return [Item(index) for index in range(n)], state
+
+def is_sorted(arr):
+	return all(not arr[index+1] < arr[index] for index in range(len(arr) - 1))
+
+@pytest.mark.parametrize('make', [
+	lambda rng: rng.randrange(-10**6, 10**6),
+	lambda rng: rng.uniform(-1, 1),
+	lambda rng: rng.randrange(2**70),
+	lambda rng: str(rng.randrange(10**6)),
+])
+def test_parallel_sort(make):
+	rng = random.Random(4)
+	values = [make(rng) for _ in range(sorting.PARALLEL_THRESHOLD + 1000)]
+	arr = list(values)
+	sorting.parallel_sort(arr, workers=3)
+	assert arr == sorted(values)
+
+def test_parallel_sort_small_input():
+	arr = [3, 1, 2]
+	sorting.parallel_sort(arr, workers=4, reverse=True)
+	assert arr == [3, 2, 1]
+
+def test_quicksort_threeway_survives_antiqsort():
+	n = 4000
+	arr, state = antiqsort(n)
+	sorting.quicksort(arr, threeway=True)
+	assert is_sorted(arr)
+	assert state['comparisons'] < 10 * n * n.bit_length()
+
+@pytest.mark.parametrize('uniques', [1, 2, 8, 1000])
+def test_quicksort_threeway_sorts_duplicates(uniques):
+	rng = random.Random(uniques)
+	values = [rng.randrange(uniques) for _ in range(5000)]
+	arr = list(values)
+	stats = sorting.instrumented(sorting.quicksort)(arr, threeway=True)
+	assert arr == sorted(values)
+	if uniques <= 8:
+		# every partition finishes all copies of its pivot
+		assert stats.comparisons < 4 * len(values) * uniques.bit_length()
+
+def test_quicksort_threeway_large_structured_input():
+	n = 100000
+	for values in (list(range(n)), list(range(n, 0, -1)), [index % 2 for index in range(n)]):
+		arr = list(values)
+		sorting.quicksort(arr, threeway=True)
+		assert arr == sorted(values)
+
+class Record:
+	"""Compares by key only, so equal keys show whether a sort is stable"""
+
+	def __init__(self, key, index):
+		self.key = key
+		self.index = index
+
+	def __lt__(self, other):
+		return self.key < other.key
+
+@pytest.mark.parametrize('n', [0, 1, 31, 32, 33, 5000])
+def test_natural_mergesort_is_stable(n):
+	rng = random.Random(n)
+	records = [Record(rng.randrange(10), index) for index in range(n)]
+	arr = list(records)
+	sorting.mergesort(arr, natural=True)
+	assert [(record.key, record.index) for record in arr] == sorted((record.key, record.index) for record in records)
+
+def test_natural_mergesort_uses_existing_runs():
+	n = 10000
+	runs = list(range(n // 2)) + list(range(n, n // 2, -1))
+	stats = sorting.instrumented(sorting.mergesort)(runs, natural=True)
+	assert runs == sorted(runs)
+	# finding the two runs takes n comparisons, and the merge gallops past
+	# everything but the boundary between them
+	assert stats.comparisons < n + 8 * n.bit_length()
+
+@pytest.mark.parametrize('n', [0, 1, 2, 5, 1000])
+def test_sort_adapts_to_input_shape(n):
+	rng = random.Random(n)
+	shapes = {
+		'random': [rng.randrange(n or 1) for _ in range(n)],
+		'sorted': list(range(n)),
+		'reversed': list(range(n, 0, -1)),
+		'organ pipe': list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+		'sawtooth': [index % 64 for index in range(n)],
+		'all equal': [0] * n,
+		'sorted + noise': [index if rng.random() > 0.02 else rng.randrange(n) for index in range(n)],
+	}
+	for shape, values in shapes.items():
+		arr = list(values)
+		sorting.sort(arr)
+		assert arr == sorted(values), shape
+
+def test_sort_is_linear_on_sorted_and_reversed_input():
+	n = 10000
+	for values in (list(range(n)), list(range(n, 0, -1))):
+		stats = sorting.instrumented(sorting.sort)(values)
+		assert stats.comparisons < 2 * n
+
+def test_sort_survives_antiqsort():
+	n = 4000
+	arr, state = antiqsort(n)
+	sorting.sort(arr)
+	assert is_sorted(arr)
+	assert state['comparisons'] < 10 * n * n.bit_length()
+
+def test_instrumented_counts_insertionsort_exactly():
+	n = 50
+	arr = list(range(n, 0, -1))
+	stats = sorting.instrumented(sorting.insertionsort)(arr)
+	assert arr == sorted(arr)
+	assert stats.algorithm == 'insertionsort' and stats.size == n
+	assert stats.comparisons == n * (n - 1) // 2
+	assert stats.peak_bytes >= 0 and stats.seconds >= 0
+
+def test_instrumented_records_partitions_and_depth():
+	arr = sorting.unsort(range(2000), seed=0)
+	stats = sorting.instrumented(sorting.quicksort)(arr)
+	assert arr == list(range(2000))
+	assert stats.partitions > 0 and 0 <= stats.worst_balance <= stats.mean_balance <= 0.5
+	assert stats.max_depth > 1
+	stats = sorting.instrumented(sorting.radixsort, count_comparisons=False)(arr)
+	assert stats.comparisons == 0 and stats.partitions == 0 and stats.mean_balance is None
+
+def test_instrumented_sinks(tmp_path, caplog):
+	seen = []
+	sorting.instrumented(sorting.sort, sink=seen.append)([3, 1, 2])
+	assert seen[0].comparisons > 0
+	path = tmp_path / 'stats.jsonl'
+	for _ in range(2):
+		sorting.instrumented(sorting.sort, sink=str(path), name='hybrid')([3, 1, 2])
+	assert [json.loads(line)['algorithm'] for line in path.read_text().splitlines()] == ['hybrid', 'hybrid']
+	logger = logging.getLogger('test_sorting')
+	with caplog.at_level(logging.INFO, logger='test_sorting'):
+		sorting.instrumented(sorting.sort, sink=logger)([3, 1, 2])
+	assert 'sort stats' in caplog.text
+
+def test_instrumented_restores_the_profiler():
+	def profile(frame, event, arg):
+		pass
+	previous = sys.getprofile()
+	sys.setprofile(profile)
+	try:
+		with pytest.raises(TypeError):
+			sorting.instrumented(sorting.sort)([1, 'a', 2.0])
+		assert sys.getprofile() is profile
+	finally:
+		sys.setprofile(previous)
+
+@pytest.mark.parametrize('fn', [sorting.sort, sorting.mergesort, sorting.heapsort, sorting.quicksort])
+def test_instrumented_counts_with_key(fn):
+	rng = random.Random(5)
+	values = [rng.randrange(100) for _ in range(300)]
+	with_key = list(values)
+	stats = sorting.instrumented(fn)(with_key, key=lambda value: value % 10, reverse=True)
+	assert with_key == sorted(values, key=lambda value: value % 10, reverse=True)
+	# the same work as sorting the decorated pairs directly
+	decorated = [(value % 10, -index) for index, value in enumerate(values)]
+	direct = sorting.instrumented(fn)(decorated)
+	assert (stats.comparisons, stats.moves) == (direct.comparisons, direct.moves)
+	assert stats.moves >= len(values)